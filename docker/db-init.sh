@@ -25,7 +25,8 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "krisha" <<-EOSQL
         address     TEXT,
         title       VARCHAR(255),
         star        INTEGER DEFAULT 0,
-        focus       INTEGER DEFAULT 0
+        focus       INTEGER DEFAULT 0,
+        checked_at  DATE    DEFAULT CURRENT_DATE
     );
 
     -- Create prices table if it doesn't exist
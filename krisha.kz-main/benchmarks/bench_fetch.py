@@ -0,0 +1,70 @@
+"""Benchmark concurrent detail page fetching against the local stub.
+
+Usage: python -m benchmarks.bench_fetch [ads] [latency] [rate_limit]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
+
+from benchmarks.stub_server import get_base_url, start_stub_server
+from src.krisha.config.config import Config
+from src.krisha.config.parser import ParserConfig, with_base_url
+from src.krisha.config.path import get_app_path
+from src.krisha.crawler.flat_parser import FlatParser
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.crawler.spider import fetch_ads_pages
+
+WORKERS = (1, 2, 4, 8, 16)
+
+
+def get_stub_config(base_url: str, **kwargs) -> Config:
+    parser_config = replace(with_base_url(ParserConfig(), base_url), **kwargs)
+    return Config(
+        path=get_app_path(), parser_config=parser_config, search_params=None
+    )
+
+
+def bench(ads: int, latency: float, rate_limit: float) -> None:
+    server = start_stub_server(latency)
+    base_url = get_base_url(server)
+    ads_urls = [f"{base_url}/a/show/{100000 + i}" for i in range(ads)]
+    print(
+        f"{ads} ads, {latency * 1000:.0f} ms latency per request,"
+        f" {rate_limit:g} requests/s limit"
+    )
+    for workers in WORKERS:
+        config = get_stub_config(
+            base_url,
+            max_workers=workers,
+            pool_size=workers,
+            rate_limit=rate_limit,
+            rate_burst=workers,
+            min_workers=workers,
+        )
+        client = HttpClient(config.parser_config)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            ads_pages = fetch_ads_pages(
+                executor, ads_urls, client, FlatParser, ParsePool(0)
+            )
+            wait([f for _, *futures in ads_pages for f in futures])
+        elapsed = time.perf_counter() - start
+        client.close()
+        print(
+            f"  max_workers={workers:<3} {elapsed:7.2f} s"
+            f" {ads / elapsed:8.1f} ads/s"
+            f" {client.stats.connections:4} connections"
+            f" {client.stats.reused:5} reused"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    bench(
+        ads=int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+        latency=float(sys.argv[2]) if len(sys.argv) > 2 else 0.05,
+        rate_limit=float(sys.argv[3]) if len(sys.argv) > 3 else 1000,
+    )
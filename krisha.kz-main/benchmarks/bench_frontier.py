@@ -0,0 +1,108 @@
+"""Benchmark crawl_queue workers against the local stub and PostgreSQL.
+
+Each run empties crawl_queue, flats and prices and starts the given
+number of worker processes, which share the crawl through the queue.
+It runs against the scratch database named by BENCH_DB_NAME, see
+benchmarks.scratch_db.
+
+Usage: python -m benchmarks.bench_frontier [pages] [latency] [workers...]
+"""
+
+import multiprocessing
+import sys
+import time
+from dataclasses import replace
+
+from benchmarks.bench_fetch import get_stub_config
+from benchmarks.scratch_db import check_scratch_db, get_scratch_path
+from benchmarks.stub_server import get_base_url, start_stub_server
+from src.krisha.config.search import SearchParameters
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.crawler.worker import run_worker
+from src.krisha.db.frontier import create_frontier
+from src.krisha.db.service import get_connection_pool
+
+WORKERS = (1, 2, 4)
+
+
+def get_worker_config(base_url: str):
+    config = get_stub_config(
+        base_url,
+        max_workers=4,
+        min_workers=4,
+        rate_limit=1000,
+        rate_burst=4,
+        frontier=True,
+        frontier_idle_poll=0.2,
+    )
+    profile = SearchParameters(config.parser_config, city=0, name="bench")
+    return replace(
+        config,
+        path=get_scratch_path(config.path),
+        search_params=profile,
+        search_profiles=[profile],
+    )
+
+
+def work(base_url: str) -> None:
+    config = get_worker_config(base_url)
+    with (
+        HttpClient(config.parser_config) as client,
+        get_connection_pool(config.path, 2) as pool,
+    ):
+        run_worker(config, client, pool, ParsePool(0))
+
+
+def reset_db(config) -> None:
+    check_scratch_db(config.path.db_name)
+    with get_connection_pool(config.path, 1) as pool:
+        with pool.connection() as connector:
+            create_frontier(connector)
+            with connector.connection.cursor() as cursor:
+                cursor.execute("TRUNCATE crawl_queue, prices, flats;")
+            connector.connection.commit()
+
+
+def count_flats(config) -> int:
+    with get_connection_pool(config.path, 1) as pool:
+        with pool.connection() as connector:
+            with connector.connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM flats;")
+                return cursor.fetchone()[0]
+
+
+def bench(pages: int, latency: float, workers_counts: tuple) -> None:
+    server = start_stub_server(latency, pages=pages)
+    base_url = get_base_url(server)
+    config = get_worker_config(base_url)
+    print(
+        f"{pages} search pages, {latency * 1000:.0f} ms latency per request,"
+        f" 4 requests in flight per worker"
+    )
+    for workers in workers_counts:
+        reset_db(config)
+        processes = [
+            multiprocessing.Process(target=work, args=(base_url,))
+            for _ in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        flats = count_flats(config)
+        print(
+            f"  workers={workers:<3} {elapsed:7.2f} s"
+            f" {flats:6} flats {flats / elapsed:8.1f} flats/s"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    bench(
+        pages=int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        latency=float(sys.argv[2]) if len(sys.argv) > 2 else 0.05,
+        workers_counts=tuple(map(int, sys.argv[3:])) or WORKERS,
+    )
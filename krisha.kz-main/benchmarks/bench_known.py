@@ -0,0 +1,101 @@
+"""Benchmark the in-memory index of known listings.
+
+Builds KnownListings and, for comparison, a dict of (price, date) tuples
+from the given number of synthetic listings, reporting the memory of each
+and the lookup rate of the index. With --db the index is loaded from the
+database selected by the DB_* variables instead, timing the load.
+
+Usage: python -m benchmarks.bench_known [listings] [--db]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from src.krisha.config.config import load_config
+from src.krisha.crawler.known_listings import (
+    KnownListings,
+    load_known_listings,
+)
+from src.krisha.db.service import get_connection_pool
+
+LOOKUPS = 1_000_000
+FIRST_ID = 600_000_000
+
+
+def get_listings(count: int) -> list[tuple[int, int, date]]:
+    rng = random.Random(0)
+    start = date(2024, 1, 1)
+    flat_id = FIRST_ID
+    listings = []
+    for _ in range(count):
+        flat_id += rng.randint(1, 20)
+        day = start + timedelta(days=rng.randrange(365))
+        listings.append((flat_id, rng.randrange(10_000_000, 90_000_000), day))
+    return listings
+
+
+def measure(build) -> tuple[object, float]:
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size / 2**20
+
+
+def build_index(listings) -> KnownListings:
+    known = KnownListings()
+    for flat_id, price, day in listings:
+        known.append(flat_id, price, day)
+    return known
+
+
+def build_dict(listings) -> dict:
+    return {flat_id: (price, day) for flat_id, price, day in listings}
+
+
+def bench_lookups(known: KnownListings) -> None:
+    rng = random.Random(1)
+    low, high = (known.ids[0], known.ids[-1]) if known.ids else (0, 0)
+    ids = [rng.randint(low, high) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    found = sum(1 for flat_id in ids if known.get(flat_id) is not None)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {LOOKUPS / elapsed:12.0f} lookups/s"
+        f" ({found / LOOKUPS:.0%} known)"
+    )
+
+
+def bench(count: int) -> None:
+    listings = get_listings(count)
+    known, index_mb = measure(lambda: build_index(listings))
+    _, dict_mb = measure(lambda: build_dict(listings))
+    print(f"{count} listings")
+    print(f"  index {index_mb:8.1f} MB ({known.nbytes / 2**20:.1f} MB arrays)")
+    print(f"  dict  {dict_mb:8.1f} MB")
+    bench_lookups(known)
+
+
+def bench_db() -> None:
+    config = load_config()
+    with get_connection_pool(config.path, 1) as pool:
+        with pool.connection() as connector:
+            start = time.perf_counter()
+            known = load_known_listings(connector)
+            elapsed = time.perf_counter() - start
+    print(
+        f"{len(known.ids)} listings loaded in {elapsed:.2f} s,"
+        f" {known.nbytes / 2**20:.1f} MB"
+    )
+    bench_lookups(known)
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--db"]
+    if "--db" in sys.argv[1:]:
+        bench_db()
+    else:
+        bench(int(args[0]) if args else 1_000_000)
@@ -0,0 +1,75 @@
+"""Benchmark per-Ad against per-page latest price lookups.
+
+Reads the ids of the saved flats from the database selected by the DB_*
+variables, a scratch one filled by bench_simulator for instance, and
+looks their latest prices up page by page: first with a query per Ad,
+as filtering a page used to, then with PriceLookup's single query per
+page. Reports the round trips and time of each.
+
+Usage: python -m benchmarks.bench_lookup [pages] [ads_on_page]
+"""
+
+import sys
+import time
+
+from src.krisha.config.config import load_config
+from src.krisha.crawler.known_listings import PriceLookup
+from src.krisha.db.queries import get_latest_prices
+from src.krisha.db.service import get_connection_pool
+
+
+def get_pages(connector, pages: int, ads_on_page: int) -> list[list[int]]:
+    with connector.connection.cursor() as cursor:
+        query = "SELECT id FROM flats ORDER BY id LIMIT %s;"
+        cursor.execute(query, (pages * ads_on_page,))
+        ids = [row[0] for row in cursor]
+    return [
+        ids[start : start + ads_on_page]
+        for start in range(0, len(ids), ads_on_page)
+    ]
+
+
+def lookup_per_ad(connector, pages: list[list[int]]) -> int:
+    queries = 0
+    for page in pages:
+        for flat_id in page:
+            get_latest_prices(connector, [flat_id])
+            queries += 1
+    return queries
+
+
+def lookup_per_page(connector, pages: list[list[int]]) -> int:
+    lookup = PriceLookup(connector)
+    for page in pages:
+        lookup.prefetch(page)
+        for flat_id in page:
+            lookup.get(flat_id)
+    return lookup.queries
+
+
+def bench(pages: int, ads_on_page: int) -> None:
+    config = load_config()
+    with get_connection_pool(config.path, 1) as pool:
+        with pool.connection() as connector:
+            page_ids = get_pages(connector, pages, ads_on_page)
+            ads = sum(len(page) for page in page_ids)
+            print(f"{len(page_ids)} pages, {ads} Ads")
+            for name, lookup in (
+                ("per Ad", lookup_per_ad),
+                ("per page", lookup_per_page),
+            ):
+                start = time.perf_counter()
+                queries = lookup(connector, page_ids)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"  {name:9} {queries:6} round trips {elapsed:7.3f} s"
+                    f" {ads / elapsed:9.0f} Ads/s"
+                )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    bench(
+        int(args[0]) if len(args) > 0 else 50,
+        int(args[1]) if len(args) > 1 else 20,
+    )
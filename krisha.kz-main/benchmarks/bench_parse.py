@@ -0,0 +1,129 @@
+"""Benchmark parsing detail pages into Flats, and search pages.
+
+Parses the detail page fixture of tests/fixtures, and the same page
+padded with markup to the size of a real detail page, with BeautifulSoup
+as get_flat does and from the raw bytes as get_flat_from_page does, with
+orjson and with the json module. Reports the time per listing.
+
+Then parses the search page fixture, padded the same way, into a full
+tree and into the restricted one of get_content, with every available
+html_parser, and reports the time per page.
+
+Usage: python -m benchmarks.bench_parse [padding_kb] [runs]
+"""
+
+import logging
+import sys
+import time
+
+from bs4 import BeautifulSoup
+from requests import Response
+
+import src.krisha.crawler.flat_parser as flat_parser
+from src.krisha.config.parser import (
+    HTML_PARSERS,
+    ParserConfig,
+    is_html_parser_available,
+)
+from src.krisha.crawler.flat_parser import FlatParser
+from src.krisha.crawler.spider import get_content
+from tests.fixtures.fx_flat import valid_script
+from tests.fixtures.fx_search_page import full_search_page
+
+URL = "https://krisha.kz/a/show/680044731"
+FILLER = '<div class="offer__info"><span>Этаж</span> <b>5 из 9</b></div>\n'
+
+
+def get_page(padding_kb: int) -> bytes:
+    # Half of the padding on each side of the script
+    filler = FILLER * (padding_kb * 512 // len(FILLER.encode()))
+    page = f"<html><body>\n{filler}{valid_script}{filler}</body></html>"
+    return page.encode()
+
+
+def get_search_response(padding_kb: int) -> Response:
+    filler = FILLER * (padding_kb * 1024 // len(FILLER.encode()))
+    response = Response()
+    response._content = full_search_page.replace(
+        "<footer", filler + "<footer"
+    ).encode()
+    response.encoding = "utf-8"
+    return response
+
+
+def parse_soup(body: bytes) -> None:
+    FlatParser.get_flat(BeautifulSoup(body, "html.parser"), URL, None)
+
+
+def parse_raw(body: bytes) -> None:
+    FlatParser.get_flat_from_page(body, URL, None)
+
+
+def parse_raw_json(body: bytes) -> None:
+    orjson = flat_parser.orjson
+    flat_parser.orjson = None
+    try:
+        FlatParser.get_flat_from_page(body, URL, None)
+    finally:
+        flat_parser.orjson = orjson
+
+
+def bench(padding_kb: int, runs: int) -> None:
+    parsers = [("soup", parse_soup), ("raw json", parse_raw_json)]
+    if flat_parser.orjson is not None:
+        parsers.append(("raw orjson", parse_raw))
+    for name, body in (
+        ("fixture", valid_script.encode()),
+        (f"{padding_kb} KB page", get_page(padding_kb)),
+    ):
+        print(f"{name}, {len(body) / 1024:.1f} KB")
+        for parser_name, parse in parsers:
+            # Building the tree of a large page takes long, fewer runs
+            count = max(1, runs // 50) if parse is parse_soup else runs
+            start = time.perf_counter()
+            for _ in range(count):
+                parse(body)
+            elapsed = (time.perf_counter() - start) / count
+            print(f"  {parser_name:11} {elapsed * 1e6:10.1f} us/listing")
+
+
+def bench_search(padding_kb: int, runs: int) -> None:
+    response = get_search_response(padding_kb)
+    print(f"search page, {len(response.content) / 1024:.1f} KB")
+    for html_parser in HTML_PARSERS:
+        if not is_html_parser_available(html_parser):
+            continue
+        parser_config = ParserConfig(html_parser=html_parser)
+        for name, parse in (
+            (
+                "full",
+                lambda html_parser=html_parser: BeautifulSoup(
+                    response.text, html_parser
+                ),
+            ),
+            (
+                "restricted",
+                lambda parser_config=parser_config: get_content(
+                    response, parser_config
+                ),
+            ),
+        ):
+            count = max(1, runs // 50)
+            start = time.perf_counter()
+            for _ in range(count):
+                parse()
+            elapsed = (time.perf_counter() - start) / count
+            print(
+                f"  {html_parser:11} {name:10}"
+                f" {elapsed * 1e3:8.2f} ms/page"
+            )
+
+
+if __name__ == "__main__":
+    # The fixture has no title, do not log its warning on every parse
+    logging.disable(logging.WARNING)
+    args = sys.argv[1:]
+    padding_kb = int(args[0]) if len(args) > 0 else 200
+    runs = int(args[1]) if len(args) > 1 else 1000
+    bench(padding_kb, runs)
+    bench_search(padding_kb, runs)
@@ -0,0 +1,95 @@
+"""Benchmark a full offline crawl of a recorded archive.
+
+Runs the search profiles of SEARCH_PARAMETERS.json through run_profiles
+against benchmarks.replay_server, without cache or conditional requests,
+and reports crawl throughput and DB ingest. flats, prices and the crawl
+checkpoints are emptied first, so it runs against the scratch database
+named by BENCH_DB_NAME, see benchmarks.scratch_db.
+
+Usage: python -m benchmarks.bench_replay ARCHIVE [latency]
+"""
+
+import sys
+import time
+from dataclasses import replace
+
+from benchmarks.replay_server import start_replay_server
+from benchmarks.scratch_db import check_scratch_db, get_scratch_path
+from benchmarks.stub_server import get_base_url
+from src.krisha.config.config import Config
+from src.krisha.config.parser import ParserConfig, with_base_url
+from src.krisha.config.path import get_app_path
+from src.krisha.config.search import get_search_profiles
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.db.checkpoint import create_checkpoints
+from src.krisha.db.service import get_connection_pool
+from src.krisha.main import run_profiles
+
+
+def get_replay_config(base_url: str) -> Config:
+    parser_config = replace(
+        with_base_url(ParserConfig(), base_url),
+        cache_max_mb=0,
+        conditional_get=False,
+        rate_limit=1000,
+        rate_burst=ParserConfig.max_workers,
+    )
+    path = get_scratch_path(get_app_path())
+    profiles = get_search_profiles(path.search_params_file, parser_config)
+    return Config(
+        path=path,
+        parser_config=parser_config,
+        search_params=profiles[0],
+        search_profiles=profiles,
+    )
+
+
+def reset_db(pool) -> None:
+    check_scratch_db(pool.connect_kwargs["dbname"])
+    with pool.connection() as connector:
+        create_checkpoints(connector)
+        with connector.connection.cursor() as cursor:
+            cursor.execute("TRUNCATE crawl_checkpoints, prices, flats;")
+        connector.connection.commit()
+
+
+def count_flats(pool) -> int:
+    with pool.connection() as connector:
+        with connector.connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM flats;")
+            return cursor.fetchone()[0]
+
+
+def bench(archive_file: str, latency: float) -> None:
+    server = start_replay_server(archive_file, latency=latency)
+    config = get_replay_config(get_base_url(server))
+    print(
+        f"{len(server.responses)} archived responses,"
+        f" {latency * 1000:.0f} ms latency per request"
+    )
+    workers = config.parser_config.profile_workers
+    with (
+        HttpClient.from_config(config) as client,
+        get_connection_pool(config.path, workers) as pool,
+        ParsePool.from_config(config) as parse_pool,
+    ):
+        reset_db(pool)
+        start = time.perf_counter()
+        run_profiles(config, client, pool, parse_pool)
+        elapsed = time.perf_counter() - start
+        flats = count_flats(pool)
+    print(
+        f"  {elapsed:7.2f} s {client.stats.requests} requests"
+        f" {client.stats.requests / elapsed:8.1f} requests/s"
+        f" {flats} flats {flats / elapsed:8.1f} flats/s"
+        f" {server.missing} not archived"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    bench(
+        archive_file=sys.argv[1],
+        latency=float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+    )
@@ -0,0 +1,134 @@
+"""Benchmark a full crawl of the synthetic krisha.kz simulator.
+
+Crawls a search of the given number of listings through run_profiles,
+then moves the simulator to its next epoch, where the churn fraction of
+prices has changed, and crawls it again. Reports listings/s, the answers
+the simulator sent, the detail pages it served and the dead-lettered Ads
+of each pass. The flats, prices and crawl checkpoint tables are emptied
+first, so it runs against the scratch database named by BENCH_DB_NAME,
+see benchmarks.scratch_db.
+
+Usage: python -m benchmarks.bench_simulator [listings] [latency]
+    [rate_429] [rate_5xx] [churn] [parse_processes]
+
+latency is a distribution such as const:0.05 or lognormal:0.05:0.5,
+see benchmarks.simulator. Pages are parsed in the crawling threads, or
+by parse_processes processes, -1 for one per core.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+from benchmarks.bench_fetch import get_stub_config
+from benchmarks.bench_replay import count_flats, reset_db
+from benchmarks.scratch_db import get_scratch_path
+from benchmarks.simulator import SimulatorSettings, start_simulator
+from benchmarks.stub_server import get_base_url
+from src.krisha.config.search import SearchParameters
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.db.service import get_connection_pool
+from src.krisha.main import run_profiles
+
+PASSES = 2
+
+
+def get_simulator_config(
+    base_url: str, dead_letters_file: str, parse_processes: int = 0
+):
+    config = get_stub_config(
+        base_url,
+        parse_processes=parse_processes,
+        cache_max_mb=0,
+        conditional_get=False,
+        rate_limit=1000,
+        retry_delay=(0.2, 0.5, 1),
+        page_retry_delay=(0.2, 0.5),
+    )
+    profile = SearchParameters(config.parser_config, city=0, name="bench")
+    return replace(
+        config,
+        path=replace(
+            get_scratch_path(config.path), dead_letters_file=dead_letters_file
+        ),
+        search_params=profile,
+        search_profiles=[profile],
+    )
+
+
+def count_prices(pool) -> int:
+    with pool.connection() as connector:
+        with connector.connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM prices;")
+            return cursor.fetchone()[0]
+
+
+def count_lines(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as file:
+        return sum(1 for _ in file)
+
+
+def bench(settings: SimulatorSettings, parse_processes: int = 0) -> None:
+    server = start_simulator(settings)
+    dead_letters_file = os.path.join(
+        tempfile.mkdtemp(prefix="krisha-sim-"), "dead_letters.jsonl"
+    )
+    config = get_simulator_config(
+        get_base_url(server), dead_letters_file, parse_processes
+    )
+    print(
+        f"{settings.listings} listings on {server.pages} pages,"
+        f" latency {settings.latency}, {settings.rate_429:.0%} 429,"
+        f" {settings.rate_5xx:.0%} 5xx, {settings.churn:.0%} churn"
+    )
+    workers = config.parser_config.profile_workers
+    with (
+        HttpClient.from_config(config) as client,
+        get_connection_pool(config.path, workers) as pool,
+        ParsePool.from_config(config) as parse_pool,
+    ):
+        reset_db(pool)
+        for crawl in range(1, PASSES + 1):
+            server.statuses.clear()
+            server.pages_served.clear()
+            requests_before = client.stats.requests
+            prices_before = count_prices(pool)
+            dead_before = count_lines(dead_letters_file)
+            start = time.perf_counter()
+            run_profiles(config, client, pool, parse_pool)
+            elapsed = time.perf_counter() - start
+            statuses = " ".join(
+                f"{status}:{count}"
+                for status, count in sorted(server.statuses.items())
+            )
+            print(
+                f"  pass {crawl} {elapsed:7.2f} s"
+                f" {server.listings / elapsed:8.1f} listings/s"
+                f" {client.stats.requests - requests_before} requests"
+                f" [{statuses}]"
+                f" {server.pages_served['detail']} detail pages"
+                f" {count_flats(pool)} flats"
+                f" {count_prices(pool) - prices_before} new prices"
+                f" {count_lines(dead_letters_file) - dead_before} dead"
+            )
+            server.next_epoch()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    bench(
+        SimulatorSettings(
+            listings=int(args[0]) if len(args) > 0 else 1000,
+            latency=args[1] if len(args) > 1 else "const:0.05",
+            rate_429=float(args[2]) if len(args) > 2 else 0.0,
+            rate_5xx=float(args[3]) if len(args) > 3 else 0.0,
+            churn=float(args[4]) if len(args) > 4 else 0.1,
+        ),
+        parse_processes=int(args[5]) if len(args) > 5 else 0,
+    )
@@ -0,0 +1,90 @@
+"""Serve a recorded response archive as a local krisha.kz.
+
+Record a crawl with KRISHA_RECORD_FILE=crawl.jsonl.gz, then serve it:
+
+    python -m benchmarks.replay_server crawl.jsonl.gz [port] [latency]
+
+and run the crawler against it offline:
+
+    KRISHA_BASE_URL=http://127.0.0.1:8000 python -m src.krisha.main
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.krisha.crawler.archive import get_archive_key, load_archive
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Answer each path and query with its archived response."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)
+        record = self.server.responses.get(get_archive_key(self.path))
+        if record is None:
+            self.server.missing += 1
+            self.send_error(404)
+            return
+        headers = record["headers"]
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = record["body"].encode()
+        self.send_response(record["status"])
+        for name, value in headers.items():
+            if name != "Content-Type":
+                self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    latency = 0.0
+    missing = 0
+    responses: dict = {}
+
+
+def start_replay_server(
+    archive_file: str, port: int = 0, latency: float = 0.0
+) -> ReplayServer:
+    """Start serving archive_file in a daemon thread."""
+    server = ReplayServer(("127.0.0.1", port), ReplayHandler)
+    server.responses = load_archive(archive_file)
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    replay_server = start_replay_server(
+        sys.argv[1],
+        port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000,
+        latency=float(sys.argv[3]) if len(sys.argv) > 3 else 0.0,
+    )
+    host, port = replay_server.server_address[:2]
+    print(
+        f"Serving {len(replay_server.responses)} responses"
+        f" on http://{host}:{port}"
+    )
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        replay_server.shutdown()
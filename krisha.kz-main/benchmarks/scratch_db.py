@@ -0,0 +1,30 @@
+"""Scratch database of the benchmarks which empty flats and prices.
+
+BENCH_DB_NAME names it and must differ from DB_NAME, the database the
+crawler saves to, the other DB_* variables are shared.
+"""
+
+import os
+import sys
+from dataclasses import replace
+
+from src.krisha.config.path import AppPaths, get_app_path
+
+
+def check_scratch_db(db_name: str) -> None:
+    """Exit unless db_name is the scratch database."""
+    scratch = os.environ.get("BENCH_DB_NAME", "")
+    if not scratch or scratch == get_app_path().db_name:
+        sys.exit(
+            "Set BENCH_DB_NAME to a scratch database other than DB_NAME,"
+            " its tables are emptied"
+        )
+    if db_name != scratch:
+        sys.exit(f"Refusing to empty {db_name}, BENCH_DB_NAME is {scratch}")
+
+
+def get_scratch_path(path: AppPaths) -> AppPaths:
+    """Point path at the scratch database, exiting if it is not set."""
+    scratch = os.environ.get("BENCH_DB_NAME", "")
+    check_scratch_db(scratch)
+    return replace(path, db_name=scratch)
@@ -0,0 +1,176 @@
+"""Synthetic krisha.kz for crawler stress tests.
+
+Serves a search of any number of listings with the stub's page formats,
+random per-request latency, injected 429 and 5xx answers, and prices
+that change between epochs, i.e. between crawls of the same search.
+Each epoch can also publish new listings. A search sorted by
+sort_by=add_date-desc lists the newest first.
+
+Latency distributions are given as "const:S", "uniform:LOW:HIGH",
+"exp:MEAN" or "lognormal:MEDIAN:SIGMA", in seconds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from urllib.parse import SplitResult, parse_qs, urlsplit
+
+from benchmarks.stub_server import (
+    ADS_ON_PAGE,
+    ANALYTICS_PAGE,
+    FIRST_AD_ID,
+    StubHandler,
+    StubServer,
+    get_detail_page,
+    get_price,
+    get_search_page,
+)
+
+
+@dataclass
+class SimulatorSettings:
+    listings: int = 1000
+    latency: str = "const:0.05"
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    churn: float = 0.0
+    growth: int = 0
+    seed: int = 0
+
+
+def get_latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    kind, *args = spec.split(":")
+    values = [float(arg) for arg in args]
+    samplers = {
+        "const": lambda value: lambda: value,
+        "uniform": lambda low, high: lambda: rng.uniform(low, high),
+        "exp": lambda mean: lambda: rng.expovariate(1 / mean),
+        "lognormal": lambda median, sigma: lambda: rng.lognormvariate(
+            math.log(median), sigma
+        ),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution {spec!r}")
+    return samplers[kind](*values)
+
+
+def is_churned(seed: int, ad_id: int, epoch: int, churn: float) -> bool:
+    """Whether the price of ad_id changes at epoch, stable across calls."""
+    digest = hashlib.blake2b(
+        f"{seed}:{ad_id}:{epoch}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") / 2**64 < churn
+
+
+class SimulatorHandler(StubHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        server = self.server
+        self.close_connection = False
+        time.sleep(server.sample_latency())
+        status = server.sample_error()
+        if status:
+            server.count(status)
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.get_body(urlsplit(self.path))
+        if body is None:
+            server.count(404)
+            self.send_error(404)
+            return
+        server.count(200)
+        self.send_body(body)
+
+    def get_body(self, url: SplitResult) -> str | None:
+        server = self.server
+        if url.path.startswith("/prodazha/kvartiry"):
+            server.count_page("search")
+            query = parse_qs(url.query)
+            page = int(query.get("page", ["1"])[0])
+            return get_search_page(
+                page,
+                server.pages,
+                server.listings,
+                server.get_price,
+                newest_first=query.get("sort_by") == ["add_date-desc"],
+            )
+        if url.path.startswith("/analytics/aPriceAnalysis"):
+            server.count_page("analytics")
+            ad_id = int(parse_qs(url.query)["id"][0])
+            return ANALYTICS_PAGE.format(percent=ad_id % 30)
+        if url.path.startswith("/a/show/"):
+            server.count_page("detail")
+            ad_id = int(url.path.rstrip("/").split("/")[-1])
+            if not server.is_listed(ad_id):
+                return None
+            return get_detail_page(ad_id, server.get_price(ad_id))
+        return None
+
+
+class SimulatorServer(StubServer):
+    settings: SimulatorSettings
+
+    def setup_simulation(self, settings: SimulatorSettings) -> None:
+        self.settings = settings
+        self.listings = settings.listings
+        self.pages = max(math.ceil(self.listings / ADS_ON_PAGE), 1)
+        self.epoch = 0
+        self.rng = random.Random(settings.seed)
+        self.sample_latency = get_latency_sampler(settings.latency, self.rng)
+        self.statuses = Counter()
+        self.pages_served = Counter()
+        self.stats_lock = threading.Lock()
+
+    def sample_error(self) -> int | None:
+        draw = self.rng.random()
+        if draw < self.settings.rate_429:
+            return 429
+        if draw < self.settings.rate_429 + self.settings.rate_5xx:
+            return 503
+        return None
+
+    def count(self, status: int) -> None:
+        with self.stats_lock:
+            self.statuses[status] += 1
+
+    def count_page(self, kind: str) -> None:
+        with self.stats_lock:
+            self.pages_served[kind] += 1
+
+    def is_listed(self, ad_id: int) -> bool:
+        return FIRST_AD_ID <= ad_id < FIRST_AD_ID + self.listings
+
+    def get_price(self, ad_id: int) -> int:
+        """Price at the current epoch, 10000 up per churned epoch."""
+        settings = self.settings
+        changes = sum(
+            is_churned(settings.seed, ad_id, epoch, settings.churn)
+            for epoch in range(1, self.epoch + 1)
+        )
+        return get_price(ad_id) + 10000 * changes
+
+    def next_epoch(self) -> None:
+        """Move prices on and publish new listings, as between two crawls."""
+        self.epoch += 1
+        self.listings += self.settings.growth
+        self.pages = max(math.ceil(self.listings / ADS_ON_PAGE), 1)
+
+
+def start_simulator(
+    settings: SimulatorSettings, port: int = 0
+) -> SimulatorServer:
+    """Start the simulator in a daemon thread."""
+    server = SimulatorServer(("127.0.0.1", port), SimulatorHandler)
+    server.setup_simulation(settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
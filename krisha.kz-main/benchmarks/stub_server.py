@@ -0,0 +1,176 @@
+"""Local stub of krisha.kz detail and analytics pages for benchmarks."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import SplitResult, parse_qs, urlsplit
+
+DETAIL_PAGE = """<html><body>
+<div class="offer__price">{price} ₸</div>
+<script id="jsdata">
+var data = {jsdata};
+</script>
+</body></html>"""
+
+SEARCH_PAGE = """<html><body>
+<div class="a-search-subtitle">Найдено {ads_count} объявлений</div>
+<section class="a-search-list">
+{cards}
+</section>
+<nav class="paginator">{paginator}</nav>
+</body></html>"""
+
+SEARCH_CARD = """<div class="a-card" data-id="{ad_id}">
+<a class="a-card__title" href="/a/show/{ad_id}">{rooms}-комнатная квартира</a>
+<div class="a-card__price">{price} ₸</div>
+</div>"""
+
+NEXT_BUTTON = (
+    '<a class="paginator__btn paginator__btn--next" '
+    'href="/prodazha/kvartiry/?{sort}page={page}">Дальше</a>'
+)
+
+ANALYTICS_PAGE = """<html><body>
+<div class="text">Цена ниже рыночной на
+<span class="green-price">{percent}%</span></div>
+</body></html>"""
+
+
+FIRST_AD_ID = 100000
+ADS_ON_PAGE = 20
+
+
+def get_price(ad_id: int) -> int:
+    return 30000000 + ad_id % 1000
+
+
+def get_search_page(
+    page: int,
+    pages: int,
+    ads_count: int | None = None,
+    price_of: Callable[[int], int] = get_price,
+    newest_first: bool = False,
+) -> str:
+    """Search page of ads_count Ads, pages full pages by default.
+
+    Ads are listed by ascending id, or descending with newest_first.
+    """
+    if ads_count is None:
+        ads_count = pages * ADS_ON_PAGE
+    ad_ids = range(FIRST_AD_ID, FIRST_AD_ID + ads_count)
+    if newest_first:
+        ad_ids = ad_ids[::-1]
+    cards = "\n".join(
+        SEARCH_CARD.format(
+            ad_id=ad_id, rooms=1 + ad_id % 4, price=price_of(ad_id)
+        )
+        for ad_id in ad_ids[(page - 1) * ADS_ON_PAGE : page * ADS_ON_PAGE]
+    )
+    paginator = f"{page} {pages}"
+    if page < pages:
+        sort = "sort_by=add_date-desc&" if newest_first else ""
+        paginator += " " + NEXT_BUTTON.format(sort=sort, page=page + 1)
+    return SEARCH_PAGE.format(
+        ads_count=ads_count, cards=cards, paginator=paginator
+    )
+
+
+def get_detail_page(ad_id: int, price: int) -> str:
+    return DETAIL_PAGE.format(price=price, jsdata=get_jsdata(ad_id, price))
+
+
+def get_jsdata(ad_id: int, price: int | None = None) -> str:
+    return json.dumps(
+        {
+            "advert": {
+                "id": ad_id,
+                "map": {"lat": 43.26, "lon": 76.96},
+                "price": get_price(ad_id) if price is None else price,
+                "rooms": 1 + ad_id % 4,
+                "square": 30 + ad_id % 70,
+            },
+            "adverts": [
+                {
+                    "description": f"Квартира {ad_id}",
+                    "fullAddress": "Алматы, Бостандыкский р-н, Абая",
+                    "title": f"{1 + ad_id % 4}-комнатная квартира",
+                    "uuid": f"00000000-0000-0000-0000-{ad_id:012d}",
+                }
+            ],
+        },
+        ensure_ascii=False,
+    )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve generated search, detail (/a/show/<id>) and analytics pages."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)
+        body = self.get_body(urlsplit(self.path))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_body(body)
+
+    def get_body(self, url: SplitResult) -> str | None:
+        if url.path.startswith("/prodazha/kvartiry"):
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            return get_search_page(page, self.server.pages)
+        if url.path.startswith("/analytics/aPriceAnalysis"):
+            ad_id = int(parse_qs(url.query)["id"][0])
+            return ANALYTICS_PAGE.format(percent=ad_id % 30)
+        if url.path.startswith("/a/show/"):
+            ad_id = int(url.path.rstrip("/").split("/")[-1])
+            return get_detail_page(ad_id, get_price(ad_id))
+        return None
+
+    def send_body(self, body: str) -> None:
+        data = body.encode()
+        etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    latency = 0.0
+    pages = 1
+
+
+def start_stub_server(
+    latency: float = 0.05, pages: int = 1, port: int = 0
+) -> StubServer:
+    """Start the stub in a daemon thread, on a free local port by default."""
+    server = StubServer(("127.0.0.1", port), StubHandler)
+    server.latency = latency
+    server.pages = pages
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_base_url(server: StubServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
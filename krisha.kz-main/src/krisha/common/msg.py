@@ -12,12 +12,64 @@ REQUEST_ERROR = "Request - GET {} - {}"
 # RESPONSE
 RESPONSE = "Response - Status code {}"
 
+# HTTP
+HTTP_STATS = (
+    "HTTP - {} requests over {} connections, {} reused, "
+    "{:.1f} MB received, {:.1f} seconds waited for rate limit"
+)
+HTTP_CACHE_STATS = (
+    "HTTP - Cache {} hits, {} misses, {} stored, {} evicted, "
+    "{:.1f} MB not downloaded"
+)
+HTTP_VALIDATOR_STATS = (
+    "HTTP - Conditional GET {} not modified, {} same hash, "
+    "{:.2f} MB not downloaded, {} Ads not parsed, "
+    "{:.2f} seconds of parsing saved"
+)
+HTTP_ARCHIVE_STATS = "HTTP - {} responses recorded to {}"
+HTTP_CACHE_READ_ERROR = "HTTP - Cached body of {} not read: {}"
+
+# CONCURRENCY
+CC_LIMIT_CHANGE = "Concurrency - Limit {} -> {}: {}"
+CC_REASON_CLEAN = "clean window, p95 latency {:.2f} s"
+CC_REASON_LATENCY_LIMIT = "p95 latency {:.2f} s is over the limit"
+CC_REASON_LATENCY_GROWTH = "p95 latency {:.2f} s rose from {:.2f} s"
+CC_REASON_STATUS = "response status {}"
+CC_REASON_ERROR = "request error {}"
+CC_STATS = "Concurrency - Final limit {}, {} increases, {} decreases"
+
+# SHARDS
+SH_LOAD_ERROR = "Shards - Saved partitioning not loaded: {}"
+SH_LOADED = "Shards - Reusing saved partitioning into {} price shards"
+SH_PARTITIONED = "Shards - Search partitioned into {} price shards"
+SH_START = "Shards - Crawling prices {} - {} with {} ads"
+SH_ERROR = "Shards - Crawl of prices {} - {} failed: {}"
+
+# FRONTIER
+FR_CREATED = "Frontier - crawl_queue CHECK OK"
+FR_WORKER_START = "Frontier - Worker {} START, {} profiles seeded"
+FR_CLAIMED = "Frontier - Claimed {} search pages and {} Ads"
+FR_ENQUEUED = "Frontier - Profile {} page {}: queued {} pages and {} new Ads"
+FR_IDLE = "Frontier - Nothing due, {} items left, polling in {} seconds"
+FR_HEARTBEAT_ERROR = "Frontier - Lease heartbeat failed: {}"
+FR_RELEASED = "Frontier - {} Ads left unprocessed, released for retry: {}"
+FR_PAGE_ERROR = "Frontier - Error reading page {}: {}"
+FR_ADS_ERROR = "Frontier - Failed to process Ads: {}"
+FR_WORKER_STOPPED = "Frontier - Worker {} STOPPED, queue is empty"
+
 # CRAWLER
 CR_LOGGER_CONFIG_OK = "Crawler - Logging configured successfully"
 CR_LOGGER_CONFIG_WRONG = (
     "logging config file not found, use basic config.\n    ERROR: {}"
 )
 LOAD_PARSER_CONFIG_OK = "Crawler - Load parser config OK"
+LOAD_BASE_URL = "Crawler - Crawling {} instead of krisha.kz"
+LOAD_INCREMENTAL = "Crawler - Incremental crawl of the newest listings"
+LOAD_HTML_PARSER = "Crawler - Search pages parsed with {}"
+LOAD_HTML_PARSER_ERROR = (
+    "Crawler - HTML parser {} is unknown or not installed, {} is used"
+)
+PARSE_POOL_START = "Crawler - Pages parsed by {} processes"
 LOAD_SEARCH_PARAMS_ERROR = (
     "Crawler - Load search parameters ERROR. Use basic parameters. "
     "\n     ERROR: {}"
@@ -35,6 +87,80 @@ CR_ADS_ON_PAGE_OK = "Crawler - Ads data on page has been processed"
 CR_NEXT_PAGE_OK = "Crawler - Next page url found"
 CR_SKIP_AD = "Crawler - Ad will be skipped due to unavailability of page"
 CR_SLEEP = "Crawler - Sleep {} seconds"
+CR_RETRY_DEFERRED = "Crawler - Ad {} deferred, retry {} in {} seconds"
+CR_RETRY_DUE = "Crawler - Retrying {} deferred Ads"
+CR_CHECKPOINT_RESUME = (
+    "Crawler - Resuming from checkpoint: {} of {} pages done, "
+    "{} Ads deferred"
+)
+CR_CHECKPOINT_ERROR = "Crawler - Checkpoint not saved: {}"
+CR_INTERRUPTED = (
+    "Crawler - Shutting down with {} of {} pages done, "
+    "{} Ads pending in the checkpoint"
+)
+CR_SHUTDOWN = "Crawler - Received shutdown signal, stopping the crawl"
+CR_RETRY_WAIT = "Crawler - Waiting {:.0f} seconds for {} deferred Ads"
+CR_DEAD_LETTER = "Crawler - Ad {} moved to dead letters: {}"
+CR_DEAD_LETTER_STATS = "Crawler - {} Ads moved to dead letters, see {}"
+CR_MAX_MISSED = "Crawler - Maximum missed Ad limit reached: {}"
+CR_MAX_RETRIES = "Crawler - Max retries reached for {}"
+CR_PAGE_ERROR = "Crawler - Error reading page {} (attempt {}/{}): {}"
+CR_PAGE_SKIPPED = (
+    "Crawler - Maximum errors reached for page {}, moving to next page"
+)
+CR_PAGE_REFRESH_ERROR = "Crawler - Failed to refresh page content: {}"
+CR_NEXT_PAGE_ERROR = (
+    "Crawler - Failed to proceed to next page (attempt {}/{}): {}"
+)
+CR_NEXT_PAGE_STOP = (
+    "Crawler - Could not proceed to next page after maximum retries. "
+    "Stopping pagination"
+)
+CR_PRODUCER_ERROR = "Crawler - Search page producer failed: {}"
+CR_FILTER_ERROR = "Crawler - Error filtering Ads (attempt {}/{}): {}"
+CR_FILTER_FAILED = (
+    "Crawler - Could not filter Ads on page {}, continuing with all Ads"
+)
+CR_RECONNECT = "Crawler - Attempting to reconnect to database"
+CR_RECONNECT_ERROR = "Crawler - Failed to reconnect: {}"
+# Lazy %-style arguments, formatted only when debug logging is on
+CR_NEW_LISTING = "Crawler - New listing found: %s"
+CR_REPRICED_LISTING = "Crawler - Listing %s repriced: %s -> %s"
+CR_PAGE_NOTHING_NEW = "Crawler - Page {}/{}: No new listings to process"
+CR_PAGE_FOUND = "Crawler - Page {}/{}: Found {} new or updated listings"
+CR_FLATS_ERROR = "Crawler - Error processing flats data (attempt {}/{}): {}"
+CR_PAGE_INSERTED = "Crawler - Page {}/{}: Inserted {} listings"
+CR_PAGE_NOTHING_INSERTED = (
+    "Crawler - Page {}/{}: No listings to insert after processing"
+)
+CR_INSERT_ERROR = "Crawler - Failed to insert flats data: {}"
+CR_CHECKED_ERROR = "Crawler - Failed to save the rechecked flats: {}"
+CR_DEADLOCK = "Crawler - Deadlock detected (attempt {}/{}): {}"
+CR_DB_ERROR = "Crawler - Database operational error (attempt {}/{}): {}"
+CR_RESTART = "Crawler - Restarting crawler in {} seconds"
+CR_GIVE_UP = "Crawler - Maximum retries reached after database errors"
+CR_UNRECOVERABLE = "Crawler - Unrecoverable error: {}"
+CR_URL_ADS_NOT_FOUND = (
+    "Crawler - No ads found for URL: {}. "
+    "Try using different search parameters"
+)
+AN_FETCH_ERROR = "Analytics - Request to {} failed: {}"
+AN_STATS = (
+    "Analytics - {} Flats queued for green_percentage, {} enriched, "
+    "{} failed"
+)
+AN_WRITE_ERROR = "Analytics - green_percentage not saved: {}"
+AN_BACKFILL_START = "Analytics - Backfilling green_percentage of {} Flats"
+SEEN_OPENED = "Seen filter - Opened with {} of {} ids, {:.1f} MB mapped"
+SEEN_FULL = (
+    "Seen filter - {} ids over the capacity of {}, false positives rise, "
+    "rebuild it"
+)
+SEEN_INVALID = "Seen filter - Replacing an unreadable filter: {}"
+SEEN_REBUILT = (
+    "Seen filter - {} rebuilt with {} ids for a capacity of {}: "
+    "{:.1f} MB, {} hashes, {:.2f} s, measured false-positive rate {:.4f}"
+)
 CR_SOUP_FIND_ERROR = "Crawler - Soup data < {} > not found"
 CR_JS_PARS_ERROR = "Crawler - Unable to find JS script"
 CR_JSON_ERROR = "Crawler - Json load error: \n      ERROR: {}"
@@ -49,6 +175,28 @@ CR_CITY_VALIDATE = (
     "An integer from 0 to 20 is required. "
     "Default value < {} > will be used"
 )
+CR_NAME_VALIDATE = (
+    "Crawler - Parameter 'name' contains unavailable type: {}. "
+    "Value must be a string. The profile will be named by its position"
+)
+CR_PROFILES_EMPTY = "Search parameters file contains no profiles"
+CR_PROFILE_START = "Crawler - Profile {} START with URL: {}"
+CR_PROFILE_STATS = (
+    "Crawler - Profile {}: {} pages, {} ads, {} saved in {:.0f} seconds "
+    "({:.2f} ads/s)"
+)
+CR_KNOWN_LOADED = (
+    "Crawler - {} known listings loaded ({:.1f} MB) in {:.2f} seconds"
+)
+CR_EARLY_STOP = (
+    "Crawler - Nothing changed on the last {} pages, "
+    "incremental crawl stopped at page {} of {}"
+)
+CR_PRICE_CHANGES = (
+    "Crawler - {} new listings, {} price changes recorded, "
+    "{} known listings rechecked"
+)
+CR_PROFILE_ERROR = "Crawler - Profile {} FAILED: {}"
 CR_BOOL_VALIDATE = (
     "Crawler - Parameter  < {} > contains unavailable type: {}. "
     "Value must be True or False. "
@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from src.krisha.config.logs import setup_logs
 from src.krisha.config.parser import ParserConfig, get_parser_config
 from src.krisha.config.path import AppPaths, get_app_path
-from src.krisha.config.search import SearchParameters, get_search_parameters
+from src.krisha.config.search import SearchParameters, get_search_profiles
 
 
 @dataclass
@@ -13,17 +13,19 @@ class Config:
     path: AppPaths
     parser_config: ParserConfig
     search_params: SearchParameters
+    search_profiles: list[SearchParameters] = field(default_factory=list)
 
 
 def load_config() -> Config:
     path = get_app_path()
     setup_logs(path)
     parser_config = get_parser_config()
-    search_params = get_search_parameters(
+    search_profiles = get_search_profiles(
         path.search_params_file, parser_config
     )
     return Config(
         path=path,
         parser_config=parser_config,
-        search_params=search_params,
+        search_params=search_profiles[0],
+        search_profiles=search_profiles,
     )
@@ -1,6 +1,8 @@
 import logging.config
+import logging.handlers
 import os
 from logging import Logger
+from multiprocessing import Queue
 
 import src.krisha.common.msg as msg
 from src.krisha.config.path import AppPaths
@@ -30,3 +32,16 @@ def get_logging_config(file_name: str) -> Logger:
 def setup_logs(path: AppPaths) -> None:
     create_logs_dir(path.logs_dir)
     get_logging_config(path.logging_config_file)
+
+
+def setup_queue_logs(queue: Queue, level: int) -> None:
+    """Send the records of a worker process to queue.
+
+    The parent writes them with its own handlers, so only one process
+    opens and rotates the log file.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(queue))
+    root.setLevel(level)
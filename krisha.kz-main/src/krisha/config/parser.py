@@ -1,10 +1,15 @@
+import importlib.util
 import logging
-from dataclasses import dataclass, field
+import os
+from dataclasses import dataclass, field, replace
 
 import src.krisha.common.msg as msg
 
 logger = logging.getLogger()
 
+# BeautifulSoup parsers, with the package each one needs
+HTML_PARSERS = {"html.parser": None, "lxml": "lxml"}
+
 
 def default_user_agent():
     return {
@@ -48,12 +53,51 @@ class ParserConfig:
     ads_on_page: int = 20
     sleep_time: int = 2
     timeout: int = 20
+    min_workers: int = 1
+    max_workers: int = 8
+    workers_window: int = 20
+    workers_backoff: float = 0.5
+    latency_limit_ratio: float = 0.25
+    latency_growth: float = 3.0
+    pool_size: int = 10
+    prefetch_pages: int = 2
+    parallel_pages: bool = False
+    profile_workers: int = 4
+    shard_processes: int = 1
+    shard_max_pages: int = 50
+    shard_price_ceiling: int = 10_000_000_000
+    shard_min_band: int = 1000
+    shard_max_age_days: int = 7
+    checkpoint_max_age_hours: int = 12
+    cache_max_mb: int = 0
+    conditional_get: bool = True
+    cache_ttl_search: int = 15 * 60
+    cache_ttl_detail: int = 12 * 3600
+    cache_ttl_analytics: int = 24 * 3600
+    analytics_workers: int = 2
+    recheck_budget: int = 100
+    recheck_days: int = 7
+    preload_known_listings: bool = True
+    html_parser: str = "html.parser"
+    parse_processes: int = 0
+    incremental: bool = False
+    incremental_quiet_pages: int = 2
+    frontier: bool = False
+    frontier_batch: int = 20
+    frontier_lease: int = 120
+    frontier_heartbeat: int = 30
+    frontier_idle_poll: int = 5
+    frontier_revisit_hours: int = 12
+    rate_limit: float = 2.0
+    rate_burst: int = 4
     max_skip_ad: int = 5
     retry_delay: tuple = (15, 60, 300, 1200, 3600)
+    page_retry_delay: tuple = (5, 30, 120)
     min_price: int = 0
     min_rooms: int = 0
     max_rooms: int = 5
     home_url: str = "https://krisha.kz"
+    price_analyze_url: str = "https://krisha.kz/analytics/aPriceAnalysis/?id="
     rent_url: str = "https://krisha.kz/prodazha/kvartiry/"
     sep: str = "&das"
     q_pref: str = "?das"
@@ -65,9 +109,68 @@ class ParserConfig:
     prices_from_url: str = "[price][from]="
     prices_to_url: str = "[price][to]="
     owner_url: str = "[who]=1"
+    page_url: str = "page="
+    sort_newest_url: str = "sort_by=add_date-desc"
     cities_url_map: dict = field(default_factory=get_cities_url_map)
 
 
+def with_base_url(parser_config: ParserConfig, base_url: str) -> ParserConfig:
+    """Parser config crawling base_url instead of krisha.kz."""
+    home_url = parser_config.home_url
+    return replace(
+        parser_config,
+        home_url=base_url,
+        price_analyze_url=parser_config.price_analyze_url.replace(
+            home_url, base_url, 1
+        ),
+        rent_url=parser_config.rent_url.replace(home_url, base_url, 1),
+    )
+
+
+def is_html_parser_available(name: str) -> bool:
+    if name not in HTML_PARSERS:
+        return False
+    module = HTML_PARSERS[name]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
 def get_parser_config() -> ParserConfig:
+    """Parser config, crawling KRISHA_BASE_URL if set, e.g. a replay stub.
+
+    KRISHA_INCREMENTAL=1 selects the incremental crawl of new listings,
+    for frequent runs between full crawls. KRISHA_HTML_PARSER selects the
+    BeautifulSoup parser of search pages, one of HTML_PARSERS, if its
+    package is installed. KRISHA_PARSE_PROCESSES sets the processes which
+    parse fetched pages, -1 for one per core, 0 (the default) parses them
+    in the crawler's threads. KRISHA_CACHE_MB turns the response cache on
+    with that size, it is off by default.
+    """
+    parser_config = ParserConfig()
+    base_url = os.environ.get("KRISHA_BASE_URL")
+    if base_url:
+        parser_config = with_base_url(parser_config, base_url.rstrip("/"))
+        logger.info(msg.LOAD_BASE_URL.format(base_url))
+    if os.environ.get("KRISHA_INCREMENTAL") == "1":
+        parser_config = replace(parser_config, incremental=True)
+        logger.info(msg.LOAD_INCREMENTAL)
+    html_parser = os.environ.get("KRISHA_HTML_PARSER")
+    if html_parser:
+        if is_html_parser_available(html_parser):
+            parser_config = replace(parser_config, html_parser=html_parser)
+            logger.info(msg.LOAD_HTML_PARSER.format(html_parser))
+        else:
+            logger.warning(
+                msg.LOAD_HTML_PARSER_ERROR.format(
+                    html_parser, parser_config.html_parser
+                )
+            )
+    parse_processes = os.environ.get("KRISHA_PARSE_PROCESSES")
+    if parse_processes:
+        parser_config = replace(
+            parser_config, parse_processes=int(parse_processes)
+        )
+    cache_max_mb = os.environ.get("KRISHA_CACHE_MB")
+    if cache_max_mb:
+        parser_config = replace(parser_config, cache_max_mb=int(cache_max_mb))
     logger.info(msg.LOAD_PARSER_CONFIG_OK)
-    return ParserConfig()
+    return parser_config
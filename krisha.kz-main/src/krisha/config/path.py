@@ -14,6 +14,12 @@ class AppPaths:
     db_password: str = os.environ.get("DB_PASSWORD", "postgres")
     logging_config_file: str = "logging.ini"
     search_params_file: str = "SEARCH_PARAMETERS.json"
+    dead_letters_file: str = "logs/dead_letters.jsonl"
+    shards_file: str = "shards.json"
+    cache_dir: str = "cache/http"
+    validators_file: str = "cache/validators.sqlite"
+    seen_filter_file: str = "cache/seen_ids.bloom"
+    record_file: str = os.environ.get("KRISHA_RECORD_FILE", "")
 
 
 def get_app_path() -> AppPaths:
@@ -24,6 +24,7 @@ class SearchParameters:
         price_from: int = None
         price_to: int = None
         owner: bool = False
+        name: str = None
     """
 
     parser_config: ParserConfig
@@ -34,6 +35,7 @@ class SearchParameters:
     price_from: int | None = None
     price_to: int | None = None
     owner: bool = False
+    name: str | None = None
 
     def __post_init__(self) -> None:
         self.city = self._validate_city(
@@ -66,6 +68,7 @@ class SearchParameters:
             self.owner,
             "owner",
         )
+        self.name = self._validate_name(self.name)
 
     @staticmethod
     def _validate_city(city, parser_config: ParserConfig) -> int:
@@ -98,6 +101,13 @@ class SearchParameters:
         logger.warning(msg.CR_GET_PRICE_URL.format(name, type(value), None))
         return
 
+    @staticmethod
+    def _validate_name(name: Any) -> str | None:
+        if name is None or type(name) is str:
+            return name
+        logger.warning(msg.CR_NAME_VALIDATE.format(type(name)))
+        return
+
     @staticmethod
     def _validate_rooms(rooms, parser_config: ParserConfig) -> list | None:
         if rooms is None:
@@ -113,15 +123,28 @@ class SearchParameters:
         return valid_rooms if valid_rooms else None
 
 
-def get_search_parameters(
+def get_search_profiles(
     file_name: str,
     parser_config: ParserConfig,
-) -> SearchParameters:
+) -> list[SearchParameters]:
+    """Load search profiles, the file holds one profile or a list of them.
+
+    Profiles without a name are named by their position in the file.
+    """
     try:
         with open(file_name) as file:
-            search_params = SearchParameters(parser_config, **json.load(file))
-            logger.info(msg.LOAD_SEARCH_PARAMS_OK)
-            return search_params
+            data = json.load(file)
+        if isinstance(data, dict):
+            data = [data]
+        profiles = [
+            SearchParameters(parser_config, **params) for params in data
+        ]
+        if not profiles:
+            raise TypeError(msg.CR_PROFILES_EMPTY)
+        for num, profile in enumerate(profiles, 1):
+            profile.name = profile.name or f"profile-{num}"
+        logger.info(msg.LOAD_SEARCH_PARAMS_OK)
+        return profiles
     except (OSError, TypeError, JSONDecodeError) as error:
         logger.warning(msg.LOAD_SEARCH_PARAMS_ERROR.format(error))
-    return SearchParameters(parser_config)
+    return [SearchParameters(parser_config, name="profile-1")]
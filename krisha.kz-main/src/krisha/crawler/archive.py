@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import threading
+from collections.abc import Iterator
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests import Response
+
+import src.krisha.common.msg as msg
+
+logger = logging.getLogger()
+
+# Response headers kept in the archive, the rest do not affect the crawl
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ResponseArchive:
+    """Recording of every response the crawler receives.
+
+    Records are appended as gzip-compressed JSON lines holding the
+    requested URL, status, a few headers and the body. Each run appends a
+    gzip member, which gzip reads back as one stream. The archive is
+    served by benchmarks.replay_server for offline crawls.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = gzip.open(path, "at", encoding="utf-8")
+        self.records = 0
+
+    def record(self, response: Response) -> None:
+        record = {
+            "url": response.request.url,
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in KEPT_HEADERS
+                if name in response.headers
+            },
+            "body": response.text,
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.records += 1
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+        logger.info(msg.HTTP_ARCHIVE_STATS.format(self.records, self.path))
+
+
+def read_archive(path: str) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def get_archive_key(url: str) -> str:
+    """Path and query of url, which identify it whatever the host.
+
+    The URL is unquoted, so a search page URL has the same key raw and
+    as requests sends it, with its brackets quoted.
+    """
+    parts = urlsplit(unquote(url))
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def load_archive(path: str) -> dict[str, dict]:
+    """Archived responses by get_archive_key of their URL.
+
+    The last successful response of a URL wins, a 304 or an error never
+    replaces one.
+    """
+    responses = {}
+    for record in read_archive(path):
+        key = get_archive_key(record["url"])
+        ok = record["status"] == requests.codes.ok
+        if ok or key not in responses:
+            responses[key] = record
+    return responses
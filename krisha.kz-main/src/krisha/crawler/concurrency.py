@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+
+import src.krisha.common.msg as msg
+
+logger = logging.getLogger()
+
+
+def get_p95(latencies: list[float]) -> float:
+    ordered = sorted(latencies)
+    return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the number of requests in flight.
+
+    The limit grows by one after every `window` clean responses and is
+    multiplied by `backoff` on a failure (429, 5xx, timeout) or when the
+    window's p95 latency exceeds `latency_limit` or grows more than
+    `latency_growth` times over the best p95 seen in the run. At most one
+    decrease happens per `limit` completed requests, so a burst of errors
+    from the same wave of requests cuts the limit only once.
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        window: int,
+        backoff: float,
+        latency_limit: float,
+        latency_growth: float,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.backoff = backoff
+        self.latency_limit = latency_limit
+        self.latency_growth = latency_growth
+        self.limit = min_limit
+        self.in_flight = 0
+        self.latencies: list[float] = []
+        self.best_p95: float | None = None
+        self.since_decrease = 0
+        self.increases = 0
+        self.decreases = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, failure: str | None = None) -> None:
+        """Return a slot and record how the request went."""
+        with self.condition:
+            self.in_flight -= 1
+            self.since_decrease += 1
+            if failure:
+                self._decrease(failure)
+            else:
+                self.latencies.append(latency)
+                if len(self.latencies) >= self.window:
+                    self._close_window()
+            self.condition.notify_all()
+
+    def _close_window(self) -> None:
+        p95 = get_p95(self.latencies)
+        self.latencies.clear()
+        if self.best_p95 is None or p95 < self.best_p95:
+            self.best_p95 = p95
+        if p95 > self.latency_limit:
+            self._decrease(msg.CC_REASON_LATENCY_LIMIT.format(p95))
+        elif p95 > self.best_p95 * self.latency_growth:
+            self._decrease(
+                msg.CC_REASON_LATENCY_GROWTH.format(p95, self.best_p95)
+            )
+        elif self.limit < self.max_limit:
+            self._change(self.limit + 1, msg.CC_REASON_CLEAN.format(p95))
+            self.increases += 1
+
+    def _decrease(self, reason: str) -> None:
+        if self.since_decrease < self.limit:
+            return
+        limit = max(self.min_limit, math.floor(self.limit * self.backoff))
+        self.since_decrease = 0
+        self.latencies.clear()
+        if limit < self.limit:
+            self._change(limit, reason)
+            self.decreases += 1
+
+    def _change(self, limit: int, reason: str) -> None:
+        logger.info(msg.CC_LIMIT_CHANGE.format(self.limit, limit, reason))
+        self.limit = limit
+
+    def log_stats(self) -> None:
+        logger.info(
+            msg.CC_STATS.format(self.limit, self.increases, self.decreases)
+        )
@@ -0,0 +1,172 @@
+"""Deferred analytics enrichment of saved prices.
+
+green_percentage, how much cheaper an Ad is than comparable ones, comes
+from a separate aPriceAnalysis page. Instead of fetching it next to every
+detail page, Flats are saved without it and the pages of new or
+repriced Flats only are fetched by this stage, then written back to
+prices. Prices left without it by failed requests or an interrupted
+crawl are filled in by the backfill:
+
+    python -m src.krisha.crawler.enrichment [limit]
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import requests
+from bs4 import BeautifulSoup
+
+import src.krisha.common.msg as msg
+from src.krisha.config.config import load_config
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.db.base import DBConnection
+from src.krisha.db.queries import (
+    get_flats_without_green_percentage,
+    update_green_percentages,
+)
+from src.krisha.db.service import get_connection_pool
+from src.krisha.entities.flat import Flat
+
+logger = logging.getLogger()
+
+
+def extract_price_percent_diff(html: str) -> float:
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Находим блок с текстом сравнения цен
+    text_block = soup.find("div", class_="text")
+    if not text_block:
+        return 0
+
+    # Ищем элемент с процентом
+    percent_tag = text_block.find("span", class_="green-price")
+    if not percent_tag:
+        return 0
+
+    # Извлекаем текст и значение процента
+    percent_text = percent_tag.get_text(strip=True)
+    match = re.search(r"(\d+\.?\d*)%", percent_text)
+
+    return float(match.group(1)) if match else 0
+
+
+@dataclass
+class EnrichmentStats:
+    queued: int = 0
+    enriched: int = 0
+    failed: int = 0
+
+
+class AnalyticsEnricher:
+    """Queue of Flats waiting for their green_percentage.
+
+    Analytics pages are fetched by the enricher's own threads, so search
+    and detail pages do not wait for them, within the rate limit of the
+    shared client, and parsed by parse_pool. Results are written back to
+    prices by flush, on the connection of the crawler, whenever it calls
+    it. A failed request leaves the price to the backfill.
+    """
+
+    def __init__(
+        self, client: HttpClient, workers: int, parse_pool: ParsePool
+    ) -> None:
+        self.client = client
+        self.parse_pool = parse_pool
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="analytics"
+        )
+        self.lock = threading.Lock()
+        self.pending: list[Future] = []
+        self.stats = EnrichmentStats()
+
+    def submit(self, flat_ids: list[int]) -> None:
+        futures = [
+            self.executor.submit(self.fetch, flat_id) for flat_id in flat_ids
+        ]
+        with self.lock:
+            self.pending.extend(futures)
+            self.stats.queued += len(futures)
+
+    def submit_flats(self, flats_data: list[Flat]) -> None:
+        self.submit([flat.id for flat in flats_data])
+
+    def fetch(self, flat_id: int) -> tuple[int, float] | None:
+        url = self.client.parser_config.price_analyze_url + str(flat_id)
+        try:
+            response = self.client.get(url, conditional=False)
+        except requests.RequestException as error:
+            logger.error(msg.AN_FETCH_ERROR.format(url, error))
+            return None
+        if response.status_code != requests.codes.ok:
+            status = response.status_code
+            logger.error(msg.AN_FETCH_ERROR.format(url, status))
+            return None
+        percent = self.parse_pool.run(
+            extract_price_percent_diff, response.text
+        )
+        return flat_id, percent
+
+    def flush(self, connector: DBConnection, block: bool = False) -> int:
+        """Write the results which are ready, or all of them if block."""
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if block:
+            wait(pending)
+        done, running = [], []
+        for future in pending:
+            (done if future.done() else running).append(future)
+        with self.lock:
+            self.pending.extend(running)
+        results = [future.result() for future in done]
+        values = [result for result in results if result is not None]
+        if values:
+            update_green_percentages(connector, values)
+        with self.lock:
+            self.stats.enriched += len(values)
+            self.stats.failed += len(results) - len(values)
+        return len(values)
+
+    def close(self, connector: DBConnection) -> None:
+        """Wait for every queued Flat and write the results."""
+        try:
+            self.flush(connector, block=True)
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+        logger.info(
+            msg.AN_STATS.format(
+                self.stats.queued, self.stats.enriched, self.stats.failed
+            )
+        )
+
+
+def backfill(limit: int | None = None) -> None:
+    """Fetch green_percentage of the prices which have none or 0."""
+    config = load_config()
+    parser = config.parser_config
+    with (
+        HttpClient.from_config(config) as client,
+        get_connection_pool(config.path, 1) as pool,
+        ParsePool.from_config(config) as parse_pool,
+    ):
+        with pool.connection() as connector:
+            flat_ids = get_flats_without_green_percentage(connector, limit)
+            logger.info(msg.AN_BACKFILL_START.format(len(flat_ids)))
+            enricher = AnalyticsEnricher(
+                client, parser.analytics_workers, parse_pool
+            )
+            try:
+                enricher.submit(flat_ids)
+            finally:
+                enricher.close(connector)
+                client.log_stats()
+
+
+if __name__ == "__main__":
+    backfill(int(sys.argv[1]) if len(sys.argv) > 1 else None)
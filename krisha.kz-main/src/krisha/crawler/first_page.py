@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import Iterator
 
 from src.krisha.config import Config
 from src.krisha.config.parser import ParserConfig
@@ -43,6 +44,14 @@ class FirstPage:
             full_url += parser.q_pref + search_str
         return full_url
 
+    @staticmethod
+    def _add_sort_url(url: str, parser: ParserConfig) -> str:
+        """Sort the search newest first, as incremental crawls need."""
+        if not parser.incremental:
+            return url
+        sep = "&" if "?" in url else "?"
+        return f"{url}{sep}{parser.sort_newest_url}"
+
     @classmethod
     def get_url(cls, config: Config) -> str:
         search = config.search_params
@@ -56,4 +65,20 @@ class FirstPage:
             cls._get_price_url(search.price_to, parser.prices_to_url),
             cls._get_param_url(search.owner, parser.owner_url),
         )
-        return cls._concatenate_params_url(parser, city_url, param_urls)
+        url = cls._concatenate_params_url(parser, city_url, param_urls)
+        return cls._add_sort_url(url, parser)
+
+    @staticmethod
+    def get_page_url(url: str, page: int, parser: ParserConfig) -> str:
+        """URL of search result page number `page` of the search `url`."""
+        if page == 1:
+            return url
+        sep = "&" if "?" in url else "?"
+        return f"{url}{sep}{parser.page_url}{page}"
+
+    @classmethod
+    def get_page_urls(
+        cls, url: str, page_count: int, parser: ParserConfig
+    ) -> Iterator[str]:
+        for page in range(1, page_count + 1):
+            yield cls.get_page_url(url, page, parser)
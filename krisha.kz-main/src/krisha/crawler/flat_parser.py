@@ -1,5 +1,6 @@
 import json
 import logging
+import re
 from typing import Any
 
 from bs4 import BeautifulSoup
@@ -7,8 +8,24 @@ from bs4 import BeautifulSoup
 import src.krisha.common.msg as msg
 from src.krisha.entities.flat import Flat
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger()
 
+# Case-sensitive, as it is twice as fast, other spellings go to the fallback
+JSDATA_PATTERN = re.compile(rb"<script\b[^>]*\bid=[\"']?jsdata\b[^>]*>")
+SCRIPT_END = b"</script"
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class FlatParser:
     """Pars content data and create Flat object."""
@@ -30,6 +47,29 @@ class FlatParser:
         except Exception as error:
             raise ValueError(msg.CR_JSON_ERROR.format(error)) from error
 
+    @staticmethod
+    def _get_raw_pars_data(body: bytes) -> dict | None:
+        """jsdata of a raw page, None if it cannot be read from the bytes.
+
+        The script is found by scanning the bytes, which is much cheaper
+        than building the tree of a whole detail page.
+        """
+        tag = JSDATA_PATTERN.search(body)
+        if tag is None:
+            return None
+        end = body.find(SCRIPT_END, tag.end())
+        if end == -1:
+            return None
+        start_index = body.find(b"{", tag.end(), end)
+        end_index = body.rfind(b"}", tag.end(), end)
+        if start_index == -1 or end_index == -1:
+            return None
+        try:
+            data = loads(body[start_index : end_index + 1])
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
     @staticmethod
     def _get_advert(pars_data: dict, key: str) -> dict:
         advert = pars_data.get(key)
@@ -58,9 +98,30 @@ class FlatParser:
             logger.warning(msg.CR_KEY_GET_ERROR.format(key))
         return sub_data
 
+    @classmethod
+    def get_flat_from_page(
+        cls, body: bytes, url: str, green_percentage: float | None
+    ) -> Flat:
+        """Flat of a raw detail page.
+
+        The page is parsed with BeautifulSoup only when its jsdata cannot
+        be read from the bytes.
+        """
+        pars_data = cls._get_raw_pars_data(body)
+        if pars_data is None:
+            content = BeautifulSoup(body, "html.parser")
+            return cls.get_flat(content, url, green_percentage)
+        return cls._get_flat_from_data(pars_data, url, green_percentage)
+
     @classmethod
     def get_flat(cls, content: BeautifulSoup, url: str, green_percentage: float) -> Flat:
         pars_data = cls._get_pars_data(content)
+        return cls._get_flat_from_data(pars_data, url, green_percentage)
+
+    @classmethod
+    def _get_flat_from_data(
+        cls, pars_data: dict, url: str, green_percentage: float | None
+    ) -> Flat:
         advert = cls._get_advert(pars_data, "advert")
         adverts = cls._get_adverts(pars_data, "adverts")
         address = cls._get_sub_data(adverts, "fullAddress")
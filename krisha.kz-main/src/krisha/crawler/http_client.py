@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import src.krisha.common.msg as msg
+from src.krisha.config import Config
+from src.krisha.config.parser import ParserConfig
+from src.krisha.crawler.archive import ResponseArchive
+from src.krisha.crawler.concurrency import AdaptiveLimiter
+from src.krisha.crawler.rate_limiter import TokenBucket
+from src.krisha.crawler.response_cache import (
+    ResponseCache,
+    get_response_cache,
+)
+from src.krisha.crawler.validators import ValidatorStore
+
+logger = logging.getLogger()
+
+
+@dataclass
+class HttpStats:
+    """Requests sent and TCP/TLS connections opened by the client."""
+
+    requests: int = 0
+    connections: int = 0
+    throttled: float = 0.0
+    received: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter counting every socket connect of its pools."""
+
+    def __init__(self, stats: HttpStats, lock: threading.Lock, **kwargs):
+        self.stats = stats
+        self.lock = lock
+        super().__init__(**kwargs)
+
+    def _counting_pool(self, pool_cls: type) -> type:
+        adapter = self
+
+        class CountingConnection(pool_cls.ConnectionCls):
+            def connect(self) -> None:
+                with adapter.lock:
+                    adapter.stats.connections += 1
+                super().connect()
+
+        class CountingPool(pool_cls):
+            ConnectionCls = CountingConnection
+
+        return CountingPool
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": self._counting_pool(HTTPConnectionPool),
+            "https": self._counting_pool(HTTPSConnectionPool),
+        }
+
+
+class HttpClient:
+    """Crawler-wide HTTP session with a keep-alive connection pool.
+
+    One client is created per crawler process and shared by every fetch
+    path, so connections to krisha.kz are reused between search, detail
+    and analytics requests instead of paying a handshake per request.
+    Every request also takes a token from the shared rate limiter, which
+    alone sets the crawl speed, and a slot from the adaptive concurrency
+    limiter, which backs off when krisha.kz answers slowly or with errors.
+    With a response cache, fresh cached pages are returned without taking
+    either. With a validator store, detail and analytics pages are
+    requested conditionally and marked `unchanged` when not modified.
+    With an archive, every response received is recorded for replay.
+    """
+
+    def __init__(
+        self,
+        parser_config: ParserConfig,
+        cache: ResponseCache | None = None,
+        validators: ValidatorStore | None = None,
+        archive: ResponseArchive | None = None,
+    ) -> None:
+        self.parser_config = parser_config
+        self.cache = cache
+        self.validators = validators
+        self.archive = archive
+        self.stats = HttpStats()
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(parser_config.user_agent)
+        adapter = CountingAdapter(
+            self.stats, self.lock, pool_maxsize=parser_config.pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.rate_limiter = TokenBucket(
+            parser_config.rate_limit, parser_config.rate_burst
+        )
+        self.concurrency = AdaptiveLimiter(
+            min_limit=parser_config.min_workers,
+            max_limit=parser_config.max_workers,
+            window=parser_config.workers_window,
+            backoff=parser_config.workers_backoff,
+            latency_limit=(
+                parser_config.timeout * parser_config.latency_limit_ratio
+            ),
+            latency_growth=parser_config.latency_growth,
+        )
+
+    @classmethod
+    def from_config(cls, config: Config) -> HttpClient:
+        """Client with the cache, validators and archive of the config."""
+        parser = config.parser_config
+        validators = None
+        if parser.conditional_get:
+            validators = ValidatorStore(config.path.validators_file, parser)
+        if config.path.record_file:
+            # Cache hits would be missing from the recording
+            archive = ResponseArchive(config.path.record_file)
+            return cls(parser, None, validators, archive)
+        return cls(parser, get_response_cache(config), validators)
+
+    def get(
+        self, url: str, conditional: bool = True, fresh: bool = False
+    ) -> Response:
+        """GET url, conditionally unless conditional is False.
+
+        A fresh GET is sent unconditionally past the cache, and its
+        response is never marked unchanged, for pages which are fetched
+        because they are known to have changed.
+        """
+        response = None
+        if self.cache is not None and not fresh:
+            response = self.cache.get(url)
+        if response is None:
+            headers = None
+            if self.validators is not None and conditional and not fresh:
+                headers = self.validators.get_headers(url)
+            response = self._fetch(url, headers)
+            ok = response.status_code == requests.codes.ok
+            if self.cache is not None and ok:
+                self.cache.put(url, response)
+        if self.validators is not None:
+            self.validators.check(url, response, compare=not fresh)
+        return response
+
+    def _fetch(self, url: str, headers: dict | None = None) -> Response:
+        self.concurrency.acquire()
+        waited = self.rate_limiter.acquire()
+        with self.lock:
+            self.stats.requests += 1
+            self.stats.throttled += waited
+        failure = None
+        start = time.monotonic()
+        try:
+            response = self.session.get(
+                url, headers=headers, timeout=self.parser_config.timeout
+            )
+            with self.lock:
+                self.stats.received += len(response.content)
+            if self.archive is not None:
+                self.archive.record(response)
+            status = response.status_code
+            if status == requests.codes.too_many_requests or status >= 500:
+                failure = msg.CC_REASON_STATUS.format(status)
+            return response
+        except requests.RequestException as error:
+            failure = msg.CC_REASON_ERROR.format(type(error).__name__)
+            raise
+        finally:
+            self.concurrency.release(time.monotonic() - start, failure)
+
+    def log_stats(self) -> None:
+        logger.info(
+            msg.HTTP_STATS.format(
+                self.stats.requests,
+                self.stats.connections,
+                self.stats.reused,
+                self.stats.received / 2**20,
+                self.stats.throttled,
+            )
+        )
+        self.concurrency.log_stats()
+        if self.cache is not None:
+            self.cache.log_stats()
+        if self.validators is not None:
+            self.validators.log_stats()
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.validators is not None:
+            self.validators.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    def __enter__(self) -> HttpClient:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
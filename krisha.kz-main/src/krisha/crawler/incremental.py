@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from src.krisha.entities.card import Card
+
+
+@dataclass
+class EarlyStop:
+    """When an incremental crawl, sorted newest first, can stop.
+
+    Pages above the watermark, the newest Ad id of the last crawl, hold
+    listings published since then and are always crawled. Below it, the
+    crawl stops after `quiet_pages` consecutive pages on which no card
+    was new or repriced.
+    """
+
+    watermark: int | None
+    quiet_pages: int
+    quiet: int = 0
+    newest: int | None = None
+
+    def update(self, cards: list[Card], changed: int) -> bool:
+        """Account for a crawled page, True once the crawl should stop."""
+        ids = [card.id for card in cards]
+        if ids:
+            self.newest = max(self.newest or 0, *ids)
+        below = self.watermark is None or (
+            bool(ids) and min(ids) <= self.watermark
+        )
+        self.quiet = self.quiet + 1 if below and not changed else 0
+        return self.quiet >= self.quiet_pages
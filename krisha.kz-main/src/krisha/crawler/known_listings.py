@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date
+
+import src.krisha.common.msg as msg
+from src.krisha.crawler.seen_filter import SeenFilter
+from src.krisha.db.base import DBConnection
+from src.krisha.db.queries import get_latest_prices, iter_latest_prices
+from src.krisha.entities.flat import Flat
+
+logger = logging.getLogger()
+
+
+class KnownListings:
+    """Latest price and last check date of every saved flat, in memory.
+
+    Loaded once per crawl with a single streaming query, so the
+    new-or-repriced checks of the crawl cost no database round trips.
+    Ids, prices and dates (as ordinal days) are kept in three sorted,
+    typed arrays searched with bisect: 8 + 8 + 4 = 20 bytes per listing,
+    about 20 MB per million listings, against about 93 MB for a dict of
+    tuples (see benchmarks/bench_known.py). Prices saved during the
+    crawl go to a small overlay dict, which is searched first. Saved ids
+    are added to the seen filter of the other processes, if there is one.
+
+    Every crawl loads its own copy, so concurrent profiles hold one each:
+    up to profile_workers copies in the crawler process.
+
+    Flats found unchanged by a recheck are kept in `checked` until
+    pop_checked() hands them over to be saved.
+    """
+
+    def __init__(self, seen: SeenFilter | None = None) -> None:
+        self.ids = array("q")
+        self.prices = array("q")
+        self.days = array("i")
+        self.saved: dict[int, tuple[int, date]] = {}
+        self.checked: list[int] = []
+        self.seen = seen
+
+    def append(self, flat_id: int, price: int, day: date) -> None:
+        """Add a listing loaded from the database, in ascending id order."""
+        self.ids.append(flat_id)
+        self.prices.append(price)
+        self.days.append(day.toordinal())
+
+    def get(self, flat_id: int) -> tuple[int, date] | None:
+        """Latest price of the flat and its check date, None if not known."""
+        if flat_id in self.saved:
+            return self.saved[flat_id]
+        i = bisect_left(self.ids, flat_id)
+        if i == len(self.ids) or self.ids[i] != flat_id:
+            return None
+        return self.prices[i], date.fromordinal(self.days[i])
+
+    def __contains__(self, flat_id: int) -> bool:
+        return self.get(flat_id) is not None
+
+    def prefetch(self, flat_ids: list[int]) -> None:
+        """Nothing to do, every saved flat is loaded already."""
+
+    def update(self, flats_data: list[Flat]) -> None:
+        """Record the prices of Flats saved during the crawl."""
+        today = date.today()
+        for flat in flats_data:
+            latest = self.get(flat.id)
+            if latest is None or latest[0] != flat.price:
+                self.saved[flat.id] = (flat.price, today)
+        if self.seen is not None:
+            self.seen.add(flat.id for flat in flats_data)
+
+    def check(self, flat_ids: list[int]) -> None:
+        """Record that the flats were rechecked today and found unchanged."""
+        today = date.today()
+        for flat_id in flat_ids:
+            latest = self.get(flat_id)
+            if latest is not None:
+                self.saved[flat_id] = (latest[0], today)
+        self.checked.extend(flat_ids)
+
+    def pop_checked(self) -> list[int]:
+        """Flats checked since the last call, whose check is not saved."""
+        checked, self.checked = self.checked, []
+        return checked
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the loaded arrays."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ids, self.prices, self.days)
+        )
+
+
+class PriceLookup:
+    """KnownListings counterpart which reads prices page by page.
+
+    prefetch reads the latest prices of a page of Ads with a single
+    query, and get answers from them, so a page costs one round trip
+    instead of one per Ad. Nothing is loaded up front and the prices are
+    as fresh as the page, which suits workers sharing a database. A flat
+    asked for without being prefetched is read on its own.
+
+    With a seen filter only the ids it may contain are read, the others
+    are new, and a page of new Ads costs no query at all.
+    """
+
+    def __init__(
+        self, connector: DBConnection, seen: SeenFilter | None = None
+    ) -> None:
+        self.connector = connector
+        self.seen = seen
+        self.prices: dict[int, tuple[int, date] | None] = {}
+        self.checked: list[int] = []
+        self.queries = 0
+
+    def read(self, flat_ids: list[int]) -> dict[int, tuple[int, date]]:
+        if self.seen is not None:
+            flat_ids = [i for i in flat_ids if i in self.seen]
+        if not flat_ids:
+            return {}
+        self.queries += 1
+        return get_latest_prices(self.connector, flat_ids)
+
+    def prefetch(self, flat_ids: list[int]) -> None:
+        """Read the latest prices of the flats, forgetting older ones."""
+        latest = self.read(flat_ids)
+        self.prices = {flat_id: latest.get(flat_id) for flat_id in flat_ids}
+
+    def get(self, flat_id: int) -> tuple[int, date] | None:
+        """Latest price of the flat and its check date, None if not known."""
+        if flat_id not in self.prices:
+            self.prices[flat_id] = self.read([flat_id]).get(flat_id)
+        return self.prices[flat_id]
+
+    def __contains__(self, flat_id: int) -> bool:
+        return self.get(flat_id) is not None
+
+    def update(self, flats_data: list[Flat]) -> None:
+        """Record the prices of Flats saved from the page."""
+        today = date.today()
+        for flat in flats_data:
+            latest = self.prices.get(flat.id)
+            if latest is None or latest[0] != flat.price:
+                self.prices[flat.id] = (flat.price, today)
+        if self.seen is not None:
+            self.seen.add(flat.id for flat in flats_data)
+
+    def check(self, flat_ids: list[int]) -> None:
+        """Record that the flats were rechecked today and found unchanged."""
+        today = date.today()
+        for flat_id in flat_ids:
+            latest = self.prices.get(flat_id)
+            if latest is not None:
+                self.prices[flat_id] = (latest[0], today)
+        self.checked.extend(flat_ids)
+
+    def pop_checked(self) -> list[int]:
+        """Flats checked since the last call, whose check is not saved."""
+        checked, self.checked = self.checked, []
+        return checked
+
+
+LatestPrices = KnownListings | PriceLookup
+
+
+def load_known_listings(
+    connector: DBConnection, seen: SeenFilter | None = None
+) -> KnownListings:
+    start = time.perf_counter()
+    known = KnownListings(seen)
+    for flat_id, price, day in iter_latest_prices(connector):
+        known.append(flat_id, price, day)
+    logger.info(
+        msg.CR_KNOWN_LOADED.format(
+            len(known.ids),
+            known.nbytes / 2**20,
+            time.perf_counter() - start,
+        )
+    )
+    return known
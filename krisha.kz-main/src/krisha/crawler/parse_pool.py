@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueListener
+from typing import Any
+
+import src.krisha.common.msg as msg
+from src.krisha.config.logs import setup_queue_logs
+
+logger = logging.getLogger()
+
+
+class ParsePool:
+    """Processes which parse fetched pages, off the crawler's GIL.
+
+    run ships a parse function and the raw page to a worker process and
+    waits for the Flat, cards or value it returns, or for the parse error
+    it raised. It is called from threads which already wait, the fetch
+    threads of detail and search pages and the analytics threads, so
+    pages are parsed on every core while the other threads keep
+    fetching. With no processes run parses in the calling thread.
+
+    Workers are spawned, not forked from the threaded crawler. Their log
+    records are queued to the crawler, which writes them with its own
+    handlers.
+    """
+
+    def __init__(self, processes: int) -> None:
+        self.executor = None
+        self.listener = None
+        if processes:
+            context = multiprocessing.get_context("spawn")
+            queue = context.Queue()
+            root = logging.getLogger()
+            self.listener = QueueListener(
+                queue, *root.handlers, respect_handler_level=True
+            )
+            self.listener.start()
+            self.executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=context,
+                initializer=setup_queue_logs,
+                initargs=(queue, root.level),
+            )
+            logger.info(msg.PARSE_POOL_START.format(processes))
+
+    @classmethod
+    def from_config(cls, config) -> ParsePool:
+        processes = config.parser_config.parse_processes
+        if processes < 0:
+            processes = os.cpu_count() or 1
+        return cls(processes)
+
+    def run(self, parse: Callable[..., Any], *args: Any) -> Any:
+        """Result of parse(*args), computed in a worker process."""
+        if self.executor is None:
+            return parse(*args)
+        return self.executor.submit(parse, *args).result()
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+        if self.listener is not None:
+            self.listener.stop()
+
+    def __enter__(self) -> ParsePool:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    Allows `rate` requests per second on average and up to `burst`
+    requests at once. A caller reserves its token under the lock and
+    sleeps outside of it, so waiting threads are served in order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, waiting for it if needed. Return the wait time."""
+        with self.lock:
+            now = self.clock()
+            elapsed = now - self.updated
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            self.sleep(wait)
+        return wait
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from requests import Response
+
+import src.krisha.common.msg as msg
+from src.krisha.config import Config
+from src.krisha.config.parser import ParserConfig
+
+logger = logging.getLogger()
+
+SEARCH = "search"
+DETAIL = "detail"
+ANALYTICS = "analytics"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    bytes_saved: int = 0
+
+
+def get_endpoint(url: str, parser_config: ParserConfig) -> str:
+    if url.startswith(parser_config.price_analyze_url):
+        return ANALYTICS
+    if "/a/show/" in url:
+        return DETAIL
+    return SEARCH
+
+
+class ResponseCache:
+    """On-disk cache of successful GET responses.
+
+    Bodies are stored gzip-compressed under their SHA-256, so identical
+    pages are kept once, and a SQLite index maps URLs to bodies with the
+    time they were fetched. Entries expire after the TTL of their
+    endpoint (search, detail or analytics page). When the bodies exceed
+    max_bytes the least recently used ones are evicted.
+
+    The index is safe to share between threads and crawler processes.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        ttls: dict[str, float],
+        parser_config: ParserConfig,
+        clock=time.time,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.parser_config = parser_config
+        self.clock = clock
+        self.stats = CacheStats()
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.index = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self.index.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                encoding TEXT,
+                fetched REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bodies (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bodies_accessed ON bodies (accessed);
+            """)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + ".gz")
+
+    def get(self, url: str) -> Response | None:
+        """Cached response of url, None if missing or expired."""
+        ttl = self.ttls[get_endpoint(url, self.parser_config)]
+        now = self.clock()
+        with self.lock:
+            row = self.index.execute(
+                "SELECT digest, encoding FROM entries "
+                "WHERE url = ? AND fetched > ?",
+                (url, now - ttl),
+            ).fetchone()
+            if row is not None:
+                self.index.execute(
+                    "UPDATE bodies SET accessed = ? WHERE digest = ?",
+                    (now, row[0]),
+                )
+        body = None
+        if row is not None:
+            try:
+                with gzip.open(self._path(row[0]), "rb") as file:
+                    body = file.read()
+            except OSError as error:
+                logger.debug(msg.HTTP_CACHE_READ_ERROR.format(url, error))
+        with self.lock:
+            if body is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self.stats.bytes_saved += len(body)
+        return self._make_response(url, body, row[1])
+
+    @staticmethod
+    def _make_response(url: str, body: bytes, encoding: str) -> Response:
+        response = Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = encoding
+        response._content = body
+        return response
+
+    def put(self, url: str, response: Response) -> None:
+        """Store a successful response of url."""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written aside and renamed, readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+            with gzip.open(temp_path, "wb", compresslevel=6) as file:
+                file.write(body)
+            os.replace(temp_path, path)
+        now = self.clock()
+        with self.lock:
+            self.index.execute(
+                "INSERT OR REPLACE INTO bodies (digest, size, accessed) "
+                "VALUES (?, ?, ?)",
+                (digest, os.path.getsize(path), now),
+            )
+            self.index.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(url, digest, encoding, fetched) VALUES (?, ?, ?, ?)",
+                (url, digest, response.encoding, now),
+            )
+            self.stats.stored += 1
+            # Summing the sizes on every store would dominate the cost
+            if self.stats.stored % 100 == 1:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used bodies over max_bytes."""
+        total = self.index.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM bodies"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.index.execute(
+            "SELECT digest, size FROM bodies ORDER BY accessed"
+        )
+        evicted = []
+        for digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append(digest)
+            total -= size
+        for digest in evicted:
+            for table in ("entries", "bodies"):
+                self.index.execute(
+                    f"DELETE FROM {table} WHERE digest = ?", (digest,)
+                )
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+        self.stats.evicted += len(evicted)
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        logger.info(
+            msg.HTTP_CACHE_STATS.format(
+                stats.hits,
+                stats.misses,
+                stats.stored,
+                stats.evicted,
+                stats.bytes_saved / 2**20,
+            )
+        )
+
+    def close(self) -> None:
+        self.index.close()
+
+
+def get_response_cache(config: Config) -> ResponseCache | None:
+    """Response cache of the config, None if caching is disabled."""
+    parser = config.parser_config
+    if not parser.cache_max_mb:
+        return None
+    return ResponseCache(
+        config.path.cache_dir,
+        max_bytes=parser.cache_max_mb * 2**20,
+        ttls={
+            SEARCH: parser.cache_ttl_search,
+            DETAIL: parser.cache_ttl_detail,
+            ANALYTICS: parser.cache_ttl_analytics,
+        },
+        parser_config=parser,
+    )
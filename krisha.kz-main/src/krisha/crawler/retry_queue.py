@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+import src.krisha.common.msg as msg
+
+logger = logging.getLogger()
+
+
+@dataclass(order=True)
+class RetryItem:
+    due: float
+    url: str = field(compare=False)
+    attempt: int = field(compare=False)
+    error: str = field(compare=False)
+
+
+class RetryQueue:
+    """Deferred retries of failed Ad URLs with a dead-letter store.
+
+    An Ad failing with a transient error is scheduled again after the
+    next delay of `retry_delay` instead of sleeping inline, so the crawl
+    goes on meanwhile. Once the delays are exhausted, or for errors not
+    worth retrying, the Ad is appended to the dead-letter file.
+
+    `missed` counts Ads lost in a row since the last success and is what
+    MaximumMissedAdError is checked against.
+    """
+
+    def __init__(
+        self,
+        retry_delay: tuple,
+        dead_letters_file: str,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.retry_delay = retry_delay
+        self.dead_letters_file = dead_letters_file
+        self.clock = clock
+        self.heap: list[RetryItem] = []
+        self.attempts: dict[str, int] = {}
+        self.missed = 0
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def defer(self, url: str, error: Exception) -> bool:
+        """Schedule a retry of url, or dead-letter it when out of retries.
+
+        Returns False if url was moved to the dead letters.
+        """
+        attempt = self.attempts.get(url, 0)
+        if attempt >= len(self.retry_delay):
+            self.fail(url, error, missed=True)
+            return False
+        delay = self.retry_delay[attempt]
+        self.attempts[url] = attempt + 1
+        item = RetryItem(self.clock() + delay, url, attempt + 1, str(error))
+        heapq.heappush(self.heap, item)
+        logger.warning(msg.CR_RETRY_DEFERRED.format(url, attempt + 1, delay))
+        return True
+
+    def fail(self, url: str, error: Exception, missed: bool) -> None:
+        """Move url to the dead letters without retrying it."""
+        record = {
+            "time": self.clock(),
+            "url": url,
+            "attempts": self.attempts.pop(url, 0),
+            "error": str(error),
+        }
+        with open(self.dead_letters_file, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.dead += 1
+        if missed:
+            self.missed += 1
+        logger.warning(msg.CR_DEAD_LETTER.format(url, error))
+
+    def succeed(self, url: str) -> None:
+        self.attempts.pop(url, None)
+        self.missed = 0
+
+    def pop_due(self) -> list[RetryItem]:
+        now = self.clock()
+        due = []
+        while self.heap and self.heap[0].due <= now:
+            due.append(heapq.heappop(self.heap))
+        return due
+
+    def requeue(self, items: list[RetryItem]) -> int:
+        """Put back the popped items which were not retried, as they were.
+
+        A retried item has either left `attempts` or moved on to its next
+        attempt. Returns how many were put back.
+        """
+        left = [
+            item
+            for item in items
+            if self.attempts.get(item.url) == item.attempt
+        ]
+        for item in left:
+            heapq.heappush(self.heap, item)
+        return len(left)
+
+    def next_due_in(self) -> float | None:
+        if not self.heap:
+            return None
+        return max(self.heap[0].due - self.clock(), 0.0)
+
+    def dump(self) -> dict:
+        """JSON-serializable state, restored by load()."""
+        return {
+            "items": [asdict(item) for item in sorted(self.heap)],
+            "attempts": self.attempts,
+            "missed": self.missed,
+        }
+
+    def load(self, state: dict) -> None:
+        self.heap = [RetryItem(**item) for item in state.get("items", [])]
+        heapq.heapify(self.heap)
+        self.attempts = dict(state.get("attempts", {}))
+        self.missed = state.get("missed", 0)
+
+    def log_stats(self) -> None:
+        if self.dead:
+            logger.warning(
+                msg.CR_DEAD_LETTER_STATS.format(
+                    self.dead, self.dead_letters_file
+                )
+            )
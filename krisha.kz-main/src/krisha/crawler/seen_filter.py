@@ -0,0 +1,280 @@
+"""Bloom filter of the ids of saved flats, in a memory-mapped file.
+
+Crawler processes map the same file, so opening it costs no loading and
+an id added by one process is seen by the others at once. An id the
+filter does not contain is certainly not saved, so new Ads are told
+apart without asking the database, and only the ids it may contain are
+looked up. Every process adds the ids of the Flats it saves.
+
+The filter is built from flats, sized for twice their number, by:
+
+    python -m src.krisha.crawler.seen_filter [fp_rate]
+
+which also reports its measured false-positive rate. It should be rebuilt
+once its count nears the capacity. Ids are added to the rebuilt file as
+soon as it is in place, while lookups of processes which have the file
+open go to the previous one until they open it again.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from collections.abc import Iterable
+
+import src.krisha.common.msg as msg
+from src.krisha.config.config import load_config
+from src.krisha.db.base import DBConnection
+from src.krisha.db.queries import iter_flat_ids
+from src.krisha.db.service import get_connection_pool
+
+try:
+    import fcntl
+except ImportError:  # Windows, writes are not locked
+    fcntl = None
+
+logger = logging.getLogger()
+
+MAGIC = b"KRSEEN01"
+HEADER = struct.Struct("<8sQQQQ")
+MASK = (1 << 64) - 1
+MIN_CAPACITY = 1_000_000
+FP_RATE = 0.01
+FP_PROBES = 100_000
+
+
+def mix(value: int) -> int:
+    """splitmix64 finalizer, spreads consecutive ids over the bits."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+def get_size(capacity: int, fp_rate: float) -> tuple[int, int]:
+    """Bits and hash functions for capacity ids at fp_rate."""
+    bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+    bits = (bits + 7) // 8 * 8
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class SeenFilter:
+    """Bloom filter over krisha ids, backed by a shared mapping of path.
+
+    The file is a header of magic, bit count, hash count, capacity and
+    count of added ids, followed by the bits. Lookups read the mapping
+    without locking; add locks the file, so that processes adding at the
+    same time do not lose each other's bits. A filter opened read-only
+    only looks ids up.
+    """
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path = path
+        self.writable = writable
+        self.open()
+
+    def open(self) -> None:
+        self.file = open(self.path, "r+b" if self.writable else "rb")
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        self.map = mmap.mmap(self.file.fileno(), 0, access=access)
+        magic, self.bits, self.hashes, self.capacity = HEADER.unpack_from(
+            self.map
+        )[:4]
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a seen filter")
+
+    @classmethod
+    def create(
+        cls, path: str, capacity: int, fp_rate: float = FP_RATE
+    ) -> SeenFilter:
+        """Create an empty filter file for capacity ids and open it."""
+        bits, hashes = get_size(capacity, fp_rate)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, bits, hashes, capacity, 0))
+            file.truncate(HEADER.size + bits // 8)
+        return cls(path, writable=True)
+
+    @property
+    def count(self) -> int:
+        return HEADER.unpack_from(self.map)[4]
+
+    def get_positions(self, flat_id: int) -> list[int]:
+        # Double hashing, the second hash odd to reach every bit
+        first = mix(flat_id)
+        second = mix(first) | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, flat_id: int) -> bool:
+        data = self.map
+        for position in self.get_positions(flat_id):
+            if not data[HEADER.size + (position >> 3)] & 1 << (position & 7):
+                return False
+        return True
+
+    def is_replaced(self) -> bool:
+        """Whether path is now another file, a rebuilt filter."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return False
+        return inode != os.fstat(self.file.fileno()).st_ino
+
+    def lock(self) -> None:
+        """Lock the file, moving to the rebuilt filter if path was replaced.
+
+        A rebuild keeps the file locked until it is replaced, so the ids
+        added meanwhile go to the rebuilt filter.
+        """
+        if fcntl is None:
+            return
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        while self.is_replaced():
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.close()
+            self.open()
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+
+    def add(self, flat_ids: Iterable[int]) -> int:
+        """Add the ids, returning how many were not in the filter yet."""
+        if not self.writable:
+            raise ValueError(f"{self.path} is open read-only")
+        self.lock()
+        data = self.map
+        added = 0
+        try:
+            for flat_id in flat_ids:
+                new = False
+                for position in self.get_positions(flat_id):
+                    offset = HEADER.size + (position >> 3)
+                    bit = 1 << (position & 7)
+                    if not data[offset] & bit:
+                        data[offset] |= bit
+                        new = True
+                added += new
+            if added:
+                magic, bits, hashes, capacity, count = HEADER.unpack_from(data)
+                HEADER.pack_into(
+                    data, 0, magic, bits, hashes, capacity, count + added
+                )
+        finally:
+            self.unlock()
+        return added
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.map)
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> SeenFilter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_seen_filter(path: str, writable: bool = True) -> SeenFilter | None:
+    """Open the filter for the crawl, None if it was never built.
+
+    Processes which only look ids up open it read-only.
+    """
+    if not os.path.exists(path):
+        return None
+    seen = SeenFilter(path, writable)
+    logger.info(
+        msg.SEEN_OPENED.format(seen.count, seen.capacity, seen.nbytes / 2**20)
+    )
+    if seen.count > seen.capacity:
+        logger.warning(msg.SEEN_FULL.format(seen.count, seen.capacity))
+    return seen
+
+
+def measure_fp_rate(
+    seen: SeenFilter, flat_ids: set[int], probes: int = FP_PROBES
+) -> float:
+    """Share of ids which were never added that the filter contains."""
+    rng = random.Random(0)
+    low = min(flat_ids, default=0)
+    high = max(flat_ids, default=0) + probes
+    positives = checked = 0
+    while checked < probes:
+        flat_id = rng.randint(low, high)
+        if flat_id in flat_ids:
+            continue
+        checked += 1
+        positives += flat_id in seen
+    return positives / probes
+
+
+def build_seen_filter(
+    connector: DBConnection, path: str, fp_rate: float = FP_RATE
+) -> tuple[SeenFilter, set[int]]:
+    """Build the filter of the saved flats next to path, then replace it.
+
+    The filter in place is locked from before the flats are read until
+    it is replaced. Processes adding ids meanwhile wait for the lock and
+    add them to the rebuilt filter, so no saved id is missed.
+    """
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = SeenFilter(path)
+        except ValueError as error:
+            logger.warning(msg.SEEN_INVALID.format(error))
+    if previous is not None:
+        previous.lock()
+    try:
+        flat_ids = set(iter_flat_ids(connector))
+        capacity = max(2 * len(flat_ids), MIN_CAPACITY)
+        building = f"{path}.building"
+        seen = SeenFilter.create(building, capacity, fp_rate)
+        seen.add(sorted(flat_ids))
+        seen.map.flush()
+        os.replace(building, path)
+        seen.path = path
+    finally:
+        if previous is not None:
+            previous.unlock()
+            previous.close()
+    return seen, flat_ids
+
+
+def rebuild(fp_rate: float = FP_RATE) -> None:
+    config = load_config()
+    path = config.path.seen_filter_file
+    with get_connection_pool(config.path, 1) as pool:
+        with pool.connection() as connector:
+            start = time.perf_counter()
+            seen, flat_ids = build_seen_filter(connector, path, fp_rate)
+            elapsed = time.perf_counter() - start
+    with seen:
+        logger.info(
+            msg.SEEN_REBUILT.format(
+                path,
+                len(flat_ids),
+                seen.capacity,
+                seen.nbytes / 2**20,
+                seen.hashes,
+                elapsed,
+                measure_fp_rate(seen, flat_ids),
+            )
+        )
+
+
+if __name__ == "__main__":
+    rebuild(float(sys.argv[1]) if len(sys.argv) > 1 else FP_RATE)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from logging.handlers import QueueListener
+
+import src.krisha.common.msg as msg
+from src.krisha.config import Config
+from src.krisha.config.logs import setup_queue_logs
+from src.krisha.crawler.first_page import FirstPage
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.crawler.spider import (
+    get_ads_count,
+    get_content,
+    get_page_response,
+    run_with_retries,
+)
+from src.krisha.db.service import get_connection_pool
+
+logger = logging.getLogger()
+
+
+@dataclass
+class PriceShard:
+    """Price band of a search with the number of Ads found in it."""
+
+    price_from: int | None
+    price_to: int | None
+    ads_count: int
+
+
+def partition_prices(
+    count_ads: Callable[[int | None, int | None], int],
+    price_from: int | None,
+    price_to: int | None,
+    max_ads: int,
+    price_ceiling: int,
+    min_band: int,
+) -> list[PriceShard]:
+    """Split a price range into bands having at most max_ads Ads each.
+
+    Bands over the limit are split in two at the geometric middle, as
+    prices are skewed towards the bottom of the range. An open upper
+    bound stays open in the last band, price_ceiling is only used to
+    find the middle. Bands narrower than min_band are not split further.
+    """
+    shards = []
+    bands = [(price_from, price_to, count_ads(price_from, price_to))]
+    while bands:
+        low, high, ads_count = bands.pop()
+        low_value = low or 0
+        high_value = price_ceiling if high is None else high
+        if ads_count <= max_ads or high_value - low_value <= min_band:
+            if ads_count:
+                shards.append(PriceShard(low, high, ads_count))
+            continue
+        middle = int(math.sqrt(max(low_value, 1) * high_value))
+        middle = min(max(middle, low_value + 1), high_value - 1)
+        bands.append((middle + 1, high, count_ads(middle + 1, high)))
+        bands.append((low, middle, count_ads(low, middle)))
+    return shards
+
+
+def get_shard_config(config: Config, shard: PriceShard, shards: int) -> Config:
+    """Config of one shard crawl, sharing the rate budget between shards."""
+    parser_config = config.parser_config
+    return replace(
+        config,
+        parser_config=replace(
+            parser_config,
+            rate_limit=parser_config.rate_limit / shards,
+            rate_burst=max(parser_config.rate_burst // shards, 1),
+        ),
+        search_params=replace(
+            config.search_params,
+            price_from=shard.price_from,
+            price_to=shard.price_to,
+        ),
+    )
+
+
+def count_shard_ads(
+    config: Config,
+    client: HttpClient,
+    price_from: int | None,
+    price_to: int | None,
+) -> int:
+    shard_config = get_shard_config(
+        config, PriceShard(price_from, price_to, 0), 1
+    )
+    response = get_page_response(FirstPage.get_url(shard_config), client)
+    return get_ads_count(get_content(response, config.parser_config))
+
+
+def load_shards(config: Config, url: str) -> list[PriceShard] | None:
+    """Load the saved partitioning of the search url, if still fresh."""
+    try:
+        with open(config.path.shards_file, encoding="utf-8") as file:
+            saved = json.load(file).get(url)
+    except (OSError, ValueError) as error:
+        logger.debug(msg.SH_LOAD_ERROR.format(error))
+        return None
+    max_age = config.parser_config.shard_max_age_days * 24 * 3600
+    if not saved or time.time() - saved["created"] > max_age:
+        return None
+    return [PriceShard(**shard) for shard in saved["shards"]]
+
+
+def save_shards(config: Config, url: str, shards: list[PriceShard]) -> None:
+    try:
+        with open(config.path.shards_file, encoding="utf-8") as file:
+            saved = json.load(file)
+    except (OSError, ValueError):
+        saved = {}
+    saved[url] = {
+        "created": time.time(),
+        "shards": [asdict(shard) for shard in shards],
+    }
+    with open(config.path.shards_file, "w", encoding="utf-8") as file:
+        json.dump(saved, file, indent=2)
+
+
+def get_shards(config: Config, client: HttpClient) -> list[PriceShard]:
+    """Get price shards of the search, partitioning it if not saved."""
+    url = FirstPage.get_url(config)
+    shards = load_shards(config, url)
+    if shards is not None:
+        logger.info(msg.SH_LOADED.format(len(shards)))
+        return shards
+    parser = config.parser_config
+    shards = partition_prices(
+        lambda low, high: count_shard_ads(config, client, low, high),
+        config.search_params.price_from,
+        config.search_params.price_to,
+        max_ads=parser.shard_max_pages * parser.ads_on_page,
+        price_ceiling=parser.shard_price_ceiling,
+        min_band=parser.shard_min_band,
+    )
+    save_shards(config, url, shards)
+    logger.info(msg.SH_PARTITIONED.format(len(shards)))
+    return shards
+
+
+def run_shard(config: Config, shard: PriceShard) -> None:
+    """Crawl one price shard in a worker process.
+
+    Like a profile crawl, the shard is restarted on database errors and
+    resumes from its checkpoint.
+    """
+    logger.info(
+        msg.SH_START.format(shard.price_from, shard.price_to, shard.ads_count)
+    )
+    # Shards are processes already, each one parses its own pages
+    with (
+        HttpClient.from_config(config) as client,
+        get_connection_pool(config.path, 1) as pool,
+        ParsePool(0) as parse_pool,
+    ):
+        try:
+            run_with_retries(config, client, pool, parse_pool)
+        finally:
+            client.log_stats()
+
+
+def run_sharded(config: Config) -> None:
+    """Partition the search by price and crawl the shards in parallel.
+
+    Shard processes are spawned, like ParsePool workers, and queue their
+    log records to this process, which writes them with its own handlers.
+    """
+    with HttpClient(config.parser_config) as client:
+        shards = get_shards(config, client)
+    processes = config.parser_config.shard_processes
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    root = logging.getLogger()
+    listener = QueueListener(queue, *root.handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=setup_queue_logs,
+            initargs=(queue, root.level),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    run_shard,
+                    get_shard_config(config, shard, processes),
+                    shard,
+                )
+                for shard in shards
+            ]
+            for shard, future in zip(shards, futures, strict=True):
+                try:
+                    future.result()
+                except Exception as error:
+                    logger.error(
+                        msg.SH_ERROR.format(
+                            shard.price_from, shard.price_to, error
+                        )
+                    )
+    finally:
+        listener.stop()
@@ -1,56 +1,193 @@
 import logging
 import re
-import sys
+import threading
+import time
+from collections.abc import Collection, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import chain
+from queue import Empty, Full, Queue
 from time import sleep
 
+import psycopg2
 import requests
-from bs4 import BeautifulSoup as bs, BeautifulSoup
-from bs4 import ResultSet
+from bs4 import BeautifulSoup as bs
+from bs4 import ResultSet, SoupStrainer, Tag
 from requests import Response
-from tqdm import trange
+from tqdm import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
 
 import src.krisha.common.msg as msg
 from src.krisha.config import Config
+from src.krisha.config.parser import ParserConfig
+from src.krisha.crawler.enrichment import AnalyticsEnricher
+from src.krisha.crawler.first_page import FirstPage
 from src.krisha.crawler.flat_parser import FlatParser
-from src.krisha.db.base import DBConnection
-from src.krisha.db.queries import insert_flats_data_db, check_flat_exists
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.incremental import EarlyStop
+from src.krisha.crawler.known_listings import (
+    LatestPrices,
+    PriceLookup,
+    load_known_listings,
+)
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.crawler.retry_queue import RetryQueue
+from src.krisha.crawler.seen_filter import open_seen_filter
+from src.krisha.db.base import DBConnection, DBConnectionPool
+from src.krisha.db.checkpoint import (
+    Checkpoint,
+    create_checkpoints,
+    delete_checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+)
+from src.krisha.db.queries import insert_flats_data_db, mark_flats_checked
+from src.krisha.db.watermark import (
+    create_watermarks,
+    load_watermark,
+    save_watermark,
+)
+from src.krisha.entities.card import Card
 from src.krisha.entities.flat import Flat
 from src.krisha.exceptions.crawler import (
+    ClientRequestError,
+    CrawlInterruptedError,
     MaximumMissedAdError,
     MaximumRetryRequestsError,
+    RequestFailedError,
 )
 
 logger = logging.getLogger()
 
-PRICE_ANALYZE_URL = "https://krisha.kz/analytics/aPriceAnalysis/?id="
+# Search card titles read like "2-комнатная квартира · 54.5 м² · 5/9 этаж"
+ROOMS_PATTERN = re.compile(r"(\d+)-комнатн")
+SQUARE_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\s*м²")
+
+# The Ads count, the cards and the paginator with its next button
+SEARCH_PAGE_CLASSES = {
+    "div": "a-search-subtitle",
+    "section": "a-search-list",
+    "nav": "paginator",
+}
+
+
+def is_search_page_part(name: str, attrs: dict) -> bool:
+    part = SEARCH_PAGE_CLASSES.get(name)
+    if part is None:
+        return False
+    # The parser gives class as it is written, not split yet
+    classes = attrs.get("class") or ""
+    if isinstance(classes, str):
+        classes = classes.split()
+    return part in classes
+
+
+SEARCH_PAGE_PARTS = SoupStrainer(is_search_page_part)
+
+
+@dataclass
+class SearchPage:
+    """Ad cards found on a search page.
+
+    A resumed page is rebuilt from the Ads pending in the checkpoint,
+    without their card prices.
+    """
+
+    num: int
+    url: str
+    cards: list[Card]
+    resumed: bool = False
+
+    @property
+    def ads_urls(self) -> list[str]:
+        return [card.url for card in self.cards]
+
+
+@dataclass
+class AdPage:
+    """Detail page of an Ad, with its Flat or the error parsing it."""
+
+    response: Response
+    flat: Flat | None = None
+    error: Exception | None = None
+    parse_time: float = 0.0
+
+
+@dataclass
+class CrawlStats:
+    """Pages, Ads and saved Flats of one run_crawler call.
+
+    Saved Flats are either new or repriced, rechecked counts the known
+    Ads fetched under the recheck budget because their card showed no
+    price.
+    """
+
+    pages: int = 0
+    ads: int = 0
+    flats: int = 0
+    new: int = 0
+    repriced: int = 0
+    rechecked: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+def get_response(
+    url: str, client: HttpClient, conditional: bool = True, fresh: bool = False
+) -> Response:
+    """Request url once, past the response cache if fresh.
 
+    A 304 answer to a conditional request is returned as is, marked as
+    unchanged by the client. Raises ClientRequestError on 4xx answers
+    other than 429, which are not worth retrying, and RequestFailedError
+    on any other failure.
+    """
+    logger.debug(msg.REQUEST_START.format(url))
+    try:
+        response = client.get(url, conditional=conditional, fresh=fresh)
+    except requests.RequestException as error:
+        logger.error(msg.REQUEST_ERROR.format(url, error))
+        raise RequestFailedError(url, error) from error
+    status = response.status_code
+    if status in (requests.codes.ok, requests.codes.not_modified):
+        logger.debug(msg.RESPONSE.format(status))
+        return response
+    logger.error(msg.REQUEST_ERROR.format(url, status))
+    if 400 <= status < 500 and status != requests.codes.too_many_requests:
+        raise ClientRequestError(url, status)
+    raise RequestFailedError(url, status)
+
+
+def get_page_response(url: str, client: HttpClient) -> Response:
+    """Request a search page, retrying transient failures in place.
 
-def get_response(url: str, config: Config) -> Response:
-    for delay in config.parser_config.retry_delay:
-        logger.debug(msg.REQUEST_START.format(url))
+    Nothing else can be crawled without the search page, so unlike Ads it
+    is not deferred but retried after the short page_retry_delay.
+    """
+    for delay in (*client.parser_config.page_retry_delay, None):
         try:
-            response = requests.get(
-                url,
-                headers=config.parser_config.user_agent,
-                timeout=config.parser_config.timeout,
-            )
-            response.raise_for_status()
-            if response.status_code == requests.codes.ok:
-                logger.debug(msg.RESPONSE.format(response.status_code, url))
-                return response
-            logger.error(msg.RESPONSE.format(response.status_code))
-        except requests.RequestException as error:
-            logger.error(msg.REQUEST_ERROR.format(url, error))
+            return get_response(url, client)
+        except RequestFailedError as error:
+            if delay is None:
+                raise MaximumRetryRequestsError from error
             logger.debug(msg.CR_SLEEP.format(delay))
-
             sleep(delay)
 
-    raise MaximumRetryRequestsError
 
+def get_content(response: Response, parser_config: ParserConfig) -> bs:
+    return get_search_tree(response.text, parser_config)
+
+
+def get_search_tree(text: str, parser_config: ParserConfig) -> bs:
+    """Tree of the parts of a search page which are read.
 
-def get_content(response: Response) -> bs:
-    return bs(response.text, "html.parser")
+    Everything else, most of the page, is skipped by the parser.
+    """
+    return bs(text, parser_config.html_parser, parse_only=SEARCH_PAGE_PARTS)
 
 
 def get_ads_count(content: bs) -> int:
@@ -92,26 +229,6 @@ def get_page_count(content: bs, ads_count: int, config: Config) -> int:
     return page_count
 
 
-def extract_price_percent_diff(html: str) -> float:
-    soup = BeautifulSoup(html, 'html.parser')
-
-    # Находим блок с текстом сравнения цен
-    text_block = soup.find('div', class_='text')
-    if not text_block:
-        return 0
-
-    # Ищем элемент с процентом
-    percent_tag = text_block.find('span', class_='green-price')
-    if not percent_tag:
-        return 0
-
-    # Извлекаем текст и значение процента
-    percent_text = percent_tag.get_text(strip=True)
-    match = re.search(r'(\d+\.?\d*)%', percent_text)
-
-    return float(match.group(1)) if match else 0
-
-
 def get_ads_on_page(content: bs) -> ResultSet:
     ads_section = content.find("section", class_="a-search-list")
     if not ads_section:
@@ -122,124 +239,340 @@ def get_ads_on_page(content: bs) -> ResultSet:
     return ads
 
 
-def get_ads_urls(home_url, ads_on_page: ResultSet) -> list[str]:
-    ads_urls = []
-    for ad in ads_on_page:
-        title = ad.find("a", class_="a-card__title")
-        if not title:
-            raise ValueError(msg.CR_SOUP_FIND_ERROR.format("a-card__title"))
-        ad_url = title.get("href")
-        if not ad_url:
-            raise ValueError(msg.CR_SOUP_FIND_ERROR.format("href"))
-        ads_urls.append(home_url + ad_url)
-    return ads_urls
+def get_card(home_url: str, ad: Tag) -> Card:
+    """Read an Ad card of a search page, its title link is required."""
+    title = ad.find("a", class_="a-card__title")
+    if not title:
+        raise ValueError(msg.CR_SOUP_FIND_ERROR.format("a-card__title"))
+    ad_url = title.get("href")
+    if not ad_url:
+        raise ValueError(msg.CR_SOUP_FIND_ERROR.format("href"))
+    text = title.get_text(" ", strip=True)
+    rooms = ROOMS_PATTERN.search(text)
+    square = SQUARE_PATTERN.search(text)
+    price_tag = ad.find(class_="a-card__price")
+    price = "".join(filter(str.isdigit, price_tag.text)) if price_tag else ""
+    return Card(
+        id=int(ad["data-id"]),
+        url=home_url + ad_url,
+        price=int(price) if price else None,
+        room=int(rooms.group(1)) if rooms else None,
+        square=float(square.group(1).replace(",", ".")) if square else None,
+    )
 
 
-def filter_ads_on_db_exists(connector: DBConnection, ads_url: list[str]) -> list[str]:
-    filtered_ads_url = []
-    for url in ads_url:
-        try:
-            # Extract flat ID - fix to handle query parameters
-            # Get last part of URL after the last slash
-            id_part = url.split("/")[-1]
-            # Strip query parameters by taking everything before the question mark
-            flat_id = int(id_part.split("?")[0])
-            
-            # Check if the flat exists and get its latest price in one database query
-            query = """
-                SELECT p.price
-                FROM prices p
-                WHERE p.flat_id = %s
-                ORDER BY p.date DESC
-                LIMIT 1
-            """
-            
-            cursor = connector.connection.cursor()
-            cursor.execute(query, (flat_id,))
-            result = cursor.fetchone()
-            cursor.close()
-            
-            if not result:
-                # Flat doesn't exist, add to parse list
-                filtered_ads_url.append(url)
-                logger.debug(f"New listing found: {url}")
-        except Exception as e:
-            logger.error(f"Error checking flat existence: {e}")
-            filtered_ads_url.append(url)
+def get_cards(home_url: str, ads_on_page: ResultSet) -> list[Card]:
+    return [get_card(home_url, ad) for ad in ads_on_page]
+
+
+def parse_search_cards(text: str, parser_config: ParserConfig) -> list[Card]:
+    content = get_search_tree(text, parser_config)
+    return get_cards(parser_config.home_url, get_ads_on_page(content))
+
 
-    return filtered_ads_url
+def fetch_search_cards(
+    url: str,
+    client: HttpClient,
+    parser_config: ParserConfig,
+    parse_pool: ParsePool,
+) -> list[Card]:
+    """Cards of a search page, parsed by the parse pool."""
+    response = get_response(url, client)
+    return parse_pool.run(parse_search_cards, response.text, parser_config)
+
+
+def get_ad_id(url: str) -> str:
+    """Get Ad id from the Ad URL, ignoring query parameters."""
+    return url.split("/")[-1].split("?")[0]
+
+
+def get_repriced_urls(cards: list[Card], known: LatestPrices) -> set[str]:
+    """URLs of the saved Ads whose card shows a new price.
+
+    Their detail page must come from krisha.kz, a cached copy would hide
+    the change. Rechecked Ads, whose card shows no price, are requested
+    conditionally: validators are only kept for saved pages, so an
+    unchanged answer means the saved data is current.
+    """
+    return {
+        card.url
+        for card in cards
+        if card.price is not None and card.id in known
+    }
+
+
+def filter_new_or_repriced(
+    known: LatestPrices,
+    cards: list[Card],
+    parser_config: ParserConfig,
+    stats: CrawlStats,
+) -> list[Card]:
+    """Cards of Ads which are new or whose price differs from the saved one.
+
+    Only these need their detail page, the card price is enough to tell
+    that a known Ad has not changed. Known Ads whose card shows no price
+    and which were last checked more than recheck_days ago are rechecked
+    on their detail page, the oldest checked first, while the crawl's
+    recheck_budget lasts, except in incremental crawls.
+    """
+    stale_before = date.today() - timedelta(days=parser_config.recheck_days)
+    known.prefetch([card.id for card in cards])
+    changed = []
+    stale = []
+    for card in cards:
+        latest = known.get(card.id)
+        if latest is None:
+            logger.debug(msg.CR_NEW_LISTING, card.url)
+            changed.append(card)
+            continue
+        saved_price, checked_on = latest
+        if card.price is not None:
+            if card.price != saved_price:
+                logger.debug(
+                    msg.CR_REPRICED_LISTING, card.url, saved_price, card.price
+                )
+                changed.append(card)
+        elif checked_on < stale_before:
+            stale.append((checked_on, card))
+    # Incremental crawls only look for what is new
+    if parser_config.incremental:
+        return changed
+    stale.sort(key=lambda item: item[0])
+    for _, card in stale:
+        if stats.rechecked >= parser_config.recheck_budget:
+            break
+        stats.rechecked += 1
+        changed.append(card)
+    return changed
+
+
+def parse_ad_page(
+    url: str,
+    response: Response,
+    flat_parser: FlatParser,
+    parse_pool: ParsePool,
+) -> AdPage:
+    page = AdPage(response)
+    start = time.perf_counter()
+    try:
+        # green_percentage is filled in later by the AnalyticsEnricher
+        page.flat = parse_pool.run(
+            flat_parser.get_flat_from_page, response.content, url, None
+        )
+    except Exception as error:
+        page.error = error
+    page.parse_time = time.perf_counter() - start
+    return page
+
+
+def fetch_ad_page(
+    url: str,
+    client: HttpClient,
+    flat_parser: FlatParser,
+    parse_pool: ParsePool,
+    fresh: bool = False,
+) -> AdPage:
+    """Fetch the detail page of an Ad and parse it, unless it is unchanged.
+
+    Request errors are raised, parse errors kept in the AdPage.
+    """
+    response = get_response(url, client, fresh=fresh)
+    if is_unchanged(response):
+        return AdPage(response)
+    return parse_ad_page(url, response, flat_parser, parse_pool)
+
+
+def fetch_ads_pages(
+    executor: ThreadPoolExecutor,
+    ads_urls: list[str],
+    client: HttpClient,
+    flat_parser: FlatParser,
+    parse_pool: ParsePool,
+    fresh_urls: Collection[str] = frozenset(),
+) -> list[tuple[str, Future]]:
+    """Submit detail page requests of every Ad at once.
+
+    Pages are parsed by the fetch threads as they arrive, while the others
+    are still fetched. Pages of fresh_urls are fetched fresh. Returns
+    (url, AdPage future) in the order of ads_urls.
+    """
+    return [
+        (
+            url,
+            executor.submit(
+                fetch_ad_page,
+                url,
+                client,
+                flat_parser,
+                parse_pool,
+                url in fresh_urls,
+            ),
+        )
+        for url in ads_urls
+    ]
+
+
+def is_unchanged(response: Response) -> bool:
+    return getattr(response, "unchanged", False)
+
+
+def discard_validators(client: HttpClient, urls: list[str]) -> None:
+    """Drop the validators of Ads which will not be saved this time."""
+    if client.validators is not None:
+        client.validators.discard(urls)
+
+
+def save_checked(connector: DBConnection, known: LatestPrices) -> None:
+    """Save the day of the rechecks which found their flat unchanged."""
+    flat_ids = known.pop_checked()
+    if flat_ids:
+        mark_flats_checked(connector, flat_ids)
+
+
+def save_flats(
+    connector: DBConnection,
+    client: HttpClient,
+    flats_data: list[Flat],
+    known: LatestPrices,
+    enricher: AnalyticsEnricher,
+    stats: CrawlStats,
+) -> None:
+    """Insert Flats, keep the validators of their pages and queue them
+    for green_percentage.
+
+    The Flats are new or repriced, so they are the only ones whose
+    analytics are fetched. Results ready by now are written back.
+    """
+    saved = False
+    try:
+        saved = insert_flats_data_db(connector, flats_data)
+    finally:
+        if not saved:
+            discard_validators(client, [flat.url for flat in flats_data])
+    if not saved:
+        return
+    stats.flats += len(flats_data)
+    for flat in flats_data:
+        latest = known.get(flat.id)
+        if latest is None:
+            stats.new += 1
+        elif latest[0] != flat.price:
+            stats.repriced += 1
+    known.update(flats_data)
+    if client.validators is not None:
+        client.validators.commit([flat.url for flat in flats_data])
+    enricher.submit_flats(flats_data)
+    enricher.flush(connector)
+
+
+def get_flat_data(
+    url: str,
+    flat: Flat,
+    known: LatestPrices,
+) -> Flat | None:
+    """Flat of a parsed Ad page, None if the Ad price has not changed."""
+    flat_id = int(get_ad_id(url))
+    result = known.get(flat_id)
+    if result and result[0] == flat.price:
+        # Price hasn't changed, skip this listing
+        logger.info(f"Skipping listing {url} - price unchanged: {flat.price}")
+        return None
+    logger.debug(f"Parsed listing {url} - price: {flat.price}")
+    return flat
 
 
 def get_flats_data_on_page(
         ads_urls: list[str],
         config: Config,
         flat_parser: FlatParser,
-        connector: DBConnection
+        known: LatestPrices,
+        client: HttpClient,
+        retry_queue: RetryQueue,
+        parse_pool: ParsePool,
+        fresh_urls: Collection[str] = frozenset(),
+        shutdown: threading.Event | None = None,
+        fresh_known: bool = False,
 ) -> list[Flat]:
-    missed_ad_counter = 0
+    """Get Flats of the Ads, deferring failed requests to retry_queue.
+
+    Ads whose detail page is unchanged since it was saved are skipped
+    without parsing, as long as the Flat is known to be saved. Pages of
+    fresh_urls, and with fresh_known those of every saved Ad, are always
+    fetched from krisha.kz and parsed. Once shutdown is set, the requests
+    not started yet are cancelled and CrawlInterruptedError is raised.
+    """
+    max_skip_ad = config.parser_config.max_skip_ad
+    validators = client.validators
+    known.prefetch([int(get_ad_id(url)) for url in ads_urls])
+    if fresh_known:
+        fresh_urls = {url for url in ads_urls if int(get_ad_id(url)) in known}
     flats_data = []
-    for url in ads_urls:
-        try:
-            # Get flat ID from URL - fix to handle query parameters
-            id_part = url.split("/")[-1]
-            flat_id = int(id_part.split("?")[0])
-            
-            # First, get current price from API
-            home_number = id_part.split("?")[0]  # Use clean ID without query params
+    unchanged = []
+    with ThreadPoolExecutor(
+        max_workers=config.parser_config.max_workers
+    ) as executor:
+        ads_pages = fetch_ads_pages(
+            executor, ads_urls, client, flat_parser, parse_pool, fresh_urls
+        )
+        for url, page_future in ads_pages:
+            if shutdown is not None and shutdown.is_set():
+                executor.shutdown(cancel_futures=True)
+                discard_validators(client, ads_urls)
+                raise CrawlInterruptedError
             try:
-                priceAnalyze = get_response(PRICE_ANALYZE_URL + home_number, config)
-                response = get_response(url, config)
-                content = get_content(response)
-                
-                # Check price before fully parsing
-                price_element = content.select_one(".offer__price")
-                if price_element:
-                    current_price_text = price_element.get_text(strip=True)
-                    current_price = int(''.join(filter(str.isdigit, current_price_text)))
-                    
-                    # Query DB for existing price
-                    query = """
-                        SELECT p.price
-                        FROM prices p
-                        WHERE p.flat_id = %s
-                        ORDER BY p.date DESC
-                        LIMIT 1
-                    """
-                    
-                    cursor = connector.connection.cursor()
-                    cursor.execute(query, (flat_id,))
-                    result = cursor.fetchone()
-                    cursor.close()
-                    
-                    if result and result[0] == current_price:
-                        # Price hasn't changed, skip this listing
-                        logger.info(f"Skipping listing {url} - price unchanged: {current_price}")
+                page = page_future.result()
+                if is_unchanged(page.response):
+                    if int(get_ad_id(url)) in known:
+                        retry_queue.succeed(url)
+                        unchanged.append(int(get_ad_id(url)))
+                        validators.record_skip()
+                        # Same page, maybe with a newer ETag
+                        validators.commit([url])
                         continue
-                    
-                    # Price has changed or new listing, proceed with parsing
-                    greenPercentage = extract_price_percent_diff(priceAnalyze.text)
-                    flat = flat_parser.get_flat(content, url, greenPercentage)
-                    flats_data.append(flat)
-                    logger.debug(f"Parsed listing {url} - price: {current_price}")
-                else:
-                    # If we can't determine the price from the page, parse it anyway
-                    greenPercentage = extract_price_percent_diff(priceAnalyze.text)
-                    flat = flat_parser.get_flat(content, url, greenPercentage)
-                    flats_data.append(flat)
-                
-            except MaximumRetryRequestsError as error:
-                missed_ad_counter += 1
-                if missed_ad_counter > config.parser_config.max_skip_ad:
+                    response = page.response
+                    if response.status_code == requests.codes.not_modified:
+                        # Saved data is gone, the page is needed again
+                        response = get_response(url, client, conditional=False)
+                    page = parse_ad_page(
+                        url, response, flat_parser, parse_pool
+                    )
+            except ClientRequestError as error:
+                # Removed or unavailable Ad, retrying will not help
+                retry_queue.fail(url, error, missed=False)
+                discard_validators(client, [url])
+                continue
+            except RequestFailedError as error:
+                retry_queue.defer(url, error)
+                discard_validators(client, [url])
+                if retry_queue.missed > max_skip_ad:
+                    discard_validators(client, ads_urls)
                     raise MaximumMissedAdError from error
-                logger.warning(msg.CR_SKIP_AD)
-        except Exception as e:
-            logger.error(f"Error processing URL {url}: {e}")
-            missed_ad_counter += 1
-            if missed_ad_counter > config.parser_config.max_skip_ad:
-                raise MaximumMissedAdError from e
+                continue
 
-        sleep(config.parser_config.sleep_time)
+            try:
+                if page.error is not None:
+                    raise page.error
+                flat = get_flat_data(url, page.flat, known)
+                if validators is not None:
+                    validators.record_parse(page.parse_time)
+            except Exception as e:
+                logger.error(f"Error processing URL {url}: {e}")
+                retry_queue.fail(url, e, missed=True)
+                discard_validators(client, [url])
+                if retry_queue.missed > max_skip_ad:
+                    discard_validators(client, ads_urls)
+                    raise MaximumMissedAdError from e
+                continue
+            retry_queue.succeed(url)
+            if flat:
+                flats_data.append(flat)
+                continue
+            # Price unchanged, the saved data is up to date
+            unchanged.append(int(get_ad_id(url)))
+            if validators is not None:
+                validators.commit([url])
 
+    known.check(unchanged)
     logger.debug(msg.CR_ADS_ON_PAGE_OK)
     return flats_data
 
@@ -256,147 +589,689 @@ def get_next_url(home_url, content: bs) -> str:
     return url
 
 
-def run_crawler(config: Config, connector: DBConnection, url: str) -> None:
-    response = get_response(url, config)
-    content = get_content(response)
+def process_due_retries(
+    config: Config,
+    flat_parser: FlatParser,
+    connector: DBConnection,
+    client: HttpClient,
+    retry_queue: RetryQueue,
+    parse_pool: ParsePool,
+    known: LatestPrices,
+    enricher: AnalyticsEnricher,
+    stats: CrawlStats,
+    wait: bool = False,
+    shutdown: threading.Event | None = None,
+) -> None:
+    """Fetch deferred Ads which are due and insert them.
+
+    With wait=True sleeps until every deferred Ad is either saved or moved
+    to the dead letters, which is only done when no pages are left. Returns
+    as soon as shutdown is set, with the Ads not tried yet deferred again,
+    as they are on MaximumMissedAdError before it is raised.
+    """
+    if shutdown is None:
+        shutdown = threading.Event()
+    while retry_queue and not shutdown.is_set():
+        due = retry_queue.pop_due()
+        if not due:
+            if not wait:
+                return
+            delay = retry_queue.next_due_in()
+            logger.info(msg.CR_RETRY_WAIT.format(delay, len(retry_queue)))
+            if shutdown.wait(delay):
+                return
+            continue
+        logger.info(msg.CR_RETRY_DUE.format(len(due)))
+        try:
+            # Why an Ad was queued is not kept, a repriced one may be due
+            flats_data = get_flats_data_on_page(
+                [item.url for item in due],
+                config,
+                flat_parser,
+                known,
+                client,
+                retry_queue,
+                parse_pool,
+                shutdown=shutdown,
+                fresh_known=True,
+            )
+        except CrawlInterruptedError:
+            retry_queue.requeue(due)
+            return
+        except MaximumMissedAdError:
+            retry_queue.requeue(due)
+            raise
+        save_checked(connector, known)
+        if flats_data:
+            save_flats(connector, client, flats_data, known, enricher, stats)
+
+
+def get_page_cards(
+    config: Config, client: HttpClient, url: str, content: bs
+) -> tuple[list[Card] | None, bs]:
+    """Get Ad cards of a search page, refetching the page on errors.
+
+    Returns the cards, or None if the page could not be read, and the last
+    fetched content of the page.
+    """
+    max_page_errors = 3
+    for page_error_count in range(1, max_page_errors + 1):
+        try:
+            ads_on_page = get_ads_on_page(content)
+            cards = get_cards(config.parser_config.home_url, ads_on_page)
+            return cards, content
+        except Exception as e:
+            logger.error(
+                msg.CR_PAGE_ERROR.format(
+                    url, page_error_count, max_page_errors, e
+                )
+            )
+
+            if page_error_count >= max_page_errors:
+                logger.warning(msg.CR_PAGE_SKIPPED.format(url))
+                return None, content
+
+            logger.info(msg.CR_SLEEP.format(config.parser_config.sleep_time))
+            sleep(config.parser_config.sleep_time)
+
+            # Try to refresh the page content before retrying
+            try:
+                response = get_page_response(url, client)
+                content = get_content(response, config.parser_config)
+            except Exception as refresh_err:
+                logger.error(msg.CR_PAGE_REFRESH_ERROR.format(refresh_err))
+
+
+def get_next_page(
+    config: Config, client: HttpClient, content: bs
+) -> tuple[str, bs] | None:
+    """Fetch the next search page, None if pagination can't go on."""
+    max_next_page_errors = 3
+    for next_page_error_count in range(1, max_next_page_errors + 1):
+        try:
+            next_url = get_next_url(config.parser_config.home_url, content)
+            response = get_page_response(next_url, client)
+            return next_url, get_content(response, config.parser_config)
+        except Exception as next_e:
+            logger.error(
+                msg.CR_NEXT_PAGE_ERROR.format(
+                    next_page_error_count, max_next_page_errors, next_e
+                )
+            )
+
+            if next_page_error_count < max_next_page_errors:
+                sleep(config.parser_config.sleep_time * next_page_error_count)
+
+    logger.error(msg.CR_NEXT_PAGE_STOP)
+    return None
+
+
+def put_search_page(
+    pages: Queue, page: SearchPage | None, stop: threading.Event
+) -> bool:
+    """Put page into the bounded queue unless the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            pages.put(page, timeout=1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+def get_search_pages(
+    pages: Queue, shutdown: threading.Event
+) -> Iterator[SearchPage]:
+    """Pages put by the producer, until it is done or shutdown is set."""
+    while not shutdown.is_set():
+        try:
+            page = pages.get(timeout=1)
+        except Empty:
+            continue
+        if page is None:
+            return
+        yield page
+
+
+def produce_search_pages(
+    config: Config,
+    client: HttpClient,
+    url: str,
+    content: bs,
+    page_count: int,
+    pages: Queue,
+    stop: threading.Event,
+    pages_done: set[int] = frozenset(),
+) -> None:
+    """Walk the search pagination ahead of the Ad processing.
+
+    Puts a SearchPage per page into the bounded pages queue and None once
+    the pagination is over, so the next search pages are fetched while
+    the Ads of the previous ones are processed. The walk starts at the
+    first page not in pages_done, and done pages are not put again.
+    """
+    try:
+        first = next(
+            (n for n in range(1, page_count + 1) if n not in pages_done), None
+        )
+        if first is None:
+            return
+        if first > 1:
+            url = FirstPage.get_page_url(url, first, config.parser_config)
+            content = get_content(
+                get_page_response(url, client), config.parser_config
+            )
+        for num in range(first, page_count + 1):
+            cards, content = get_page_cards(config, client, url, content)
+            if cards is not None and num not in pages_done:
+                page = SearchPage(num=num, url=url, cards=cards)
+                if not put_search_page(pages, page, stop):
+                    return
+            if num < page_count:
+                next_page = get_next_page(config, client, content)
+                if next_page is None:
+                    break
+                url, content = next_page
+    except Exception as e:
+        logger.error(msg.CR_PRODUCER_ERROR.format(e))
+    finally:
+        put_search_page(pages, None, stop)
+
+
+def produce_search_pages_parallel(
+    config: Config,
+    client: HttpClient,
+    url: str,
+    content: bs,
+    page_count: int,
+    pages: Queue,
+    stop: threading.Event,
+    parse_pool: ParsePool,
+    pages_done: set[int] = frozenset(),
+) -> None:
+    """Fetch all search pages at once by their page number URLs.
+
+    Requests go through the client's rate and concurrency limiters, and
+    pages are parsed by parse_pool as they arrive. A page which fails or
+    has no Ads is deferred and fetched again on its own after
+    page_retry_delay, the rest of the crawl is not affected. Pages in
+    pages_done are skipped. Once stop is set, the page requests which
+    have not started yet are cancelled.
+    """
+    parser = config.parser_config
+    page_retry_queue = RetryQueue(
+        parser.page_retry_delay, config.path.dead_letters_file
+    )
+    page_nums = {
+        FirstPage.get_page_url(url, num, parser): num
+        for num in range(1, page_count + 1)
+    }
+    if 1 not in pages_done:
+        try:
+            cards = get_cards(parser.home_url, get_ads_on_page(content))
+        except Exception as e:
+            page_retry_queue.defer(url, e)
+        else:
+            first_page = SearchPage(num=1, url=url, cards=cards)
+            if not put_search_page(pages, first_page, stop):
+                return
+
+    executor = ThreadPoolExecutor(max_workers=parser.max_workers)
+    try:
+        page_urls = [
+            page_url
+            for page_url, num in page_nums.items()
+            if num > 1 and num not in pages_done
+        ]
+        while page_urls and not stop.is_set():
+            futures = {
+                executor.submit(
+                    fetch_search_cards,
+                    page_url,
+                    client,
+                    parser,
+                    parse_pool,
+                ): page_url
+                for page_url in page_urls
+            }
+            for future in as_completed(futures):
+                page_url = futures[future]
+                try:
+                    cards = future.result()
+                except ClientRequestError as e:
+                    page_retry_queue.fail(page_url, e, missed=False)
+                    continue
+                except Exception as e:
+                    page_retry_queue.defer(page_url, e)
+                    continue
+                page_retry_queue.succeed(page_url)
+                page = SearchPage(
+                    num=page_nums[page_url], url=page_url, cards=cards
+                )
+                if not put_search_page(pages, page, stop):
+                    return
+
+            # Wait for the next deferred pages, if any
+            page_urls = []
+            while page_retry_queue and not page_urls:
+                if stop.wait(page_retry_queue.next_due_in()):
+                    return
+                page_urls = [item.url for item in page_retry_queue.pop_due()]
+    except Exception as e:
+        logger.error(msg.CR_PRODUCER_ERROR.format(e))
+    finally:
+        executor.shutdown(cancel_futures=True)
+        page_retry_queue.log_stats()
+        put_search_page(pages, None, stop)
+
+
+def filter_page_cards(
+    page: SearchPage,
+    config: Config,
+    connector: DBConnection,
+    known: LatestPrices,
+    stats: CrawlStats,
+) -> list[Card] | None:
+    """Cards of the page to fetch, None if the filter kept failing."""
+    # Try filtering with retry logic for database operations
+    max_retries = 3
+    for retry in range(max_retries):
+        try:
+            return filter_new_or_repriced(
+                known, page.cards, config.parser_config, stats
+            )
+        except Exception as e:
+            logger.error(msg.CR_FILTER_ERROR.format(retry + 1, max_retries, e))
+
+            # Try to reconnect to the database if needed
+            if "connection" in str(e).lower() or "closed" in str(e).lower():
+                try:
+                    logger.info(msg.CR_RECONNECT)
+                    connector.reconnect()
+                except Exception as conn_err:
+                    logger.error(msg.CR_RECONNECT_ERROR.format(conn_err))
+
+            if retry == max_retries - 1:
+                logger.warning(msg.CR_MAX_RETRIES.format("filtering Ads"))
+            else:
+                sleep_time = config.parser_config.sleep_time * (retry + 1)
+                logger.info(msg.CR_SLEEP.format(sleep_time))
+                sleep(sleep_time)
+    return None
+
+
+def process_search_page(
+    page: SearchPage,
+    page_count: int,
+    config: Config,
+    flat_parser: FlatParser,
+    connector: DBConnection,
+    client: HttpClient,
+    retry_queue: RetryQueue,
+    parse_pool: ParsePool,
+    known: LatestPrices,
+    enricher: AnalyticsEnricher,
+    stats: CrawlStats,
+    shutdown: threading.Event | None = None,
+) -> int:
+    """Filter the Ads of a search page, get their Flats and save them.
+
+    Returns the number of Ads which were new or repriced. Raises
+    CrawlInterruptedError if shutdown is set before the Flats are got.
+    """
+    num = page.num
+    ads_urls = page.ads_urls
+    stats.pages += 1
+    stats.ads += len(ads_urls)
+
+    fresh_urls = set()
+    fresh_known = False
+    if page.resumed:
+        # Card prices of an interrupted page are not kept, so all its Ads
+        # are fetched, the saved ones fresh as any of them may be repriced
+        filtered_ads_url = ads_urls
+        fresh_known = True
+    else:
+        changed = filter_page_cards(page, config, connector, known, stats)
+        if changed is None:
+            logger.warning(msg.CR_FILTER_FAILED.format(num))
+            # Use all ads, unchanged known Ads are told apart by their
+            # validators
+            filtered_ads_url = ads_urls
+        else:
+            filtered_ads_url = [card.url for card in changed]
+            fresh_urls = get_repriced_urls(changed, known)
+
+    if len(filtered_ads_url) == 0:
+        logger.info(msg.CR_PAGE_NOTHING_NEW.format(num, page_count))
+        return 0
+
+    logger.info(
+        msg.CR_PAGE_FOUND.format(num, page_count, len(filtered_ads_url))
+    )
+
+    # Process flats data with improved retry logic
+    flats_data = []
+    max_retries = 3
+
+    for retry in range(max_retries):
+        try:
+            flats_data = get_flats_data_on_page(
+                filtered_ads_url,
+                config,
+                flat_parser,
+                known,
+                client,
+                retry_queue,
+                parse_pool,
+                fresh_urls,
+                shutdown,
+                fresh_known,
+            )
+            break
+        except CrawlInterruptedError:
+            raise
+        except MaximumMissedAdError as e:
+            # Don't retry if we hit the maximum number of missed ads
+            logger.error(msg.CR_MAX_MISSED.format(e))
+            break
+        except Exception as e:
+            logger.error(msg.CR_FLATS_ERROR.format(retry + 1, max_retries, e))
+
+            if retry == max_retries - 1:
+                logger.warning(msg.CR_MAX_RETRIES.format("processing flats"))
+            else:
+                sleep_time = config.parser_config.sleep_time * (retry + 1)
+                logger.info(msg.CR_SLEEP.format(sleep_time))
+                sleep(sleep_time)
+
+    try:
+        save_checked(connector, known)
+    except Exception as e:
+        logger.error(msg.CR_CHECKED_ERROR.format(e))
+
+    if flats_data:
+        # insert_flats_data_db retries deadlocks itself
+        try:
+            save_flats(connector, client, flats_data, known, enricher, stats)
+            logger.info(
+                msg.CR_PAGE_INSERTED.format(num, page_count, len(flats_data))
+            )
+        except Exception as e:
+            logger.error(msg.CR_INSERT_ERROR.format(e))
+            # insert_flats_data_db already retries
+    else:
+        logger.info(msg.CR_PAGE_NOTHING_INSERTED.format(num, page_count))
+    return len(filtered_ads_url)
+
+
+def save_progress(
+    connector: DBConnection, checkpoint: Checkpoint, retry_queue: RetryQueue
+) -> None:
+    checkpoint.retries = retry_queue.dump()
+    save_checkpoint(connector, checkpoint)
+
+
+def run_crawler(
+    config: Config,
+    connector: DBConnection,
+    client: HttpClient,
+    url: str,
+    parse_pool: ParsePool,
+    shutdown: threading.Event | None = None,
+) -> CrawlStats:
+    """Crawl the search url, resuming from its checkpoint if there is one.
+
+    Progress is saved to crawl_checkpoints around every page, so a run
+    restarted after a database error or a shutdown goes on from the page
+    it stopped at, with the Ads deferred so far. The checkpoint is removed
+    once the search has been crawled to the end.
+
+    Once shutdown is set, the producer is stopped and the page being
+    processed is interrupted, its Ads stay pending in the checkpoint.
+    """
+    stats = CrawlStats()
+    if shutdown is None:
+        shutdown = threading.Event()
+    if shutdown.is_set():
+        return stats
+    response = get_page_response(url, client)
+    content = get_content(response, config.parser_config)
     ads_count = get_ads_count(content)
-    
+
     # If no ads were found, log warning and return instead of failing
     if ads_count == 0:
-        logger.warning(f"No ads found for URL: {url}. Try using different search parameters.")
-        return
-        
+        logger.warning(msg.CR_URL_ADS_NOT_FOUND.format(url))
+        return stats
+
     page_count = get_page_count(content, ads_count, config)
     flat_parser = FlatParser
+    retry_queue = RetryQueue(
+        config.parser_config.retry_delay, config.path.dead_letters_file
+    )
+
+    create_checkpoints(connector)
+    checkpoint = load_checkpoint(
+        connector, url, config.parser_config.checkpoint_max_age_hours
+    )
+    if checkpoint is None:
+        checkpoint = Checkpoint(url=url, profile=config.search_params.name)
+    else:
+        retry_queue.load(checkpoint.retries)
+        logger.info(
+            msg.CR_CHECKPOINT_RESUME.format(
+                len(checkpoint.pages_done), page_count, len(retry_queue)
+            )
+        )
+    pages_done = set(checkpoint.pages_done)
+    seen = open_seen_filter(config.path.seen_filter_file)
+    if config.parser_config.preload_known_listings:
+        known = load_known_listings(connector, seen)
+    else:
+        known = PriceLookup(connector, seen)
+
+    # The page interrupted last time is finished first from its saved Ads
+    interrupted = []
+    if checkpoint.pending and checkpoint.page not in pages_done:
+        cards = [
+            Card(id=int(get_ad_id(ad_url)), url=ad_url)
+            for ad_url in checkpoint.pending
+        ]
+        interrupted.append(
+            SearchPage(checkpoint.page, url, cards, resumed=True)
+        )
+        pages_done.add(checkpoint.page)
+
+    # Incremental crawls go newest first and stop once nothing changes
+    early_stop = None
+    if config.parser_config.incremental:
+        create_watermarks(connector)
+        early_stop = EarlyStop(
+            watermark=load_watermark(connector, config.search_params.name),
+            quiet_pages=config.parser_config.incremental_quiet_pages,
+        )
 
-    with logging_redirect_tqdm():
-        for num in trange(1, page_count + 1):
-            page_error_count = 0
-            max_page_errors = 3
-            
-            while page_error_count < max_page_errors:
+    # Search pages are fetched ahead by the producer thread into a bounded
+    # queue while the Ads of already fetched pages are processed here.
+    # Pages are fetched in order when the crawl may stop early
+    pages = Queue(maxsize=config.parser_config.prefetch_pages)
+    stop = threading.Event()
+    produce = produce_search_pages
+    kwargs = {"pages_done": frozenset(pages_done)}
+    if config.parser_config.parallel_pages and early_stop is None:
+        produce = produce_search_pages_parallel
+        kwargs["parse_pool"] = parse_pool
+    producer = threading.Thread(
+        target=produce,
+        args=(config, client, url, content, page_count, pages, stop),
+        kwargs=kwargs,
+        daemon=True,
+    )
+    producer.start()
+    enricher = AnalyticsEnricher(
+        client, config.parser_config.analytics_workers, parse_pool
+    )
+
+    finished = False
+    try:
+        with (
+            logging_redirect_tqdm(),
+            tqdm(
+                total=page_count, initial=len(checkpoint.pages_done)
+            ) as progress,
+        ):
+            for page in chain(interrupted, get_search_pages(pages, shutdown)):
+                checkpoint.page = page.num
+                checkpoint.pending = page.ads_urls
+                save_progress(connector, checkpoint, retry_queue)
+                if shutdown.is_set():
+                    break
                 try:
-                    # Get ads on current page
-                    ads_on_page = get_ads_on_page(content)
-                    ads_urls = get_ads_urls(config.parser_config.home_url, ads_on_page)
-                    
-                    # Try filtering with retry logic for database operations
-                    max_retries = 3
-                    filtered_ads_url = []
-                    filter_success = False
-                    
-                    for retry in range(max_retries):
-                        try:
-                            filtered_ads_url = filter_ads_on_db_exists(connector, ads_urls)
-                            filter_success = True
-                            break
-                        except Exception as e:
-                            logger.error(f"Error filtering ads (attempt {retry+1}/{max_retries}): {e}")
-                            
-                            # Try to reconnect to the database if needed
-                            if "connection" in str(e).lower() or "closed" in str(e).lower():
-                                try:
-                                    logger.info("Attempting to reconnect to database...")
-                                    connector.reconnect()
-                                except Exception as conn_err:
-                                    logger.error(f"Failed to reconnect: {conn_err}")
-                                    
-                            if retry == max_retries - 1:
-                                logger.warning("Max retries reached for filtering ads.")
-                            else:
-                                sleep_time = config.parser_config.sleep_time * (retry + 1)
-                                logger.info(f"Retrying in {sleep_time} seconds...")
-                                sleep(sleep_time)
-                    
-                    if not filter_success:
-                        logger.warning(f"Could not filter ads on page {num}, continuing with all ads")
-                        filtered_ads_url = ads_urls  # Use all ads if filtering failed
-                    
-                    if len(filtered_ads_url) == 0:
-                        logger.info(f"Page {num}/{page_count}: No new listings to process")
-                        break  # Break out of retry loop for this page
-                    
-                    logger.info(f"Page {num}/{page_count}: Found {len(filtered_ads_url)} new or updated listings")
-                    
-                    # Process flats data with improved retry logic
-                    flats_data = []
-                    max_retries = 3
-                    process_success = False
-                    
-                    for retry in range(max_retries):
-                        try:
-                            flats_data = get_flats_data_on_page(filtered_ads_url, config, flat_parser, connector)
-                            process_success = True
-                            break
-                        except MaximumMissedAdError as e:
-                            # Don't retry if we hit the maximum number of missed ads
-                            logger.error(f"Maximum missed ad limit reached: {e}")
-                            break
-                        except Exception as e:
-                            logger.error(f"Error processing flats data (attempt {retry+1}/{max_retries}): {e}")
-                            
-                            if retry == max_retries - 1:
-                                logger.warning("Max retries reached for processing flats.")
-                            else:
-                                sleep_time = config.parser_config.sleep_time * (retry + 1)
-                                logger.info(f"Retrying in {sleep_time} seconds...")
-                                sleep(sleep_time)
-                    
-                    if flats_data:
-                        # Insert data with retry logic built into the improved insert_flats_data_db function
-                        try:
-                            insert_flats_data_db(connector, flats_data)
-                            logger.info(f"Page {num}/{page_count}: Inserted {len(flats_data)} listings")
-                        except Exception as e:
-                            logger.error(f"Failed to insert flats data: {e}")
-                            # No need to retry here as insert_flats_data_db already has retry logic
-                    else:
-                        logger.info(f"Page {num}/{page_count}: No listings to insert after processing")
-                    
-                    logger.info(msg.CR_PROCESS.format(num, page_count))
-                    
-                    # Successfully processed this page
-                    break  # Break out of retry loop for this page
-                
-                except Exception as e:
-                    page_error_count += 1
-                    logger.error(f"Error processing page {num} (attempt {page_error_count}/{max_page_errors}): {e}")
-                    
-                    if page_error_count >= max_page_errors:
-                        logger.warning(f"Maximum errors reached for page {num}, moving to next page")
-                    else:
-                        logger.info(f"Retrying page {num} in {config.parser_config.sleep_time} seconds...")
-                        sleep(config.parser_config.sleep_time)
-                        
-                        # Try to refresh the page content before retrying
-                        try:
-                            response = get_response(url, config)
-                            content = get_content(response)
-                        except Exception as refresh_err:
-                            logger.error(f"Failed to refresh page content: {refresh_err}")
-            
-            # Proceed to next page regardless of success or failure on current page
-            sleep(config.parser_config.sleep_time)
-            
-            if num < page_count:
-                next_page_error_count = 0
-                max_next_page_errors = 3
-                
-                while next_page_error_count < max_next_page_errors:
-                    try:
-                        next_url = get_next_url(config.parser_config.home_url, content)
-                        response = get_response(next_url, config)
-                        content = get_content(response)
-                        break
-                    except Exception as next_e:
-                        next_page_error_count += 1
-                        logger.error(f"Failed to proceed to next page (attempt {next_page_error_count}/{max_next_page_errors}): {next_e}")
-                        
-                        if next_page_error_count >= max_next_page_errors:
-                            logger.error("Could not proceed to next page after maximum retries. Stopping crawler.")
-                            # Exit the crawler if we can't proceed to the next page after several attempts
-                            return
-                        
-                        sleep(config.parser_config.sleep_time * next_page_error_count)
+                    changed = process_search_page(
+                        page,
+                        page_count,
+                        config,
+                        flat_parser,
+                        connector,
+                        client,
+                        retry_queue,
+                        parse_pool,
+                        known,
+                        enricher,
+                        stats,
+                        shutdown,
+                    )
+                except CrawlInterruptedError:
+                    break
+                checkpoint.pages_done.append(page.num)
+                checkpoint.pending = []
+                save_progress(connector, checkpoint, retry_queue)
+                logger.info(msg.CR_PROCESS.format(page.num, page_count))
+                progress.update()
+                if early_stop is not None and early_stop.update(
+                    page.cards, changed
+                ):
+                    logger.info(
+                        msg.CR_EARLY_STOP.format(
+                            early_stop.quiet, page.num, page_count
+                        )
+                    )
+                    break
 
+                # Revisit deferred Ads which are due while pages are left
+                try:
+                    process_due_retries(
+                        config,
+                        flat_parser,
+                        connector,
+                        client,
+                        retry_queue,
+                        parse_pool,
+                        known,
+                        enricher,
+                        stats,
+                        shutdown=shutdown,
+                    )
+                except MaximumMissedAdError as error:
+                    logger.error(msg.CR_MAX_MISSED.format(error))
+
+            # Wait for the Ads still deferred before finishing the run,
+            # every missed Ad moves it closer to the dead letters
+            while not shutdown.is_set():
+                try:
+                    process_due_retries(
+                        config,
+                        flat_parser,
+                        connector,
+                        client,
+                        retry_queue,
+                        parse_pool,
+                        known,
+                        enricher,
+                        stats,
+                        wait=True,
+                        shutdown=shutdown,
+                    )
+                    break
+                except MaximumMissedAdError as error:
+                    logger.error(msg.CR_MAX_MISSED.format(error))
+        if shutdown.is_set():
+            logger.info(
+                msg.CR_INTERRUPTED.format(
+                    len(checkpoint.pages_done),
+                    page_count,
+                    len(checkpoint.pending),
+                )
+            )
+        else:
+            finished = True
+            delete_checkpoint(connector, url)
+            if early_stop is not None and early_stop.newest is not None:
+                save_watermark(
+                    connector, config.search_params.name, early_stop.newest
+                )
+    finally:
+        stop.set()
+        if seen is not None:
+            seen.close()
+        try:
+            enricher.close(connector)
+        except Exception as error:
+            # Prices left without green_percentage are backfilled later
+            logger.error(msg.AN_WRITE_ERROR.format(error))
+        if not finished:
+            try:
+                save_progress(connector, checkpoint, retry_queue)
+            except Exception as error:
+                logger.error(msg.CR_CHECKPOINT_ERROR.format(error))
+
+    retry_queue.log_stats()
+    logger.info(
+        msg.CR_PRICE_CHANGES.format(stats.new, stats.repriced, stats.rechecked)
+    )
     logger.info(msg.CR_STOPPED)
+    return stats
+
+
+def run_with_retries(
+    config: Config,
+    client: HttpClient,
+    pool: DBConnectionPool,
+    parse_pool: ParsePool,
+    shutdown: threading.Event | None = None,
+) -> CrawlStats:
+    """Run the crawler, restarting it on recoverable database errors.
+
+    A restarted crawl resumes from its checkpoint on a new connection.
+    """
+    max_retries = 3
+    for attempt in range(1, max_retries + 1):
+        try:
+            with pool.connection() as connector:
+                url = FirstPage.get_url(config)
+                # The search URL helps to diagnose search parameter issues
+                logger.info(
+                    msg.CR_PROFILE_START.format(config.search_params.name, url)
+                )
+                return run_crawler(
+                    config, connector, client, url, parse_pool, shutdown
+                )
+        except psycopg2.errors.DeadlockDetected as e:
+            logger.error(msg.CR_DEADLOCK.format(attempt, max_retries, e))
+            if attempt == max_retries:
+                logger.critical(msg.CR_GIVE_UP)
+                raise
+            # Exponential backoff
+            sleep_time = 5 * 2 ** (attempt - 1)
+        except psycopg2.OperationalError as e:
+            logger.error(msg.CR_DB_ERROR.format(attempt, max_retries, e))
+            if attempt == max_retries:
+                logger.critical(msg.CR_GIVE_UP)
+                raise
+            sleep_time = 10 * 2 ** (attempt - 1)
+        except Exception as e:
+            # Other errors are not retried
+            logger.critical(msg.CR_UNRECOVERABLE.format(e))
+            raise
+        logger.info(msg.CR_RESTART.format(sleep_time))
+        sleep(sleep_time)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+import requests
+from requests import Response
+
+import src.krisha.common.msg as msg
+from src.krisha.config.parser import ParserConfig
+from src.krisha.crawler.response_cache import DETAIL, get_endpoint
+
+logger = logging.getLogger()
+
+
+@dataclass
+class ValidatorStats:
+    not_modified: int = 0
+    same_hash: int = 0
+    bytes_saved: int = 0
+    parsed: int = 0
+    parse_time: float = 0.0
+    parse_skipped: int = 0
+
+    @property
+    def parse_saved(self) -> float:
+        """Parse time saved, estimated from the mean time of parsed Ads."""
+        if not self.parsed:
+            return 0.0
+        return self.parse_skipped * self.parse_time / self.parsed
+
+
+class ValidatorStore:
+    """ETag, Last-Modified and body hash of detail pages.
+
+    The client sends them as If-None-Match and If-Modified-Since, and a
+    304 or a body with the stored hash marks the response as unchanged.
+    Validators of a response are only kept after commit(), which is
+    called once the Ad has been saved, so an unchanged page is always
+    one whose data is already in the database. Those of Ads which
+    failed or were not saved are dropped by discard().
+    """
+
+    def __init__(self, path: str, parser_config: ParserConfig) -> None:
+        self.parser_config = parser_config
+        self.stats = ValidatorStats()
+        self.pending: dict[str, tuple] = {}
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            """)
+
+    def _get(self, url: str) -> tuple | None:
+        with self.lock:
+            return self.db.execute(
+                "SELECT etag, last_modified, digest, size "
+                "FROM validators WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+    def is_tracked(self, url: str) -> bool:
+        return get_endpoint(url, self.parser_config) == DETAIL
+
+    def get_headers(self, url: str) -> dict:
+        """Conditional request headers for url."""
+        if not self.is_tracked(url):
+            return {}
+        row = self._get(url)
+        if row is None:
+            return {}
+        etag, last_modified, _, _ = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def check(
+        self, url: str, response: Response, compare: bool = True
+    ) -> bool:
+        """Mark the response of url as unchanged or not and return it.
+
+        Without compare the response is only kept for commit().
+        """
+        response.unchanged = False
+        if not self.is_tracked(url):
+            return False
+        row = self._get(url) if compare else None
+        if response.status_code == requests.codes.not_modified:
+            response.unchanged = True
+            with self.lock:
+                self.stats.not_modified += 1
+                self.stats.bytes_saved += row[3] if row else 0
+            return True
+        if response.status_code != requests.codes.ok:
+            return False
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        with self.lock:
+            self.pending[url] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                digest,
+                len(body),
+            )
+            if row is not None and row[2] == digest:
+                response.unchanged = True
+                self.stats.same_hash += 1
+        return response.unchanged
+
+    def commit(self, urls: list[str]) -> None:
+        """Keep the validators of urls, whose data has been saved."""
+        with self.lock:
+            rows = [
+                (url, *self.pending.pop(url))
+                for url in urls
+                if url in self.pending
+            ]
+            if rows:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO validators "
+                    "(url, etag, last_modified, digest, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+    def discard(self, urls: list[str]) -> None:
+        """Drop the validators of urls, whose data has not been saved."""
+        with self.lock:
+            for url in urls:
+                self.pending.pop(url, None)
+
+    def record_parse(self, seconds: float) -> None:
+        with self.lock:
+            self.stats.parsed += 1
+            self.stats.parse_time += seconds
+
+    def record_skip(self) -> None:
+        with self.lock:
+            self.stats.parse_skipped += 1
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        logger.info(
+            msg.HTTP_VALIDATOR_STATS.format(
+                stats.not_modified,
+                stats.same_hash,
+                stats.bytes_saved / 2**20,
+                stats.parse_skipped,
+                stats.parse_saved,
+            )
+        )
+
+    def close(self) -> None:
+        self.db.close()
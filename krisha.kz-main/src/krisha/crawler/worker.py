@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from dataclasses import replace
+from time import sleep
+
+import src.krisha.common.msg as msg
+from src.krisha.config import Config
+from src.krisha.crawler.enrichment import AnalyticsEnricher
+from src.krisha.crawler.first_page import FirstPage
+from src.krisha.crawler.flat_parser import FlatParser
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.known_listings import PriceLookup
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.crawler.seen_filter import open_seen_filter
+from src.krisha.crawler.spider import (
+    CrawlStats,
+    filter_new_or_repriced,
+    get_ads_count,
+    get_ads_on_page,
+    get_cards,
+    get_content,
+    get_flats_data_on_page,
+    get_page_count,
+    get_response,
+    save_checked,
+    save_flats,
+)
+from src.krisha.db.base import DBConnection, DBConnectionPool
+from src.krisha.db.frontier import (
+    LISTING,
+    SEARCH,
+    FrontierItem,
+    claim_items,
+    count_unfinished,
+    create_frontier,
+    enqueue_urls,
+    extend_leases,
+    finish_items,
+)
+from src.krisha.exceptions.crawler import (
+    ClientRequestError,
+    MaximumMissedAdError,
+)
+
+logger = logging.getLogger()
+
+
+def get_worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class FrontierRetries:
+    """RetryQueue counterpart for Ads claimed from the crawl frontier.
+
+    Has the interface get_flats_data_on_page expects, but instead of
+    keeping deferred Ads in memory it collects the outcome of each claimed
+    Ad, and finish() writes them back to crawl_queue. A deferred Ad is
+    then retried by whichever worker claims it once due.
+    """
+
+    def __init__(self, items: list[FrontierItem], retry_delay: tuple) -> None:
+        self.items = {item.url: item for item in items}
+        self.retry_delay = retry_delay
+        self.succeeded: list[int] = []
+        self.retry: list[tuple[int, float, str]] = []
+        self.dead: list[tuple[int, str]] = []
+        self.missed = 0
+
+    def defer(self, url: str, error: Exception) -> bool:
+        item = self.items[url]
+        if item.attempts > len(self.retry_delay):
+            self.fail(url, error, missed=True)
+            return False
+        delay = self.retry_delay[item.attempts - 1]
+        self.retry.append((item.id, delay, str(error)))
+        logger.warning(msg.CR_RETRY_DEFERRED.format(url, item.attempts, delay))
+        return True
+
+    def fail(self, url: str, error: Exception, missed: bool) -> None:
+        self.dead.append((self.items[url].id, str(error)))
+        if missed:
+            self.missed += 1
+        logger.warning(msg.CR_DEAD_LETTER.format(url, error))
+
+    def succeed(self, url: str) -> None:
+        self.succeeded.append(self.items[url].id)
+        self.missed = 0
+
+    def finish(
+        self,
+        connector: DBConnection,
+        delay: float,
+        error: Exception | None = None,
+    ) -> None:
+        """Write the outcomes back, releasing unhandled Ads after delay.
+
+        With an error the successful Ads are released as well, as their
+        Flats were not saved.
+        """
+        handled = {item_id for item_id, *_ in self.retry + self.dead}
+        done = [] if error else self.succeeded
+        handled.update(done)
+        left = [i.id for i in self.items.values() if i.id not in handled]
+        if left:
+            logger.warning(msg.FR_RELEASED.format(len(left), error))
+        retry = self.retry + [(i, delay, str(error)) for i in left]
+        finish_items(connector, done, retry, self.dead)
+
+
+def seed_frontier(config: Config, connector: DBConnection) -> int:
+    """Queue the first search page of every profile."""
+    profiles = config.search_profiles or [config.search_params]
+    enqueue_urls(
+        connector,
+        [
+            (
+                FirstPage.get_url(replace(config, search_params=profile)),
+                SEARCH,
+                profile.name,
+                1,
+            )
+            for profile in profiles
+        ],
+        config.parser_config.frontier_revisit_hours,
+    )
+    return len(profiles)
+
+
+def process_search_item(
+    item: FrontierItem,
+    config: Config,
+    connector: DBConnection,
+    client: HttpClient,
+    known: PriceLookup,
+    stats: CrawlStats,
+) -> None:
+    """Queue the Ads of a search page, and the other pages from page 1."""
+    parser = config.parser_config
+    content = get_content(get_response(item.url, client), parser)
+    pages = []
+    if item.page == 1:
+        ads_count = get_ads_count(content)
+        if ads_count == 0:
+            logger.warning(msg.CR_ADS_NOT_FOUND)
+            return
+        page_count = get_page_count(content, ads_count, config)
+        pages = [
+            (url, SEARCH, item.profile, num)
+            for num, url in enumerate(
+                FirstPage.get_page_urls(item.url, page_count, parser), 1
+            )
+            if num > 1
+        ]
+    cards = get_cards(parser.home_url, get_ads_on_page(content))
+    stats.pages += 1
+    stats.ads += len(cards)
+    ads = [
+        (card.url, LISTING, item.profile, None)
+        for card in filter_new_or_repriced(known, cards, parser, stats)
+    ]
+    enqueue_urls(connector, pages + ads, parser.frontier_revisit_hours)
+    logger.info(
+        msg.FR_ENQUEUED.format(item.profile, item.page, len(pages), len(ads))
+    )
+
+
+def process_search_items(
+    items: list[FrontierItem],
+    config: Config,
+    connector: DBConnection,
+    client: HttpClient,
+    known: PriceLookup,
+    stats: CrawlStats,
+) -> None:
+    retry_delay = config.parser_config.page_retry_delay
+    done, retry, dead = [], [], []
+    for item in items:
+        try:
+            process_search_item(item, config, connector, client, known, stats)
+        except ClientRequestError as error:
+            dead.append((item.id, str(error)))
+            continue
+        except Exception as error:
+            logger.error(msg.FR_PAGE_ERROR.format(item.url, error))
+            if item.attempts > len(retry_delay):
+                dead.append((item.id, str(error)))
+            else:
+                retry.append(
+                    (item.id, retry_delay[item.attempts - 1], str(error))
+                )
+            continue
+        done.append(item.id)
+    finish_items(connector, done, retry, dead)
+
+
+def process_listing_items(
+    items: list[FrontierItem],
+    config: Config,
+    connector: DBConnection,
+    client: HttpClient,
+    parse_pool: ParsePool,
+    known: PriceLookup,
+    enricher: AnalyticsEnricher,
+    stats: CrawlStats,
+) -> None:
+    """Get the Flats of claimed Ads, save them and release the Ads."""
+    parser = config.parser_config
+    retries = FrontierRetries(items, parser.retry_delay)
+    try:
+        # Listings are queued because their card changed, see
+        # filter_new_or_repriced, a repriced one must be fetched fresh
+        flats_data = get_flats_data_on_page(
+            [item.url for item in items],
+            config,
+            FlatParser,
+            known,
+            client,
+            retries,
+            parse_pool,
+            fresh_known=True,
+        )
+        save_checked(connector, known)
+        if flats_data:
+            # Same insert order in every worker to avoid deadlocks
+            flats_data.sort(key=lambda flat: flat.id)
+            save_flats(connector, client, flats_data, known, enricher, stats)
+    except MaximumMissedAdError as error:
+        logger.error(msg.CR_MAX_MISSED.format(error))
+        retries.finish(connector, parser.sleep_time, error)
+    except Exception as error:
+        logger.error(msg.FR_ADS_ERROR.format(error))
+        retries.finish(connector, parser.sleep_time, error)
+    else:
+        retries.finish(connector, parser.sleep_time)
+
+
+def send_heartbeats(
+    pool: DBConnectionPool, worker: str, config: Config, stop: threading.Event
+) -> None:
+    """Keep extending the leases of the worker until stopped."""
+    parser = config.parser_config
+    while not stop.wait(parser.frontier_heartbeat):
+        try:
+            with pool.connection() as connector:
+                extend_leases(connector, worker, parser.frontier_lease)
+        except Exception as error:
+            logger.error(msg.FR_HEARTBEAT_ERROR.format(error))
+
+
+def run_worker(
+    config: Config,
+    client: HttpClient,
+    pool: DBConnectionPool,
+    parse_pool: ParsePool,
+) -> CrawlStats:
+    """Crawl items of the shared crawl_queue until none are left.
+
+    Any number of workers, on any hosts, can run against the same
+    database. Each claims a batch of due items, search pages first, holds
+    them under a lease extended by a heartbeat thread, and releases them
+    as done, to retry or dead. Items of a worker which died are claimed
+    again once their lease expires.
+    """
+    parser = config.parser_config
+    worker = get_worker_name()
+    stats = CrawlStats()
+    with pool.connection() as connector:
+        create_frontier(connector)
+        profiles = seed_frontier(config, connector)
+    logger.info(msg.FR_WORKER_START.format(worker, profiles))
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=send_heartbeats, args=(pool, worker, config, stop), daemon=True
+    )
+    heartbeat.start()
+    enricher = AnalyticsEnricher(client, parser.analytics_workers, parse_pool)
+    seen = open_seen_filter(config.path.seen_filter_file)
+    try:
+        with pool.connection() as connector:
+            # Read by batch rather than preloaded, to see the prices saved
+            # by the other workers
+            known = PriceLookup(connector, seen)
+            try:
+                while True:
+                    items = claim_items(
+                        connector,
+                        worker,
+                        parser.frontier_batch,
+                        parser.frontier_lease,
+                    )
+                    if not items:
+                        left = count_unfinished(connector)
+                        if not left:
+                            break
+                        logger.info(
+                            msg.FR_IDLE.format(left, parser.frontier_idle_poll)
+                        )
+                        sleep(parser.frontier_idle_poll)
+                        continue
+                    search = [item for item in items if item.kind == SEARCH]
+                    listings = [item for item in items if item.kind == LISTING]
+                    logger.info(
+                        msg.FR_CLAIMED.format(len(search), len(listings))
+                    )
+                    if search:
+                        process_search_items(
+                            search, config, connector, client, known, stats
+                        )
+                    if listings:
+                        process_listing_items(
+                            listings,
+                            config,
+                            connector,
+                            client,
+                            parse_pool,
+                            known,
+                            enricher,
+                            stats,
+                        )
+            finally:
+                # Write back the green_percentage fetched so far
+                enricher.close(connector)
+    finally:
+        stop.set()
+        heartbeat.join()
+        if seen is not None:
+            seen.close()
+    logger.info(
+        msg.CR_PRICE_CHANGES.format(stats.new, stats.repriced, stats.rechecked)
+    )
+    logger.info(msg.FR_WORKER_STOPPED.format(worker))
+    return stats
@@ -1,6 +1,9 @@
 # src/krisha/db/base.py
 import logging
+import threading
 import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
 import psycopg2
 
 logger = logging.getLogger()
@@ -70,4 +73,49 @@ class DBConnection:
         if not self._is_closed:
             self.connection.close()
             self._is_closed = True
-            logger.debug("Closed database connection")
\ No newline at end of file
+            logger.debug("Closed database connection")
+
+
+class DBConnectionPool:
+    """Bounded pool of DBConnection shared by crawler threads.
+
+    Connections are opened on demand up to `size`. A connection that was
+    in use when an error was raised is closed instead of being returned,
+    so a broken connection is never handed out again.
+    """
+
+    def __init__(self, size: int, **connect_kwargs):
+        self.size = size
+        self.connect_kwargs = connect_kwargs
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                connector = self._idle.get_nowait()
+            except Empty:
+                connector = DBConnection(**self.connect_kwargs)
+            try:
+                yield connector
+            except BaseException:
+                connector.close()
+                raise
+            self._idle.put(connector)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+
+from psycopg2.extras import Json
+
+from src.krisha.db.base import DBConnection
+
+logger = logging.getLogger()
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a run_crawler call over one search URL.
+
+    `pending` holds the Ad URLs of page `page` while it is processed, so
+    an interrupted page is finished without fetching it again.
+    """
+
+    url: str
+    profile: str | None
+    pages_done: list[int] = field(default_factory=list)
+    page: int | None = None
+    pending: list[str] = field(default_factory=list)
+    retries: dict = field(default_factory=dict)
+
+
+def create_checkpoints(connector: DBConnection) -> None:
+    query = """
+        CREATE TABLE IF NOT EXISTS crawl_checkpoints
+        (
+            url        TEXT PRIMARY KEY,
+            profile    TEXT,
+            pages_done INTEGER[]   NOT NULL DEFAULT '{}',
+            page       INTEGER,
+            pending    JSONB       NOT NULL DEFAULT '[]',
+            retries    JSONB       NOT NULL DEFAULT '{}',
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query)
+    connector.connection.commit()
+
+
+def load_checkpoint(
+    connector: DBConnection, url: str, max_age_hours: int
+) -> Checkpoint | None:
+    """Checkpoint of the search url, None if missing or too old."""
+    query = f"""
+        SELECT url, profile, pages_done, page, pending, retries
+        FROM crawl_checkpoints
+        WHERE url = %s
+            AND updated_at > now() - INTERVAL '{int(max_age_hours)} hours';
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (url,))
+        row = cursor.fetchone()
+    connector.connection.commit()
+    return Checkpoint(*row) if row else None
+
+
+def save_checkpoint(connector: DBConnection, checkpoint: Checkpoint) -> None:
+    query = """
+        INSERT INTO crawl_checkpoints
+            (url, profile, pages_done, page, pending, retries)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (url) DO UPDATE SET
+            profile = EXCLUDED.profile,
+            pages_done = EXCLUDED.pages_done,
+            page = EXCLUDED.page,
+            pending = EXCLUDED.pending,
+            retries = EXCLUDED.retries,
+            updated_at = now();
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(
+            query,
+            (
+                checkpoint.url,
+                checkpoint.profile,
+                sorted(checkpoint.pages_done),
+                checkpoint.page,
+                Json(checkpoint.pending),
+                Json(checkpoint.retries),
+            ),
+        )
+    connector.connection.commit()
+
+
+def delete_checkpoint(connector: DBConnection, url: str) -> None:
+    with connector.connection.cursor() as cursor:
+        cursor.execute("DELETE FROM crawl_checkpoints WHERE url = %s;", (url,))
+    connector.connection.commit()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+from psycopg2.extras import execute_values
+
+import src.krisha.common.msg as msg
+from src.krisha.db.base import DBConnection
+
+logger = logging.getLogger()
+
+SEARCH = "search"
+LISTING = "listing"
+
+
+@dataclass
+class FrontierItem:
+    id: int
+    url: str
+    kind: str
+    profile: str
+    page: int | None
+    attempts: int
+
+
+def create_frontier(connector: DBConnection) -> None:
+    """Create the crawl_queue table shared by crawler workers."""
+    query = """
+        CREATE TABLE IF NOT EXISTS crawl_queue
+        (
+            id          BIGSERIAL PRIMARY KEY,
+            url         TEXT        NOT NULL UNIQUE,
+            kind        TEXT        NOT NULL,
+            profile     TEXT        NOT NULL,
+            page        INTEGER,
+            status      TEXT        NOT NULL DEFAULT 'pending',
+            attempts    INTEGER     NOT NULL DEFAULT 0,
+            not_before  TIMESTAMPTZ NOT NULL DEFAULT now(),
+            leased_by   TEXT,
+            lease_until TIMESTAMPTZ,
+            error       TEXT,
+            updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+
+        CREATE INDEX IF NOT EXISTS crawl_queue_claim_idx
+            ON crawl_queue (status, not_before);
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query)
+    connector.connection.commit()
+    logger.info(msg.FR_CREATED)
+
+
+def enqueue_urls(
+    connector: DBConnection,
+    items: list[tuple[str, str, str, int | None]],
+    revisit_hours: int,
+) -> None:
+    """Add (url, kind, profile, page) items to the queue.
+
+    A URL already in the queue is only queued again if it was finished
+    more than revisit_hours ago, i.e. by a previous run.
+    """
+    if not items:
+        return
+    query = f"""
+        INSERT INTO crawl_queue (url, kind, profile, page)
+        VALUES %s
+        ON CONFLICT (url) DO UPDATE SET
+            status = 'pending',
+            attempts = 0,
+            not_before = now(),
+            error = NULL,
+            updated_at = now()
+        WHERE crawl_queue.status IN ('done', 'dead')
+            AND crawl_queue.updated_at
+                < now() - INTERVAL '{int(revisit_hours)} hours';
+    """
+    # Sorted rows take row locks in the same order in every worker
+    rows = sorted({item[0]: item for item in items}.values())
+    with connector.connection.cursor() as cursor:
+        execute_values(cursor, query, rows)
+    connector.connection.commit()
+
+
+def claim_items(
+    connector: DBConnection, worker: str, batch: int, lease: int
+) -> list[FrontierItem]:
+    """Lease up to batch due items, search pages first.
+
+    Rows locked by other workers are skipped instead of waited for, and
+    items whose lease has expired, because their worker died, are taken
+    over.
+    """
+    query = """
+        UPDATE crawl_queue q SET
+            status = 'leased',
+            leased_by = %s,
+            lease_until = now() + %s * INTERVAL '1 second',
+            attempts = q.attempts + 1,
+            updated_at = now()
+        WHERE q.id IN (
+            SELECT id
+            FROM crawl_queue
+            WHERE (status = 'pending' AND not_before <= now())
+                OR (status = 'leased' AND lease_until < now())
+            ORDER BY kind = 'search' DESC, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING q.id, q.url, q.kind, q.profile, q.page, q.attempts;
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (worker, lease, batch))
+        rows = cursor.fetchall()
+    connector.connection.commit()
+    return sorted((FrontierItem(*row) for row in rows), key=lambda i: i.id)
+
+
+def extend_leases(connector: DBConnection, worker: str, lease: int) -> int:
+    """Heartbeat: extend the leases of all items held by worker."""
+    query = """
+        UPDATE crawl_queue SET
+            lease_until = now() + %s * INTERVAL '1 second'
+        WHERE leased_by = %s AND status = 'leased';
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (lease, worker))
+        count = cursor.rowcount
+    connector.connection.commit()
+    return count
+
+
+def finish_items(
+    connector: DBConnection,
+    done: list[int],
+    retry: list[tuple[int, float, str]],
+    dead: list[tuple[int, str]],
+) -> None:
+    """Release leased items as done, to retry after a delay, or dead."""
+    with connector.connection.cursor() as cursor:
+        if done:
+            cursor.execute(
+                """
+                UPDATE crawl_queue SET
+                    status = 'done', leased_by = NULL, lease_until = NULL,
+                    error = NULL, updated_at = now()
+                WHERE id = ANY(%s);
+                """,
+                (sorted(done),),
+            )
+        for item_id, delay, error in sorted(retry):
+            cursor.execute(
+                """
+                UPDATE crawl_queue SET
+                    status = 'pending', leased_by = NULL, lease_until = NULL,
+                    not_before = now() + %s * INTERVAL '1 second',
+                    error = %s, updated_at = now()
+                WHERE id = %s;
+                """,
+                (delay, error, item_id),
+            )
+        for item_id, error in sorted(dead):
+            cursor.execute(
+                """
+                UPDATE crawl_queue SET
+                    status = 'dead', leased_by = NULL, lease_until = NULL,
+                    error = %s, updated_at = now()
+                WHERE id = %s;
+                """,
+                (error, item_id),
+            )
+    connector.connection.commit()
+
+
+def count_unfinished(connector: DBConnection) -> int:
+    """Number of items pending or leased by any worker."""
+    query = """
+        SELECT count(*)
+        FROM crawl_queue
+        WHERE status IN ('pending', 'leased');
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query)
+        count = cursor.fetchone()[0]
+    connector.connection.commit()
+    return count
@@ -1,7 +1,10 @@
 import logging
 import time
+from collections.abc import Iterator
+from datetime import date
 import random
 import psycopg2
+from psycopg2.extras import execute_values
 
 import src.krisha.common.msg as msg
 from src.krisha.crawler.flat_parser import Flat
@@ -15,8 +18,11 @@ def insert_flats_data_db(
         flats_data: list[Flat],
         max_retries: int = 5,
         initial_retry_delay: float = 1.0
-) -> None:
-    """Insert flats data to DB with enhanced deadlock handling and retry logic."""
+) -> bool:
+    """Insert flats data to DB with enhanced deadlock handling and retry logic.
+
+    Returns False if some batches could not be saved.
+    """
     insert_flats_query = """
         INSERT INTO flats(
             id,
@@ -41,19 +47,29 @@ def insert_flats_data_db(
             lon = EXCLUDED.lon,
             description = EXCLUDED.description,
             address = EXCLUDED.address,
-            title = EXCLUDED.title;
+            title = EXCLUDED.title,
+            checked_at = CURRENT_DATE;
     """
 
+    # A price row is only added when the price differs from the latest one
     insert_price_query = """
         INSERT INTO prices(
             flat_id,
             price,
             green_percentage
         )
-        VALUES (%s, %s, %s)
+        SELECT %(id)s, %(price)s, %(green_percentage)s
+        WHERE %(price)s IS DISTINCT FROM (
+            SELECT price FROM prices
+            WHERE flat_id = %(id)s
+            ORDER BY date DESC
+            LIMIT 1
+        )
         ON CONFLICT (date, flat_id) DO UPDATE SET
             price = EXCLUDED.price,
-            green_percentage = EXCLUDED.green_percentage;
+            green_percentage = COALESCE(
+                EXCLUDED.green_percentage, prices.green_percentage
+            );
     """
 
     # Prepare data tuples
@@ -75,11 +91,11 @@ def insert_flats_data_db(
     ]
 
     prices_values = [
-        (
-            flat.id,
-            flat.price,
-            getattr(flat, 'green_percentage', None)
-        )
+        {
+            "id": flat.id,
+            "price": flat.price,
+            "green_percentage": getattr(flat, 'green_percentage', None),
+        }
         for flat in flats_data
     ]
 
@@ -159,43 +175,108 @@ def insert_flats_data_db(
         logger.info(msg.DB_INSERT_OK)
     else:
         logger.warning("Database insert completed with some errors. Some data may not have been saved.")
+    return overall_success
+
+
+def update_green_percentages(
+    connector: DBConnection, values: list[tuple[int, float]]
+) -> None:
+    """Set green_percentage of the latest price of each (flat_id, value)."""
+    query = """
+        UPDATE prices SET green_percentage = v.green_percentage
+        FROM (VALUES %s) AS v(flat_id, green_percentage)
+        WHERE prices.flat_id = v.flat_id
+          AND prices.date = (
+              SELECT max(date) FROM prices latest
+              WHERE latest.flat_id = v.flat_id
+          );
+    """
+    with connector.connection.cursor() as cursor:
+        execute_values(cursor, query, sorted(values))
+    connector.connection.commit()
+
+
+def mark_flats_checked(connector: DBConnection, flat_ids: list[int]) -> None:
+    """Set checked_at of the flats, found unchanged by a recheck, to today."""
+    query = "UPDATE flats SET checked_at = CURRENT_DATE WHERE id = ANY(%s);"
+    with connector.connection.cursor() as cursor:
+        # Same update order in every worker to avoid deadlocks
+        cursor.execute(query, (sorted(flat_ids),))
+    connector.connection.commit()
 
 
-def check_flat_exists(connector: DBConnection, flat_id: int) -> bool:
-    """Check if a flat with the given ID exists in the database."""
-    query = "SELECT EXISTS(SELECT 1 FROM flats WHERE id = %s);"
-    cursor = None
-    try:
-        cursor = connector.connection.cursor()
-        cursor.execute(query, (flat_id,))
-        exists = cursor.fetchone()[0]
-        return exists
-    except Exception as e:
-        logger.error(f"Error checking flat existence: {e}")
-        return False
-    finally:
-        if cursor:
-            cursor.close()
-
-
-def get_flat_price(connector: DBConnection, flat_id: int) -> int:
-    """Get the latest price for a flat."""
+def iter_flat_ids(
+    connector: DBConnection, itersize: int = 50_000
+) -> Iterator[int]:
+    """Stream the ids of the saved flats from a server-side cursor."""
+    with connector.connection.cursor(name="flat_ids") as cursor:
+        cursor.itersize = itersize
+        cursor.execute("SELECT id FROM flats;")
+        for row in cursor:
+            yield row[0]
+    connector.connection.commit()
+
+
+def get_flats_without_green_percentage(
+    connector: DBConnection, limit: int | None = None
+) -> list[int]:
+    """Ids of flats whose latest price has no green_percentage, or 0."""
+    query = """
+        SELECT flat_id FROM (
+            SELECT DISTINCT ON (flat_id) flat_id, green_percentage
+            FROM prices
+            ORDER BY flat_id, date DESC
+        ) latest
+        WHERE green_percentage IS NULL OR green_percentage = 0
+        ORDER BY flat_id
+        LIMIT %s;
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (limit,))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def iter_latest_prices(
+    connector: DBConnection, itersize: int = 50_000
+) -> Iterator[tuple[int, int, date]]:
+    """Stream (flat_id, price, date) of the latest price of every flat.
+
+    date is the day the flat was last checked, or the day of its price
+    for flats saved before checked_at. Rows come in ascending flat_id
+    order from a server-side cursor, so the whole table is never held in
+    memory at once.
+    """
+    query = """
+        SELECT DISTINCT ON (p.flat_id)
+            p.flat_id, p.price, COALESCE(f.checked_at, p.date)
+        FROM prices p
+        JOIN flats f ON f.id = p.flat_id
+        ORDER BY p.flat_id, p.date DESC;
+    """
+    with connector.connection.cursor(name="latest_prices") as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query)
+        yield from cursor
+    connector.connection.commit()
+
+
+def get_latest_prices(
+    connector: DBConnection, flat_ids: list[int]
+) -> dict[int, tuple[int, date]]:
+    """Latest price and the day it was last checked of each of the flats.
+
+    Flats without a saved price are left out.
+    """
+    if not flat_ids:
+        return {}
     query = """
-        SELECT price
-        FROM prices
-        WHERE flat_id = %s
-        ORDER BY date DESC
-        LIMIT 1
+        SELECT DISTINCT ON (p.flat_id)
+            p.flat_id, p.price, COALESCE(f.checked_at, p.date)
+        FROM prices p
+        JOIN flats f ON f.id = p.flat_id
+        WHERE p.flat_id = ANY(%s)
+        ORDER BY p.flat_id, p.date DESC;
     """
-    cursor = None
-    try:
-        cursor = connector.connection.cursor()
-        cursor.execute(query, (flat_id,))
-        result = cursor.fetchone()
-        return result[0] if result else None
-    except Exception as e:
-        logger.error(f"Error getting flat price: {e}")
-        return None
-    finally:
-        if cursor:
-            cursor.close()
\ No newline at end of file
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (list(flat_ids),))
+        return {flat_id: (price, day) for flat_id, price, day in cursor}
@@ -2,7 +2,7 @@ import logging
 
 import src.krisha.common.msg as msg
 from src.krisha.config.path import AppPaths
-from src.krisha.db.base import DBConnection
+from src.krisha.db.base import DBConnection, DBConnectionPool
 
 logger = logging.getLogger()
 
@@ -25,7 +25,8 @@ def create_db(connector: DBConnection) -> None:
             address     TEXT,
             title       VARCHAR(255),
             star        INTEGER DEFAULT 0,
-            focus       INTEGER DEFAULT 0
+            focus       INTEGER DEFAULT 0,
+            checked_at  DATE    DEFAULT CURRENT_DATE
         );
 
         CREATE TABLE IF NOT EXISTS prices
@@ -37,6 +38,9 @@ def create_db(connector: DBConnection) -> None:
             green_percentage FLOAT,
             UNIQUE (date, flat_id)
         );
+
+        CREATE INDEX IF NOT EXISTS prices_flat_date_idx
+            ON prices (flat_id, date DESC);
     """
     with connector.connection as con:
         with con.cursor() as cursor:
@@ -90,4 +94,25 @@ def get_connection(path: AppPaths) -> DBConnection:
         dbname=path.db_name,
         user=path.db_user,
         password=path.db_password
-    )
\ No newline at end of file
+    )
+
+
+def get_connection_pool(path: AppPaths, size: int) -> DBConnectionPool:
+    """Get a pool of PostgreSQL DB connections shared by crawler threads."""
+    with DBConnection(
+        host=path.db_host,
+        port=path.db_port,
+        dbname=path.db_name,
+        user=path.db_user,
+        password=path.db_password,
+    ) as temp_conn:
+        check_db(temp_conn)
+
+    return DBConnectionPool(
+        size,
+        host=path.db_host,
+        port=path.db_port,
+        dbname=path.db_name,
+        user=path.db_user,
+        password=path.db_password,
+    )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+
+from src.krisha.db.base import DBConnection
+
+logger = logging.getLogger()
+
+
+def create_watermarks(connector: DBConnection) -> None:
+    query = """
+        CREATE TABLE IF NOT EXISTS crawl_watermarks
+        (
+            profile    TEXT PRIMARY KEY,
+            newest_id  BIGINT      NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query)
+    connector.connection.commit()
+
+
+def load_watermark(connector: DBConnection, profile: str) -> int | None:
+    """Newest Ad id seen by the last crawl of profile, if any."""
+    query = "SELECT newest_id FROM crawl_watermarks WHERE profile = %s;"
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (profile,))
+        row = cursor.fetchone()
+    connector.connection.commit()
+    return row[0] if row else None
+
+
+def save_watermark(
+    connector: DBConnection, profile: str, newest_id: int
+) -> None:
+    """Move the watermark of profile up to newest_id, never down."""
+    query = """
+        INSERT INTO crawl_watermarks (profile, newest_id)
+        VALUES (%s, %s)
+        ON CONFLICT (profile) DO UPDATE SET
+            newest_id = GREATEST(
+                crawl_watermarks.newest_id, EXCLUDED.newest_id
+            ),
+            updated_at = now();
+    """
+    with connector.connection.cursor() as cursor:
+        cursor.execute(query, (profile, newest_id))
+    connector.connection.commit()
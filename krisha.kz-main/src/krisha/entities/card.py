@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class Card:
+    """Ad as listed on a search page.
+
+    Only the id and URL are always known, the rest is None when the card
+    does not show it.
+    """
+
+    id: int
+    url: str
+    price: int | None = None
+    room: int | None = None
+    square: float | None = None
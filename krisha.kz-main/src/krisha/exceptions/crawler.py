@@ -17,3 +17,28 @@ class MaximumMissedAdError(CrawlerError):
             "Check correctness of Ad URL formation"
         )
         super().__init__(self.message)
+
+
+class RequestFailedError(CrawlerError):
+    """Request failed in a way worth retrying later."""
+
+    def __init__(self, url, reason):
+        self.message = f"Request - GET {url} failed: {reason}"
+        super().__init__(self.message)
+
+
+class ClientRequestError(CrawlerError):
+    """Request answered with a 4xx status, e.g. a removed Ad."""
+
+    def __init__(self, url, status):
+        self.status = status
+        self.message = f"Request - GET {url} answered {status}, not retried"
+        super().__init__(self.message)
+
+
+class CrawlInterruptedError(CrawlerError):
+    """Shutdown requested while the Ads of a search page were processed."""
+
+    def __init__(self):
+        self.message = "Crawler - Page interrupted by shutdown"
+        super().__init__(self.message)
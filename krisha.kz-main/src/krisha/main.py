@@ -1,72 +1,130 @@
 import logging
-import sys
-import time
 import signal
-import psycopg2
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
 
-from src.krisha.config.config import load_config
-from src.krisha.crawler.first_page import FirstPage
-from src.krisha.crawler.spider import run_crawler
-from src.krisha.db.service import get_connection
+import src.krisha.common.msg as msg
+from src.krisha.config.config import Config, load_config
+from src.krisha.crawler.http_client import HttpClient
+from src.krisha.crawler.parse_pool import ParsePool
+from src.krisha.crawler.shards import run_sharded
+from src.krisha.crawler.spider import run_with_retries
+from src.krisha.crawler.worker import run_worker
+from src.krisha.db.base import DBConnectionPool
+from src.krisha.db.service import get_connection_pool
 
 logger = logging.getLogger()
 
+# Set on SIGINT or SIGTERM, profile crawls stop at their next page
+shutdown_requested = threading.Event()
+
+
 def handle_shutdown(signum, frame):
-    """Handle shutdown signals gracefully."""
-    logger.info("Received shutdown signal. Exiting gracefully...")
+    """Handle shutdown signals gracefully.
+
+    Crawls running in profile threads see the shutdown event, save their
+    checkpoint and return, while the main thread exits.
+    """
+    logger.info(msg.CR_SHUTDOWN)
+    shutdown_requested.set()
     sys.exit(0)
 
+
+def run_profiles(
+    config: Config,
+    client: HttpClient,
+    pool: DBConnectionPool,
+    parse_pool: ParsePool,
+    shutdown: threading.Event = shutdown_requested,
+) -> None:
+    """Crawl all search profiles concurrently.
+
+    Profiles share the HTTP client, so its rate budget, the DB pool and
+    the parse pool. A failed profile does not stop the others; the first
+    error is raised once all of them are done. On shutdown the profiles
+    not started yet are cancelled and the running ones stop at their
+    next page.
+    """
+    errors = []
+    executor = ThreadPoolExecutor(
+        max_workers=config.parser_config.profile_workers
+    )
+    try:
+        futures = {
+            executor.submit(
+                run_with_retries,
+                replace(config, search_params=profile),
+                client,
+                pool,
+                parse_pool,
+                shutdown,
+            ): profile.name
+            for profile in config.search_profiles
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                stats = future.result()
+            except Exception as error:
+                logger.error(msg.CR_PROFILE_ERROR.format(name, error))
+                errors.append(error)
+                continue
+            logger.info(
+                msg.CR_PROFILE_STATS.format(
+                    name,
+                    stats.pages,
+                    stats.ads,
+                    stats.flats,
+                    stats.elapsed,
+                    stats.ads / max(stats.elapsed, 1e-9),
+                )
+            )
+    finally:
+        executor.shutdown(cancel_futures=True)
+    if errors:
+        raise errors[0]
+
+
 def main():
     # Register signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, handle_shutdown)
     signal.signal(signal.SIGTERM, handle_shutdown)
-    
+
     config = load_config()
-    max_retries = 3
-    
-    for attempt in range(1, max_retries + 1):
-        try:
-            with get_connection(config.path) as db_conn:
-                first_page_url = FirstPage.get_url(config)
-                
-                # Log the search URL to help diagnose search parameter issues
-                logger.info(f"Starting crawler with URL: {first_page_url}")
-                
-                # Run the crawler with the established database connection
-                run_crawler(config, db_conn, first_page_url)
-                
-                # If crawler finishes successfully, break out of retry loop
-                break
-                
-        except psycopg2.errors.DeadlockDetected as e:
-            logger.error(f"Deadlock detected in main process (attempt {attempt}/{max_retries}): {e}")
-            
-            if attempt < max_retries:
-                # Exponential backoff
-                sleep_time = 5 * (2 ** (attempt - 1))
-                logger.info(f"Retrying crawler in {sleep_time} seconds...")
-                time.sleep(sleep_time)
-            else:
-                logger.critical("Maximum retries reached after deadlocks. Giving up.")
-                raise
-                
-        except psycopg2.OperationalError as e:
-            logger.error(f"Database operational error (attempt {attempt}/{max_retries}): {e}")
-            
-            if attempt < max_retries:
-                # Exponential backoff
-                sleep_time = 10 * (2 ** (attempt - 1))
-                logger.info(f"Retrying crawler in {sleep_time} seconds...")
-                time.sleep(sleep_time)
-            else:
-                logger.critical("Maximum retries reached after database errors. Giving up.")
-                raise
-                
-        except Exception as e:
-            # For other exceptions, log and exit immediately
-            logger.critical(f"Unrecoverable error: {e}")
-            raise
-            
+
+    if config.parser_config.frontier:
+        # Work is shared with other workers through the crawl_queue table,
+        # one connection crawls and one keeps the leases alive
+        with (
+            HttpClient.from_config(config) as client,
+            get_connection_pool(config.path, 2) as pool,
+            ParsePool.from_config(config) as parse_pool,
+        ):
+            try:
+                run_worker(config, client, pool, parse_pool)
+            finally:
+                client.log_stats()
+    elif config.parser_config.shard_processes > 1:
+        # Price shards are crawled by worker processes, one client each
+        for profile in config.search_profiles:
+            run_sharded(replace(config, search_params=profile))
+    else:
+        # One pooled HTTP client and DB pool are shared by all profiles
+        pool_size = min(
+            config.parser_config.profile_workers, len(config.search_profiles)
+        )
+        with (
+            HttpClient.from_config(config) as client,
+            get_connection_pool(config.path, pool_size) as pool,
+            ParsePool.from_config(config) as parse_pool,
+        ):
+            try:
+                run_profiles(config, client, pool, parse_pool)
+            finally:
+                client.log_stats()
+
     logger.info("Crawler execution completed successfully.")
 
 if __name__ == "__main__":
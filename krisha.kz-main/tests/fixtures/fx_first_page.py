@@ -147,3 +147,21 @@ first_page_test_data = [
         },
     ),
 ]
+
+page_url_test_data = [
+    (
+        "https://krisha.kz/prodazha/kvartiry/almaty/",
+        1,
+        "https://krisha.kz/prodazha/kvartiry/almaty/",
+    ),
+    (
+        "https://krisha.kz/prodazha/kvartiry/almaty/",
+        2,
+        "https://krisha.kz/prodazha/kvartiry/almaty/?page=2",
+    ),
+    (
+        "https://krisha.kz/prodazha/kvartiry/?das[live.rooms]=2",
+        15,
+        "https://krisha.kz/prodazha/kvartiry/?das[live.rooms]=2&page=15",
+    ),
+]
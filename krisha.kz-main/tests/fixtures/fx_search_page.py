@@ -0,0 +1,81 @@
+search_page = """
+<section class="a-search-list">
+  <div class="a-card a-storage-live ddl_product ddl_product_link"
+       data-id="681234567" data-uuid="b6e0d4f2-6a3c-4ab5-9c1f-2f2e8d1b9a10">
+    <div class="a-card__inc">
+      <div class="a-card__header">
+        <div class="a-card__header-left">
+          <a class="a-card__title" href="/a/show/681234567">
+            2-комнатная квартира · 54.5 м² · 5/9 этаж
+          </a>
+        </div>
+        <div class="a-card__header-body">
+          <div class="a-card__price">
+            23 500 000&nbsp;<span class="currency-sign offer__currency">〒</span>
+          </div>
+        </div>
+      </div>
+      <div class="a-card__subtitle">Алматы, Бостандыкский р-н</div>
+    </div>
+  </div>
+  <div class="a-card a-storage-live ddl_product ddl_product_link"
+       data-id="681234568" data-uuid="0f3d7b9e-2c4a-4d6e-8f1a-3b5c7d9e1f20">
+    <div class="a-card__inc">
+      <div class="a-card__header">
+        <div class="a-card__header-left">
+          <a class="a-card__title" href="/a/show/681234568">
+            Студия · 28 м² · 2/12 этаж
+          </a>
+        </div>
+      </div>
+    </div>
+  </div>
+</section>
+"""
+
+expected_cards = [
+    {
+        "id": 681234567,
+        "url": "https://krisha.kz/a/show/681234567",
+        "price": 23500000,
+        "room": 2,
+        "square": 54.5,
+    },
+    {
+        "id": 681234568,
+        "url": "https://krisha.kz/a/show/681234568",
+        "price": None,
+        "room": None,
+        "square": 28.0,
+    },
+]
+
+full_search_page = f"""<!DOCTYPE html>
+<html lang="ru">
+<head>
+  <title>Продажа квартир в Казахстане</title>
+  <script>window.data = {{"a-search-list": "not a section"}};</script>
+</head>
+<body>
+<header class="header"><a class="header__logo" href="/">Krisha.kz</a></header>
+<div class="layout">
+  <div class="a-search-options"><form class="search-form"></form></div>
+  <div class="a-search-subtitle search-results-nb">
+    Найдено 1 234 объявления
+  </div>
+  <div class="a-list-wrapper">
+{search_page}
+  </div>
+  <nav class="paginator">
+    <a class="paginator__btn" href="/prodazha/kvartiry/?page=1">1</a>
+    <a class="paginator__btn" href="/prodazha/kvartiry/?page=2">2</a>
+    <span class="paginator__more">...</span>
+    <a class="paginator__btn" href="/prodazha/kvartiry/?page=62">62</a>
+    <a class="paginator__btn paginator__btn--next"
+       href="/prodazha/kvartiry/?page=2">Дальше</a>
+  </nav>
+</div>
+<footer class="footer"><div class="a-card" data-id="1">Реклама</div></footer>
+</body>
+</html>
+"""
@@ -0,0 +1,52 @@
+import requests
+from requests import Response
+
+from krisha.crawler.archive import (
+    ResponseArchive,
+    get_archive_key,
+    load_archive,
+)
+
+SEARCH_URL = "https://krisha.kz/prodazha/kvartiry/almaty/?das[who]=1&page=2"
+
+
+def get_response(url, status=200, body="<html>квартира</html>"):
+    response = Response()
+    response.request = requests.Request("GET", url).prepare()
+    response.status_code = status
+    response.encoding = "utf-8"
+    response._content = body.encode()
+    response.headers["ETag"] = '"v1"'
+    response.headers["Server"] = "nginx"
+    return response
+
+
+def test_archive_key_ignores_host():
+    assert get_archive_key(SEARCH_URL) == get_archive_key(
+        SEARCH_URL.replace("https://krisha.kz", "http://127.0.0.1:8000")
+    )
+
+
+def test_recorded_responses_are_loaded_by_key(tmp_path):
+    path = str(tmp_path / "crawl.jsonl.gz")
+    archive = ResponseArchive(path)
+    archive.record(get_response(SEARCH_URL))
+    archive.record(get_response(SEARCH_URL, status=304, body=""))
+    archive.close()
+
+    responses = load_archive(path)
+
+    record = responses[get_archive_key(SEARCH_URL)]
+    assert record["status"] == 200
+    assert record["body"] == "<html>квартира</html>"
+    assert record["headers"] == {"ETag": '"v1"'}
+
+
+def test_runs_append_to_the_archive(tmp_path):
+    path = str(tmp_path / "crawl.jsonl.gz")
+    for url in ("https://krisha.kz/a/show/1", "https://krisha.kz/a/show/2"):
+        archive = ResponseArchive(path)
+        archive.record(get_response(url))
+        archive.close()
+
+    assert set(load_archive(path)) == {"/a/show/1", "/a/show/2"}
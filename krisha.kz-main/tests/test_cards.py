@@ -0,0 +1,246 @@
+from datetime import date, timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+from requests import Response
+
+import krisha.crawler.known_listings as known_listings
+import krisha.crawler.spider as spider
+from krisha.config.config import Config
+from krisha.config.parser import ParserConfig
+from krisha.config.search import SearchParameters
+from krisha.crawler.flat_parser import FlatParser
+from krisha.crawler.http_client import HttpClient
+from krisha.crawler.known_listings import KnownListings, PriceLookup
+from krisha.crawler.parse_pool import ParsePool
+from krisha.crawler.response_cache import (
+    ANALYTICS,
+    DETAIL,
+    SEARCH,
+    ResponseCache,
+)
+from krisha.crawler.retry_queue import RetryQueue
+from krisha.crawler.spider import (
+    CrawlStats,
+    filter_new_or_repriced,
+    get_ads_on_page,
+    get_cards,
+)
+from krisha.crawler.validators import ValidatorStore
+from krisha.entities.card import Card
+from tests.fixtures.fx_flat import valid_script
+from tests.fixtures.fx_search_page import expected_cards, search_page
+
+
+def test_cards_are_read_from_search_page():
+    content = BeautifulSoup(search_page, "html.parser")
+    cards = get_cards("https://krisha.kz", get_ads_on_page(content))
+
+    assert [vars(card) for card in cards] == expected_cards
+
+
+@pytest.fixture
+def known():
+    fresh = date.today()
+    stale = fresh - timedelta(days=30)
+    known = KnownListings()
+    known.append(1, 100, fresh)
+    known.append(2, 200, fresh)
+    known.append(3, 300, stale)
+    known.append(4, 400, fresh)
+    return known
+
+
+def get_card(ad_id, price=None):
+    return Card(ad_id, f"https://krisha.kz/a/show/{ad_id}", price=price)
+
+
+def test_only_new_or_repriced_cards_are_kept(known):
+    cards = [get_card(1, 100), get_card(2, 250), get_card(5, 500)]
+
+    changed = filter_new_or_repriced(
+        known, cards, ParserConfig(), CrawlStats()
+    )
+
+    assert [card.id for card in changed] == [2, 5]
+
+
+def test_unpriced_cards_are_rechecked_oldest_checked_first(known):
+    known.append(5, 500, date.today() - timedelta(days=60))
+    known.append(6, 600, date.today() - timedelta(days=10))
+    cards = [
+        get_card(1),
+        get_card(3, 300),
+        get_card(4),
+        get_card(6),
+        get_card(5),
+    ]
+    stats = CrawlStats()
+
+    changed = filter_new_or_repriced(
+        known, cards, ParserConfig(recheck_budget=2, recheck_days=7), stats
+    )
+
+    assert [card.id for card in changed] == [5, 6]
+    assert stats.rechecked == 2
+
+
+def test_rechecked_flats_are_recorded_as_checked_today(known):
+    known.check([3])
+
+    assert known.get(3) == (300, date.today())
+    assert known.pop_checked() == [3]
+    assert known.pop_checked() == []
+
+
+class Enricher:
+    def submit_flats(self, flats_data):
+        pass
+
+    def flush(self, connector):
+        pass
+
+
+URL = "https://krisha.kz/a/show/680044731"
+
+
+@pytest.fixture
+def saved_ad(monkeypatch, tmp_path):
+    """Ad saved at 300000 20 days ago, its page cached and committed."""
+    parser = ParserConfig()
+    client = HttpClient(
+        parser,
+        cache=ResponseCache(
+            str(tmp_path / "cache"),
+            max_bytes=2**20,
+            ttls={SEARCH: 10, DETAIL: 100, ANALYTICS: 1000},
+            parser_config=parser,
+        ),
+        validators=ValidatorStore(str(tmp_path / "validators.sqlite"), parser),
+    )
+    bodies = [valid_script]
+    fetched = []
+    inserted = []
+    checked = []
+
+    def fetch(url, headers=None):
+        headers = headers or {}
+        fetched.append((url, headers))
+        etag = f'"v{len(bodies)}"'
+        response = Response()
+        response.url = url
+        response.headers["ETag"] = etag
+        if headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            response._content = b""
+            return response
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response._content = bodies[-1].encode()
+        return response
+
+    monkeypatch.setattr(client, "_fetch", fetch)
+    monkeypatch.setattr(
+        spider,
+        "insert_flats_data_db",
+        lambda connector, flats_data: inserted.extend(flats_data) or True,
+    )
+    monkeypatch.setattr(
+        spider,
+        "mark_flats_checked",
+        lambda connector, flat_ids: checked.extend(flat_ids),
+    )
+    client.get(URL)
+    client.validators.commit([URL])
+    known = KnownListings()
+    known.append(680044731, 300000, date.today() - timedelta(days=20))
+    fetched.clear()
+
+    def process(card, resumed=False):
+        spider.process_search_page(
+            spider.SearchPage(1, "", [card], resumed=resumed),
+            1,
+            Config(
+                path=None,
+                parser_config=parser,
+                search_params=SearchParameters(parser),
+            ),
+            FlatParser,
+            None,
+            client,
+            RetryQueue(parser.retry_delay, str(tmp_path / "dead.jsonl")),
+            ParsePool(0),
+            known,
+            Enricher(),
+            CrawlStats(),
+        )
+
+    return process, client, bodies, fetched, inserted, checked
+
+
+def test_repriced_card_is_fetched_past_cache_and_saved(saved_ad):
+    process, client, bodies, fetched, inserted, checked = saved_ad
+    bodies.append(valid_script.replace("300000", "320000"))
+
+    process(Card(680044731, URL, price=320000))
+
+    assert fetched == [(URL, {})]
+    assert [(flat.id, flat.price) for flat in inserted] == [
+        (680044731, 320000)
+    ]
+    assert checked == []
+
+
+def test_resumed_ad_is_fetched_fresh_and_saved(saved_ad):
+    process, client, bodies, fetched, inserted, checked = saved_ad
+    bodies.append(valid_script.replace("300000", "320000"))
+
+    # Rebuilt from the checkpoint, the card price is not known
+    process(Card(680044731, URL), resumed=True)
+
+    assert fetched == [(URL, {})]
+    assert [(flat.id, flat.price) for flat in inserted] == [
+        (680044731, 320000)
+    ]
+
+
+def test_recheck_is_conditional_and_saves_the_check_date(saved_ad):
+    process, client, bodies, fetched, inserted, checked = saved_ad
+    # A cached page would answer the recheck without asking krisha.kz
+    client.cache = None
+
+    process(Card(680044731, URL))
+
+    assert fetched == [(URL, {"If-None-Match": '"v1"'})]
+    assert inserted == []
+    assert checked == [680044731]
+
+
+def test_fresh_known_ads_cost_one_price_query(saved_ad, monkeypatch, tmp_path):
+    process, client, bodies, fetched, inserted, checked = saved_ad
+    queries = []
+
+    def get_latest_prices(connector, flat_ids):
+        queries.append(list(flat_ids))
+        return {680044731: (300000, date.today())}
+
+    monkeypatch.setattr(known_listings, "get_latest_prices", get_latest_prices)
+    parser = ParserConfig()
+
+    spider.get_flats_data_on_page(
+        [URL],
+        Config(
+            path=None,
+            parser_config=parser,
+            search_params=SearchParameters(parser),
+        ),
+        FlatParser,
+        PriceLookup(None),
+        client,
+        RetryQueue(parser.retry_delay, str(tmp_path / "dead.jsonl")),
+        ParsePool(0),
+        fresh_known=True,
+    )
+
+    assert queries == [[680044731]]
+    assert fetched == [(URL, {})]
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+import krisha.crawler.spider as spider
+from krisha.config.config import Config
+from krisha.config.parser import ParserConfig
+from krisha.config.path import AppPaths
+from krisha.config.search import SearchParameters
+from krisha.crawler.known_listings import KnownListings
+from krisha.crawler.parse_pool import ParsePool
+from krisha.entities.card import Card
+
+URL = "https://krisha.kz/prodazha/kvartiry/"
+PAGE_COUNT = 3
+
+
+def get_page(num):
+    return spider.SearchPage(
+        num,
+        f"{URL}?page={num}",
+        [
+            Card(num * 10 + i, f"https://krisha.kz/a/show/{num * 10 + i}")
+            for i in range(2)
+        ],
+    )
+
+
+def produce_search_pages(
+    config, client, url, content, page_count, pages, stop, pages_done
+):
+    for num in range(1, page_count + 1):
+        if num not in pages_done:
+            pages.put(get_page(num))
+    pages.put(None)
+
+
+class Enricher:
+    def __init__(self, *args):
+        pass
+
+    def close(self, connector):
+        pass
+
+
+@pytest.fixture
+def crawl(monkeypatch, tmp_path):
+    saved = {}
+    processed = []
+
+    def save_checkpoint(connector, checkpoint):
+        saved["checkpoint"] = spider.Checkpoint(
+            **{**vars(checkpoint), "pages_done": [*checkpoint.pages_done]}
+        )
+
+    for name, value in {
+        "get_page_response": lambda url, client: None,
+        "get_content": lambda response, parser_config: None,
+        "get_ads_count": lambda content: 40,
+        "get_page_count": lambda content, ads_count, config: PAGE_COUNT,
+        "create_checkpoints": lambda connector: None,
+        "load_checkpoint": lambda *args: saved.get("checkpoint"),
+        "save_checkpoint": save_checkpoint,
+        "delete_checkpoint": lambda connector, url: saved.clear(),
+        "open_seen_filter": lambda path: None,
+        "load_known_listings": lambda connector, seen: KnownListings(),
+        "produce_search_pages": produce_search_pages,
+        "process_due_retries": lambda *args, **kwargs: None,
+        "AnalyticsEnricher": Enricher,
+    }.items():
+        monkeypatch.setattr(spider, name, value)
+
+    parser = ParserConfig(parallel_pages=False)
+    config = Config(
+        path=AppPaths(dead_letters_file=str(tmp_path / "dead.jsonl")),
+        parser_config=parser,
+        search_params=SearchParameters(parser, name="test"),
+    )
+
+    def run(process_search_page, shutdown):
+        monkeypatch.setattr(spider, "process_search_page", process_search_page)
+        spider.run_crawler(config, None, None, URL, ParsePool(0), shutdown)
+
+    return run, saved, processed
+
+
+def test_interrupted_page_is_resumed_from_its_pending_ads(crawl):
+    run, saved, processed = crawl
+    shutdown = threading.Event()
+
+    def process_search_page(page, *args):
+        if page.num == 2:
+            # Shutdown arrives while the Ads of page 2 are fetched
+            shutdown.set()
+            raise spider.CrawlInterruptedError
+        processed.append((page.num, page.ads_urls))
+        return 0
+
+    run(process_search_page, shutdown)
+
+    checkpoint = saved["checkpoint"]
+    assert checkpoint.pages_done == [1]
+    assert checkpoint.page == 2
+    assert checkpoint.pending == get_page(2).ads_urls
+
+    def resume_search_page(page, *args):
+        processed.append((page.num, page.ads_urls))
+        return 0
+
+    run(resume_search_page, threading.Event())
+
+    assert processed == [
+        (1, get_page(1).ads_urls),
+        (2, get_page(2).ads_urls),
+        (3, get_page(3).ads_urls),
+    ]
+    assert saved == {}
@@ -0,0 +1,64 @@
+from krisha.crawler.concurrency import AdaptiveLimiter, get_p95
+
+
+def get_limiter(**kwargs):
+    params = {
+        "min_limit": 1,
+        "max_limit": 4,
+        "window": 5,
+        "backoff": 0.5,
+        "latency_limit": 5.0,
+        "latency_growth": 3.0,
+    }
+    params.update(kwargs)
+    return AdaptiveLimiter(**params)
+
+
+def complete(limiter, count, latency=0.1, failure=None):
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(latency, failure)
+
+
+def test_get_p95():
+    assert get_p95([float(i) for i in range(1, 101)]) == 95.0
+    assert get_p95([0.5]) == 0.5
+
+
+def test_limit_grows_additively_up_to_max():
+    limiter = get_limiter()
+    complete(limiter, 5)
+    assert limiter.limit == 2
+
+    complete(limiter, 50)
+    assert limiter.limit == 4
+
+
+def test_failure_cuts_limit_once_per_wave():
+    limiter = get_limiter(min_limit=1, max_limit=8)
+    complete(limiter, 35)
+    assert limiter.limit == 8
+
+    complete(limiter, 3, failure="response status 429")
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+    complete(limiter, 2, failure="response status 503")
+    assert limiter.limit == 2
+
+
+def test_latency_over_limit_cuts_limit():
+    limiter = get_limiter()
+    complete(limiter, 10)
+    complete(limiter, 5, latency=6.0)
+
+    assert limiter.limit == 1
+
+
+def test_rising_latency_cuts_limit():
+    limiter = get_limiter()
+    complete(limiter, 10, latency=0.1)
+    complete(limiter, 5, latency=1.0)
+
+    assert limiter.limit == 1
+    assert limiter.increases == 2
@@ -0,0 +1,72 @@
+import pytest
+import requests
+
+import krisha.crawler.enrichment as enrichment
+from krisha.config.parser import ParserConfig
+from krisha.crawler.enrichment import (
+    AnalyticsEnricher,
+    extract_price_percent_diff,
+)
+from krisha.crawler.parse_pool import ParsePool
+
+ANALYTICS_PAGE = (
+    '<div class="text">Цена ниже на '
+    '<span class="green-price">{}%</span></div>'
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeClient:
+    parser_config = ParserConfig()
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.requested = []
+
+    def get(self, url, conditional=True, fresh=False):
+        self.requested.append((url, conditional))
+        answer = self.answers[int(url.split("=")[-1])]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def written(monkeypatch):
+    values = []
+    monkeypatch.setattr(
+        enrichment,
+        "update_green_percentages",
+        lambda connector, rows: values.extend(rows),
+    )
+    return values
+
+
+def test_percent_is_extracted():
+    assert extract_price_percent_diff(ANALYTICS_PAGE.format("12.5")) == 12.5
+    assert extract_price_percent_diff("<div>no analysis</div>") == 0
+
+
+def test_results_are_written_back(written):
+    client = FakeClient(
+        {
+            1: FakeResponse(requests.codes.ok, ANALYTICS_PAGE.format(7)),
+            2: FakeResponse(requests.codes.too_many_requests),
+            3: requests.ConnectionError("reset"),
+        }
+    )
+    enricher = AnalyticsEnricher(client, workers=2, parse_pool=ParsePool(0))
+
+    enricher.submit([1, 2, 3])
+    enricher.close(connector=None)
+
+    assert written == [(1, 7.0)]
+    assert enricher.stats.queued == 3
+    assert enricher.stats.enriched == 1
+    assert enricher.stats.failed == 2
+    assert all(not conditional for _, conditional in client.requested)
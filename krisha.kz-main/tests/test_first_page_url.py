@@ -1,9 +1,13 @@
 import pytest
 
-from krisha.config.config import load_config
+from krisha.config.config import Config, load_config
+from krisha.config.parser import ParserConfig
 from krisha.config.search import SearchParameters
 from krisha.crawler.first_page import FirstPage
-from tests.fixtures.fx_first_page import first_page_test_data
+from tests.fixtures.fx_first_page import (
+    first_page_test_data,
+    page_url_test_data,
+)
 
 
 @pytest.mark.parametrize("expected_url, params", first_page_test_data)
@@ -13,3 +17,31 @@ def test_first_page_url_created(expected_url, params):
     url = FirstPage.get_url(config)
 
     assert url == expected_url
+
+
+@pytest.mark.parametrize("url, page, expected_url", page_url_test_data)
+def test_page_url_created(url, page, expected_url):
+    assert FirstPage.get_page_url(url, page, ParserConfig()) == expected_url
+
+
+def test_page_urls_cover_all_pages():
+    url = "https://krisha.kz/prodazha/kvartiry/"
+    urls = list(FirstPage.get_page_urls(url, 3, ParserConfig()))
+
+    assert urls == [url, url + "?page=2", url + "?page=3"]
+
+
+def test_incremental_search_is_sorted_newest_first():
+    parser = ParserConfig(incremental=True)
+    config = Config(
+        path=None,
+        parser_config=parser,
+        search_params=SearchParameters(parser, city=1, rooms=[1]),
+    )
+    url = FirstPage.get_url(config)
+
+    assert url == (
+        "https://krisha.kz/prodazha/kvartiry/almaty/?das[live.rooms]=1"
+        "&sort_by=add_date-desc"
+    )
+    assert FirstPage.get_page_url(url, 2, parser) == url + "&page=2"
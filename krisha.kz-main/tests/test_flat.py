@@ -1,5 +1,7 @@
+import pytest
 from bs4 import BeautifulSoup
 
+import krisha.crawler.flat_parser as flat_parser
 from krisha.crawler.flat_parser import FlatParser
 from krisha.entities.flat import Flat
 from tests.fixtures.fx_flat import valid_script
@@ -73,3 +75,29 @@ def test_get_sub_data():
 
     assert FlatParser._get_sub_data(data, "key1") == "value1"
     assert FlatParser._get_sub_data(data, "key3") is None
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_get_raw_pars_data(use_orjson, monkeypatch):
+    if not use_orjson:
+        monkeypatch.setattr(flat_parser, "orjson", None)
+    body = valid_script.encode()
+
+    assert FlatParser._get_raw_pars_data(body) == FlatParser._get_pars_data(
+        CONTENT
+    )
+    assert FlatParser._get_raw_pars_data(b"<html></html>") is None
+    assert FlatParser._get_raw_pars_data(body.replace(b"}", b"")) is None
+
+
+def test_flat_from_page_falls_back_to_soup():
+    url = "https://krisha.kz/a/show/680044731"
+    body = valid_script.replace('id="jsdata"', 'id = "jsdata"').encode()
+
+    assert FlatParser._get_raw_pars_data(body) is None
+    assert FlatParser.get_flat_from_page(body, url, None) == (
+        FlatParser.get_flat(CONTENT, url, None)
+    )
+    assert FlatParser.get_flat_from_page(valid_script.encode(), url, 5) == (
+        FlatParser.get_flat(CONTENT, url, 5)
+    )
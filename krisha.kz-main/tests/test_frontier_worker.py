@@ -0,0 +1,64 @@
+import pytest
+
+import krisha.crawler.worker as worker
+from krisha.crawler.worker import FrontierRetries
+from krisha.db.frontier import LISTING, FrontierItem
+
+
+@pytest.fixture
+def finished(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        worker,
+        "finish_items",
+        lambda connector, done, retry, dead: calls.append((done, retry, dead)),
+    )
+    return calls
+
+
+def get_retries(attempts=(1, 1, 1), retry_delay=(10, 60)):
+    items = [
+        FrontierItem(
+            num, f"https://krisha.kz/a/show/{num}", LISTING, "p", None, attempt
+        )
+        for num, attempt in enumerate(attempts, 1)
+    ]
+    return FrontierRetries(items, retry_delay), [item.url for item in items]
+
+
+def test_outcomes_are_written_back(finished):
+    retries, urls = get_retries()
+    retries.succeed(urls[0])
+    assert retries.defer(urls[1], Exception("503"))
+    retries.fail(urls[2], Exception("404"), missed=False)
+
+    retries.finish(None, delay=2)
+
+    assert finished == [([1], [(2, 10, "503")], [(3, "404")])]
+
+
+def test_exhausted_retries_are_dead(finished):
+    retries, urls = get_retries(attempts=(3,))
+
+    assert not retries.defer(urls[0], Exception("503"))
+    assert retries.missed == 1
+    retries.finish(None, delay=2)
+
+    assert finished == [([], [], [(1, "503")])]
+
+
+def test_unhandled_ads_are_released_on_error(finished):
+    retries, urls = get_retries()
+    retries.succeed(urls[0])
+    retries.defer(urls[1], Exception("503"))
+
+    retries.finish(None, delay=2, error=Exception("insert failed"))
+
+    done, retry, dead = finished[0]
+    assert done == []
+    assert retry == [
+        (2, 10, "503"),
+        (1, 2, "insert failed"),
+        (3, 2, "insert failed"),
+    ]
+    assert dead == []
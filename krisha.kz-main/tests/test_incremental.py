@@ -0,0 +1,26 @@
+from krisha.crawler.incremental import EarlyStop
+from krisha.entities.card import Card
+
+
+def get_cards(*ad_ids):
+    return [
+        Card(ad_id, f"https://krisha.kz/a/show/{ad_id}") for ad_id in ad_ids
+    ]
+
+
+def test_stops_after_quiet_pages_below_watermark():
+    early_stop = EarlyStop(watermark=100, quiet_pages=2)
+
+    assert not early_stop.update(get_cards(130, 120), changed=0)
+    assert not early_stop.update(get_cards(110, 100), changed=0)
+    assert not early_stop.update(get_cards(90, 80), changed=1)
+    assert not early_stop.update(get_cards(70, 60), changed=0)
+    assert early_stop.update(get_cards(50, 40), changed=0)
+    assert early_stop.newest == 130
+
+
+def test_stops_without_watermark_on_first_run():
+    early_stop = EarlyStop(watermark=None, quiet_pages=1)
+
+    assert early_stop.update(get_cards(20, 10), changed=0)
+    assert early_stop.newest == 20
@@ -0,0 +1,70 @@
+from datetime import date
+
+import krisha.crawler.known_listings as known_listings
+from krisha.crawler.known_listings import KnownListings, PriceLookup
+from krisha.entities.flat import Flat
+
+
+def get_flat(flat_id, price):
+    return Flat(
+        id=flat_id,
+        uuid="",
+        url=f"https://krisha.kz/a/show/{flat_id}",
+        room=1,
+        square=40,
+        city="Алматы",
+        lat=None,
+        lon=None,
+        description="",
+        price=price,
+        green_percentage=None,
+        address="",
+        title="",
+    )
+
+
+def get_known():
+    known = KnownListings()
+    for flat_id in (10, 20, 30):
+        known.append(flat_id, flat_id * 100, date(2024, 1, flat_id // 10))
+    return known
+
+
+def test_latest_prices_are_looked_up():
+    known = get_known()
+
+    assert known.get(20) == (2000, date(2024, 1, 2))
+    assert known.get(15) is None
+    assert known.get(40) is None
+    assert 30 in known
+    assert 5 not in known
+    assert known.nbytes == 3 * 20
+
+
+def test_saved_prices_override_loaded_ones():
+    known = get_known()
+
+    known.update([get_flat(10, 1000), get_flat(20, 2500), get_flat(40, 400)])
+
+    today = date.today()
+    assert known.get(10) == (1000, date(2024, 1, 1))
+    assert known.get(20) == (2500, today)
+    assert known.get(40) == (400, today)
+
+
+def test_prices_are_read_once_per_page(monkeypatch):
+    queries = []
+
+    def get_latest_prices(connector, flat_ids):
+        queries.append(list(flat_ids))
+        return {1: (100, date(2024, 1, 1))}
+
+    monkeypatch.setattr(known_listings, "get_latest_prices", get_latest_prices)
+    lookup = PriceLookup(connector=None)
+
+    lookup.prefetch([1, 2])
+
+    assert lookup.get(1) == (100, date(2024, 1, 1))
+    assert 2 not in lookup
+    assert lookup.get(3) is None
+    assert queries == [[1, 2], [3]]
@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+
+from krisha.crawler.flat_parser import FlatParser
+from krisha.crawler.parse_pool import ParsePool
+from tests.fixtures.fx_flat import valid_script
+
+URL = "https://krisha.kz/a/show/680044731"
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_flats_and_parse_errors_come_back(processes):
+    body = valid_script.encode()
+
+    with ParsePool(processes) as parse_pool:
+        flat = parse_pool.run(FlatParser.get_flat_from_page, body, URL, None)
+        with pytest.raises(ValueError):
+            parse_pool.run(FlatParser.get_flat_from_page, b"<p></p>", URL, 0)
+
+    assert vars(flat) == vars(FlatParser.get_flat_from_page(body, URL, None))
+
+
+def log_record(message):
+    logging.getLogger().warning(message)
+
+
+def test_worker_logs_are_written_by_the_parent():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        with ParsePool(1) as parse_pool:
+            parse_pool.run(log_record, "parsed in a worker")
+    finally:
+        root.removeHandler(handler)
+
+    assert "parsed in a worker" in [record.getMessage() for record in records]
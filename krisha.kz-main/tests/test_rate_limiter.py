@@ -0,0 +1,49 @@
+import pytest
+
+from krisha.crawler.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def get_bucket(rate, burst):
+    clock = FakeClock()
+    return TokenBucket(rate, burst, clock=clock, sleep=clock.sleep), clock
+
+
+def test_burst_is_not_throttled():
+    bucket, clock = get_bucket(rate=2, burst=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert clock.now == 0
+
+
+def test_rate_after_burst():
+    bucket, clock = get_bucket(rate=2, burst=1)
+
+    for _ in range(5):
+        bucket.acquire()
+
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_idle_time_refills_up_to_burst():
+    bucket, clock = get_bucket(rate=1, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 100
+
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, pytest.approx(1)]
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, burst=1)
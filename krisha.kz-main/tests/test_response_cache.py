@@ -0,0 +1,81 @@
+import os
+
+from requests import Response
+
+from krisha.config.parser import ParserConfig
+from krisha.crawler.response_cache import (
+    ANALYTICS,
+    DETAIL,
+    SEARCH,
+    ResponseCache,
+)
+
+DETAIL_URL = "https://krisha.kz/a/show/1"
+ANALYTICS_URL = "https://krisha.kz/analytics/aPriceAnalysis/?id=1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def get_cache(tmp_path, max_bytes=2**20):
+    clock = FakeClock()
+    cache = ResponseCache(
+        str(tmp_path),
+        max_bytes=max_bytes,
+        ttls={SEARCH: 10, DETAIL: 100, ANALYTICS: 1000},
+        parser_config=ParserConfig(),
+        clock=clock,
+    )
+    return cache, clock
+
+
+def get_response(body: bytes) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response._content = body
+    return response
+
+
+def test_cached_response_is_returned(tmp_path):
+    cache, _ = get_cache(tmp_path)
+    cache.put(DETAIL_URL, get_response("<html>цена</html>".encode()))
+
+    response = cache.get(DETAIL_URL)
+
+    assert response.status_code == 200
+    assert response.text == "<html>цена</html>"
+    assert cache.stats.hits == 1
+
+
+def test_entries_expire_by_endpoint_ttl(tmp_path):
+    cache, clock = get_cache(tmp_path)
+    cache.put(DETAIL_URL, get_response(b"detail"))
+    cache.put(ANALYTICS_URL, get_response(b"analytics"))
+    clock.now += 101
+
+    assert cache.get(DETAIL_URL) is None
+    assert cache.get(ANALYTICS_URL).content == b"analytics"
+    assert cache.stats.misses == 1
+
+
+def test_identical_bodies_are_stored_once(tmp_path):
+    cache, _ = get_cache(tmp_path)
+    cache.put(DETAIL_URL, get_response(b"same"))
+    cache.put(ANALYTICS_URL, get_response(b"same"))
+
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len([name for name in files if name.endswith(".gz")]) == 1
+
+
+def test_bodies_over_max_bytes_are_evicted(tmp_path):
+    cache, _ = get_cache(tmp_path, max_bytes=0)
+    cache.put(DETAIL_URL, get_response(os.urandom(1000)))
+
+    assert cache.get(DETAIL_URL) is None
+    assert cache.stats.evicted == 1
@@ -0,0 +1,147 @@
+import json
+import threading
+
+import krisha.crawler.spider as spider
+from krisha.crawler.retry_queue import RetryQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def get_queue(tmp_path, retry_delay=(10, 60)):
+    clock = FakeClock()
+    dead_letters_file = tmp_path / "dead_letters.jsonl"
+    queue = RetryQueue(retry_delay, str(dead_letters_file), clock=clock)
+    return queue, clock, dead_letters_file
+
+
+def test_deferred_url_is_due_after_delay(tmp_path):
+    queue, clock, _ = get_queue(tmp_path)
+
+    assert queue.defer("https://krisha.kz/a/show/1", Exception("503"))
+    assert queue.pop_due() == []
+    assert queue.next_due_in() == 10
+
+    clock.now += 10
+    due = queue.pop_due()
+
+    assert [(item.url, item.attempt) for item in due] == [
+        ("https://krisha.kz/a/show/1", 1)
+    ]
+    assert len(queue) == 0
+
+
+def test_exhausted_retries_go_to_dead_letters(tmp_path):
+    queue, clock, dead_letters_file = get_queue(tmp_path)
+    url = "https://krisha.kz/a/show/1"
+    for _ in range(2):
+        assert queue.defer(url, Exception("timeout"))
+        clock.now += 60
+        queue.pop_due()
+
+    assert not queue.defer(url, Exception("timeout"))
+    assert queue.missed == 1
+    records = [json.loads(line) for line in dead_letters_file.open()]
+    assert records[0]["url"] == url
+    assert records[0]["attempts"] == 2
+
+
+def test_failed_url_is_not_retried(tmp_path):
+    queue, _, dead_letters_file = get_queue(tmp_path)
+    queue.fail("https://krisha.kz/a/show/2", Exception("404"), missed=False)
+
+    assert len(queue) == 0
+    assert queue.missed == 0
+    assert queue.dead == 1
+    assert dead_letters_file.exists()
+
+
+def test_success_resets_missed(tmp_path):
+    queue, _, _ = get_queue(tmp_path, retry_delay=())
+    queue.defer("https://krisha.kz/a/show/1", Exception("timeout"))
+    queue.defer("https://krisha.kz/a/show/2", Exception("timeout"))
+    assert queue.missed == 2
+
+    queue.succeed("https://krisha.kz/a/show/3")
+    assert queue.missed == 0
+
+
+def test_dump_and_load_keep_deferred_urls(tmp_path):
+    queue, clock, _ = get_queue(tmp_path)
+    queue.defer("https://krisha.kz/a/show/1", Exception("503"))
+    clock.now += 10
+    queue.pop_due()
+    queue.defer("https://krisha.kz/a/show/1", Exception("503"))
+    queue.defer("https://krisha.kz/a/show/2", Exception("503"))
+
+    restored, restored_clock, _ = get_queue(tmp_path)
+    restored.load(json.loads(json.dumps(queue.dump())))
+
+    assert len(restored) == 2
+    restored_clock.now = clock.now + 60
+    due = restored.pop_due()
+    assert [(item.url, item.attempt) for item in due] == [
+        ("https://krisha.kz/a/show/2", 1),
+        ("https://krisha.kz/a/show/1", 2),
+    ]
+    assert not restored.defer("https://krisha.kz/a/show/1", Exception("503"))
+
+
+def test_popped_items_not_retried_are_put_back(tmp_path):
+    queue, clock, _ = get_queue(tmp_path)
+    urls = [f"https://krisha.kz/a/show/{i}" for i in range(4)]
+    for url in urls:
+        queue.defer(url, Exception("503"))
+    clock.now += 10
+    due = queue.pop_due()
+
+    queue.succeed(urls[0])
+    queue.defer(urls[1], Exception("503"))
+    queue.fail(urls[2], Exception("404"), missed=False)
+
+    assert queue.requeue(due) == 1
+    assert [(item.url, item.attempt) for item in queue.pop_due()] == [
+        (urls[3], 1)
+    ]
+
+
+def process_due(queue, shutdown, wait=False):
+    spider.process_due_retries(
+        None, None, None, None, queue, None, None, None, None, wait, shutdown
+    )
+
+
+def test_retry_wait_returns_on_shutdown(tmp_path):
+    queue, _, _ = get_queue(tmp_path, retry_delay=(3600, 3600))
+    queue.defer("https://krisha.kz/a/show/1", Exception("503"))
+    shutdown = threading.Event()
+    timer = threading.Timer(0.05, shutdown.set)
+    timer.start()
+
+    process_due(queue, shutdown, wait=True)
+
+    timer.cancel()
+    assert shutdown.is_set()
+    assert len(queue) == 1
+
+
+def test_interrupted_retries_are_put_back(tmp_path, monkeypatch):
+    queue, clock, _ = get_queue(tmp_path)
+    queue.defer("https://krisha.kz/a/show/1", Exception("503"))
+    clock.now += 10
+
+    def interrupt(*args, **kwargs):
+        raise spider.CrawlInterruptedError
+
+    monkeypatch.setattr(spider, "get_flats_data_on_page", interrupt)
+
+    process_due(queue, threading.Event())
+
+    assert [item.url for item in queue.pop_due()] == [
+        "https://krisha.kz/a/show/1"
+    ]
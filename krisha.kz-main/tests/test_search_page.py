@@ -0,0 +1,107 @@
+import threading
+import time
+from queue import Queue
+
+import pytest
+from bs4 import BeautifulSoup
+from requests import Response
+
+from krisha.config.config import Config
+from krisha.config.parser import ParserConfig, is_html_parser_available
+from krisha.config.path import AppPaths
+from krisha.config.search import SearchParameters
+from krisha.crawler.parse_pool import ParsePool
+from krisha.crawler.spider import (
+    get_ads_count,
+    get_ads_on_page,
+    get_cards,
+    get_content,
+    get_next_url,
+    get_page_count,
+    produce_search_pages_parallel,
+)
+from tests.fixtures.fx_search_page import full_search_page
+
+HOME_URL = "https://krisha.kz"
+
+
+def get_response(text):
+    response = Response()
+    response._content = text.encode()
+    response.encoding = "utf-8"
+    return response
+
+
+def read_search_page(content, config):
+    ads = get_ads_on_page(content)
+    ads_count = get_ads_count(content)
+    return {
+        "ads": [str(ad) for ad in ads],
+        "cards": [vars(card) for card in get_cards(HOME_URL, ads)],
+        "ads_count": ads_count,
+        "page_count": get_page_count(content, ads_count, config),
+        "next_url": get_next_url(HOME_URL, content),
+    }
+
+
+@pytest.mark.parametrize("html_parser", ["html.parser", "lxml"])
+def test_restricted_search_page_reads_as_the_full_one(html_parser):
+    if not is_html_parser_available(html_parser):
+        pytest.skip(f"{html_parser} is not installed")
+    parser = ParserConfig(html_parser=html_parser)
+    config = Config(
+        path=None,
+        parser_config=parser,
+        search_params=SearchParameters(parser),
+    )
+    full = BeautifulSoup(full_search_page, "html.parser")
+
+    content = get_content(get_response(full_search_page), parser)
+
+    assert read_search_page(content, config) == read_search_page(full, config)
+    assert content.find("footer") is None
+    assert content.find("script") is None
+
+
+def test_unknown_html_parser_is_not_available():
+    assert is_html_parser_available("html.parser")
+    assert not is_html_parser_available("selectolax")
+
+
+class SlowClient:
+    def __init__(self, parser_config, delay):
+        self.parser_config = parser_config
+        self.delay = delay
+        self.requests = 0
+
+    def get(self, url, conditional=True, fresh=False):
+        self.requests += 1
+        time.sleep(self.delay)
+        response = get_response(full_search_page)
+        response.status_code = 200
+        return response
+
+
+def test_stopped_producer_cancels_the_pages_not_fetched(tmp_path):
+    parser = ParserConfig(max_workers=2)
+    config = Config(
+        path=AppPaths(dead_letters_file=str(tmp_path / "dead.jsonl")),
+        parser_config=parser,
+        search_params=SearchParameters(parser),
+    )
+    client = SlowClient(parser, delay=0.1)
+    content = BeautifulSoup(full_search_page, "html.parser")
+    pages, stop = Queue(maxsize=1), threading.Event()
+    producer = threading.Thread(
+        target=produce_search_pages_parallel,
+        args=(config, client, HOME_URL, content, 40, pages, stop),
+        kwargs={"parse_pool": ParsePool(0)},
+    )
+
+    producer.start()
+    assert pages.get(timeout=5).num == 1
+    stop.set()
+    producer.join(timeout=5)
+
+    assert not producer.is_alive()
+    assert client.requests < 10
@@ -1,7 +1,9 @@
+import json
+
 import pytest
 
 from krisha.config.config import load_config
-from krisha.config.search import SearchParameters
+from krisha.config.search import SearchParameters, get_search_profiles
 from tests.fixtures.fx_search_params import search_params_test_data
 
 
@@ -17,3 +19,26 @@ def test_search_parameters_data(expected_data, params):
     assert search_params.price_from == expected_data["price_from"]
     assert search_params.price_to == expected_data["price_to"]
     assert search_params.owner == expected_data["owner"]
+
+
+def test_search_profiles_from_list(tmp_path):
+    config = load_config()
+    file_name = tmp_path / "SEARCH_PARAMETERS.json"
+    file_name.write_text(
+        json.dumps([{"city": 1, "name": "almaty"}, {"city": 2}])
+    )
+    profiles = get_search_profiles(str(file_name), config.parser_config)
+
+    assert [(p.name, p.city) for p in profiles] == [
+        ("almaty", 1),
+        ("profile-2", 2),
+    ]
+
+
+def test_search_profiles_from_single_object(tmp_path):
+    config = load_config()
+    file_name = tmp_path / "SEARCH_PARAMETERS.json"
+    file_name.write_text(json.dumps({"city": 3}))
+    profiles = get_search_profiles(str(file_name), config.parser_config)
+
+    assert [(p.name, p.city) for p in profiles] == [("profile-1", 3)]
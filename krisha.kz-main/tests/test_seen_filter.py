@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+import krisha.crawler.known_listings as known_listings
+import krisha.crawler.seen_filter as seen_filter
+from krisha.crawler.known_listings import PriceLookup
+from krisha.crawler.seen_filter import (
+    SeenFilter,
+    get_size,
+    measure_fp_rate,
+)
+
+FLAT_IDS = set(range(700_000_000, 700_020_000, 2))
+
+
+@pytest.fixture
+def seen(tmp_path):
+    seen = SeenFilter.create(str(tmp_path / "seen.bloom"), capacity=20_000)
+    seen.add(FLAT_IDS)
+    yield seen
+    seen.close()
+
+
+def test_size_follows_the_false_positive_rate():
+    bits, hashes = get_size(1_000_000, 0.01)
+
+    assert 9_500_000 < bits < 9_700_000
+    assert hashes == 7
+
+
+def test_added_ids_are_seen_by_another_reader(seen):
+    with SeenFilter(seen.path) as reader:
+        assert all(flat_id in reader for flat_id in FLAT_IDS)
+        assert reader.count == len(FLAT_IDS)
+        assert seen.add([700_000_001]) == 1
+        assert 700_000_001 in reader
+        assert reader.count == len(FLAT_IDS) + 1
+
+
+def test_false_positive_rate_is_near_the_target(seen):
+    assert measure_fp_rate(seen, FLAT_IDS, probes=20_000) < 0.005
+
+
+def test_unseen_ids_are_not_looked_up(seen, monkeypatch):
+    queries = []
+
+    def get_latest_prices(connector, flat_ids):
+        queries.append(list(flat_ids))
+        return {}
+
+    monkeypatch.setattr(known_listings, "get_latest_prices", get_latest_prices)
+    lookup = PriceLookup(connector=None, seen=seen)
+
+    lookup.prefetch([700_000_000, 5, 7])
+    lookup.prefetch([9])
+
+    assert queries == [[700_000_000]]
+    assert lookup.get(5) is None
+
+
+def test_ids_added_during_a_rebuild_reach_the_new_filter(
+    tmp_path, monkeypatch
+):
+    path = str(tmp_path / "seen.bloom")
+    writer = SeenFilter.create(path, capacity=20_000)
+    adder = threading.Thread(target=writer.add, args=([5],))
+
+    def iter_flat_ids(connector):
+        # A crawler saves id 5 after the flats have been read
+        adder.start()
+        adder.join(timeout=0.2)
+        yield from FLAT_IDS
+
+    monkeypatch.setattr(seen_filter, "iter_flat_ids", iter_flat_ids)
+
+    seen, _ = seen_filter.build_seen_filter(None, path)
+    adder.join(timeout=5)
+
+    with seen, writer:
+        assert 5 in seen
+        assert seen.count == len(FLAT_IDS) + 1
+        assert not writer.is_replaced()
+
+
+def test_read_only_filter_only_looks_ids_up(seen):
+    reader = seen_filter.open_seen_filter(seen.path, writable=False)
+
+    with reader:
+        assert all(flat_id in reader for flat_id in FLAT_IDS)
+        with pytest.raises(ValueError):
+            reader.add([5])
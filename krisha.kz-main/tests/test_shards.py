@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import psycopg2
+
+import krisha.crawler.spider as spider
+from krisha.config.config import Config
+from krisha.config.parser import ParserConfig
+from krisha.config.search import SearchParameters
+from krisha.crawler.shards import (
+    PriceShard,
+    get_shard_config,
+    partition_prices,
+)
+
+PRICES = [5_000_000 + i * 10_000 for i in range(1000)] + [900_000_000]
+
+
+def count_ads(low, high):
+    low = 0 if low is None else low
+    return sum(
+        1
+        for price in PRICES
+        if low <= price and (high is None or price <= high)
+    )
+
+
+def test_small_search_is_one_shard():
+    shards = partition_prices(
+        count_ads, None, None, max_ads=2000, price_ceiling=10**10, min_band=1
+    )
+
+    assert shards == [PriceShard(None, None, len(PRICES))]
+
+
+def test_shards_cover_search_within_limit():
+    shards = partition_prices(
+        count_ads, None, None, max_ads=100, price_ceiling=10**10, min_band=1
+    )
+
+    assert all(shard.ads_count <= 100 for shard in shards)
+    assert sum(shard.ads_count for shard in shards) == len(PRICES)
+    assert shards[-1].price_to is None
+    for previous, shard in zip(shards, shards[1:], strict=False):
+        assert previous.price_to < shard.price_from
+
+
+def test_narrow_band_is_not_split():
+    shards = partition_prices(
+        lambda low, high: 500,
+        1000,
+        1500,
+        max_ads=100,
+        price_ceiling=10**10,
+        min_band=1000,
+    )
+
+    assert shards == [PriceShard(1000, 1500, 500)]
+
+
+def test_shards_share_rate_limit_and_burst():
+    parser = ParserConfig(rate_limit=8.0, rate_burst=4)
+    config = Config(
+        path=None, parser_config=parser, search_params=SearchParameters(parser)
+    )
+
+    shard_config = get_shard_config(config, PriceShard(1, 2, 10), 4)
+    many_config = get_shard_config(config, PriceShard(1, 2, 10), 8)
+
+    assert shard_config.parser_config.rate_limit == 2.0
+    assert shard_config.parser_config.rate_burst == 1
+    assert many_config.parser_config.rate_burst == 1
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = 0
+
+    @contextmanager
+    def connection(self):
+        self.connections += 1
+        yield self.connections
+
+
+def test_crawl_is_restarted_on_a_new_connection_after_db_error(
+    monkeypatch,
+):
+    connectors = []
+
+    def run_crawler(config, connector, client, url, parse_pool, shutdown):
+        connectors.append(connector)
+        if len(connectors) == 1:
+            raise psycopg2.OperationalError("server closed the connection")
+        return "stats"
+
+    monkeypatch.setattr(spider, "run_crawler", run_crawler)
+    monkeypatch.setattr(spider, "sleep", lambda seconds: None)
+    monkeypatch.setattr(spider.FirstPage, "get_url", lambda config: "url")
+    config = SimpleNamespace(search_params=SimpleNamespace(name="shard"))
+
+    stats = spider.run_with_retries(config, None, FakePool(), None)
+
+    assert stats == "stats"
+    assert connectors == [1, 2]
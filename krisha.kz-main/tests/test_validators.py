@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from requests import Response
+
+import krisha.crawler.spider as spider
+from krisha.config.parser import ParserConfig
+from krisha.crawler.known_listings import KnownListings
+from krisha.crawler.validators import ValidatorStore
+
+DETAIL_URL = "https://krisha.kz/a/show/1"
+SEARCH_URL = "https://krisha.kz/prodazha/kvartiry/"
+
+
+def get_response(status=200, body=b"<html>1</html>", etag='"v1"'):
+    response = Response()
+    response.status_code = status
+    response._content = body
+    response.headers["ETag"] = etag
+    return response
+
+
+def get_store(tmp_path):
+    return ValidatorStore(str(tmp_path / "validators.sqlite"), ParserConfig())
+
+
+def test_validators_are_sent_after_commit(tmp_path):
+    store = get_store(tmp_path)
+    assert not store.check(DETAIL_URL, get_response())
+    assert store.get_headers(DETAIL_URL) == {}
+
+    store.commit([DETAIL_URL])
+
+    assert store.get_headers(DETAIL_URL) == {"If-None-Match": '"v1"'}
+
+
+def test_not_modified_and_same_hash_are_unchanged(tmp_path):
+    store = get_store(tmp_path)
+    store.check(DETAIL_URL, get_response())
+    store.commit([DETAIL_URL])
+
+    not_modified = get_response(status=304, body=b"")
+    same_body = get_response(etag=None)
+    changed = get_response(body=b"<html>2</html>")
+
+    assert store.check(DETAIL_URL, not_modified)
+    assert not_modified.unchanged
+    assert store.check(DETAIL_URL, same_body)
+    assert not store.check(DETAIL_URL, changed)
+    assert store.stats.not_modified == 1
+    assert store.stats.same_hash == 1
+    assert store.stats.bytes_saved == len(b"<html>1</html>")
+
+
+def test_search_pages_are_not_tracked(tmp_path):
+    store = get_store(tmp_path)
+    store.check(SEARCH_URL, get_response())
+    store.commit([SEARCH_URL])
+
+    assert store.get_headers(SEARCH_URL) == {}
+    assert not store.check(SEARCH_URL, get_response())
+
+
+def test_discarded_validators_are_not_kept(tmp_path):
+    store = get_store(tmp_path)
+    store.check(DETAIL_URL, get_response())
+
+    store.discard([DETAIL_URL])
+    store.commit([DETAIL_URL])
+
+    assert store.pending == {}
+    assert store.get_headers(DETAIL_URL) == {}
+
+
+def test_validators_of_flats_not_saved_are_dropped(monkeypatch, tmp_path):
+    client = SimpleNamespace(validators=get_store(tmp_path))
+    client.validators.check(DETAIL_URL, get_response())
+    monkeypatch.setattr(
+        spider, "insert_flats_data_db", lambda connector, flats_data: False
+    )
+
+    spider.save_flats(
+        None,
+        client,
+        [SimpleNamespace(url=DETAIL_URL)],
+        KnownListings(),
+        None,
+        spider.CrawlStats(),
+    )
+
+    assert client.validators.pending == {}
@@ -1091,7 +1091,8 @@ async def search_properties(update: Update, context: ContextTypes.DEFAULT_TYPE):
             params["market_percent"] = user_filter.max_market_price_percent
 
         # Сортировка по проценту от рыночной цены (от меньшего к большему)
-        query += " ORDER BY p.green_percentage DESC LIMIT 10"
+        # Объявления без рыночной оценки (ещё не получена) идут последними
+        query += " ORDER BY p.green_percentage DESC NULLS LAST LIMIT 10"
 
         # Выполняем запрос
         try:
@@ -1254,6 +1255,12 @@ async def search_properties(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         
                     floor_info = f"{floor}/{total_floors}" if floor and total_floors else "Неизвестно"
 
+                # Рыночная оценка может быть ещё не получена
+                if row.green_percentage is not None:
+                    market_info = f"📉 На {100 - row.green_percentage:.1f}% ниже рыночной\n"
+                else:
+                    market_info = "📉 Рыночная оценка пока не получена\n"
+
                 message = (
                     f"🏠 *{row.title or 'Квартира'}*\n"
                     f"🏙️ Район: {district}\n"
@@ -1263,7 +1270,7 @@ async def search_properties(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     f"📏 Площадь: {row.square} м²\n"
                     f"💰 Цена: {row.price:,} тенге\n"
                     f"📊 Цена за м²: {price_per_sqm:,.0f} тенге\n"
-                    f"📉 На {100 - row.green_percentage:.1f}% ниже рыночной\n"
+                    f"{market_info}"
                     f"🔗 [Подробнее]({row.url})"
                 )
 
@@ -1706,7 +1713,8 @@ async def send_notification(context):
             params["market_percent"] = max_market_price_percent
 
         # Сортировка по проценту от рыночной цены (от большего к меньшему)
-        query += " ORDER BY p.green_percentage DESC LIMIT 10"
+        # Объявления без рыночной оценки (ещё не получена) идут последними
+        query += " ORDER BY p.green_percentage DESC NULLS LAST LIMIT 10"
 
         # Выполняем запрос и получаем данные
         try:
@@ -1760,7 +1768,7 @@ async def send_notification(context):
                         basic_query += " AND p.price <= :price_max"
                         basic_params["price_max"] = price_max
                     
-                    basic_query += " ORDER BY p.green_percentage DESC LIMIT 10"
+                    basic_query += " ORDER BY p.green_percentage DESC NULLS LAST LIMIT 10"
                     
                     result = db_query.execute(text(basic_query), basic_params).fetchall()
                     db_query.commit()
@@ -1972,6 +1980,12 @@ async def send_notification(context):
                     
                     floor_info = f"{property_floor}/{property_total_floors}" if property_floor and property_total_floors else "Неизвестно"
                     
+                    # Рыночная оценка может быть ещё не получена
+                    if property_data['green_percentage'] is not None:
+                        market_info = f"📉 От рыночной: {property_data['green_percentage']:.1f}%\n"
+                    else:
+                        market_info = "📉 Рыночная оценка пока не получена\n"
+                    
                     message = (
                         f"🏠 *{property_data['title'] or 'Квартира'}*\n"
                         f"🏙️ Район: {property_district}\n"
@@ -1981,7 +1995,7 @@ async def send_notification(context):
                         f"📏 Площадь: {property_data['square']} м²\n"
                         f"💰 Цена: {property_data['price']:,} тенге\n"
                         f"📊 Цена за м²: {int(property_data['price'] / property_data['square']) if property_data['square'] else 0:,} тенге/м²\n"
-                        f"📉 От рыночной: {property_data['green_percentage']:.1f}%\n\n"
+                        f"{market_info}\n"
                         f"🔗 [Подробнее]({property_data['url']})"
                     )
                     
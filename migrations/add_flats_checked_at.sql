@@ -0,0 +1,7 @@
+-- Дата последней проверки объявления краулером, пустая для старых квартир
+ALTER TABLE flats ADD COLUMN IF NOT EXISTS checked_at DATE;
+ALTER TABLE flats ALTER COLUMN checked_at SET DEFAULT CURRENT_DATE;
+
+-- Индекс для выборки последней цены каждой квартиры
+CREATE INDEX IF NOT EXISTS prices_flat_date_idx
+    ON prices (flat_id, date DESC);